@@ -1,8 +1,8 @@
 # client/local_clients.py
 # Generic local MCP client over stdio for custom servers (e.g., BearingPro)
 
-from typing import Any, Dict
-import time, os
+from typing import Any, Callable, Dict, Optional
+import threading, time, os
 from .stdio_client import StdioClient
 
 PROTO_VERSIONS = ["2025-06-18", "2024-11-05", "2024-10-07"]
@@ -25,8 +25,17 @@ def _init(c: StdioClient) -> dict:
             continue
     raise RuntimeError(f"initialize failed: {last}")
 
-def tools_call(c: StdioClient, name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-    return c.call("tools/call", {"name": name, "arguments": arguments})
+def tools_call(c: StdioClient, name: str, arguments: Dict[str, Any],
+               on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    # on_progress receives each notifications/progress params dict (if the tool emits them)
+    return c.call("tools/call", {"name": name, "arguments": arguments}, on_progress=on_progress)
+
+def tools_list(c: StdioClient) -> list:
+    # tools/list with JSON Schemas; older servers only name their tools in initialize
+    resp = c.call("tools/list", {})
+    if "error" in resp:
+        return []
+    return (resp.get("result") or {}).get("tools") or []
 
 # Convenience API for BearingPro
 def bearingpro_client_from_env() -> StdioClient:
@@ -35,26 +44,54 @@ def bearingpro_client_from_env() -> StdioClient:
         raise RuntimeError("BEARINGPRO_CMD not set. Example: python local_servers/bearingpro/main.py")
     return StdioClient(server_cmd=cmd, timeout_sec=30.0)
 
+# Persistent BearingPro process: stateful tools (what-if sessions) need it, and every
+# other call reuses it instead of paying a process start + initialize per request.
+# The host warms it in the background (bearingpro_shared() from a worker thread).
+_SHARED: StdioClient | None = None
+_SHARED_LOCK = threading.Lock()
+
+def bearingpro_shared() -> StdioClient:
+    global _SHARED
+    with _SHARED_LOCK:   # a warm-up and a first call may race: start one process only
+        if _SHARED is None or _SHARED.proc.poll() is not None:
+            c = bearingpro_client_from_env()
+            try:
+                _init(c)
+            except Exception:
+                c.close()
+                raise
+            _SHARED = c
+        return _SHARED
+
 def bearingpro_select(args: Dict[str, Any]) -> Dict[str, Any]:
-    c = bearingpro_client_from_env()
-    try:
-        _init(c)
-        return tools_call(c, "select_bearing", args).get("result", {})
-    finally:
-        c.close()
+    return tools_call(bearingpro_shared(), "select_bearing", args).get("result", {})
 
 def bearingpro_verify(args: Dict[str, Any]) -> Dict[str, Any]:
-    c = bearingpro_client_from_env()
-    try:
-        _init(c)
-        return tools_call(c, "verify_point", args).get("result", {})
-    finally:
-        c.close()
+    return tools_call(bearingpro_shared(), "verify_point", args).get("result", {})
 
 def bearingpro_catalog() -> Dict[str, Any]:
-    c = bearingpro_client_from_env()
-    try:
-        _init(c)
-        return tools_call(c, "catalog_list", {}).get("result", {})
-    finally:
-        c.close()
+    return tools_call(bearingpro_shared(), "catalog_list", {}).get("result", {})
+
+def bearingpro_tools() -> list:
+    return tools_list(bearingpro_shared())
+
+def bearingpro_shared_close():
+    global _SHARED
+    with _SHARED_LOCK:
+        if _SHARED is not None:
+            _SHARED.close()
+            _SHARED = None
+
+def bearingpro_whatif_open(args: Dict[str, Any]) -> Dict[str, Any]:
+    return tools_call(bearingpro_shared(), "whatif_open", args).get("result", {})
+
+def bearingpro_whatif_update(session_id: str, deltas: Dict[str, Any]) -> Dict[str, Any]:
+    return tools_call(bearingpro_shared(), "whatif_update", {"session_id": session_id, **deltas}).get("result", {})
+
+def bearingpro_whatif_close(session_id: str) -> Dict[str, Any]:
+    return tools_call(bearingpro_shared(), "whatif_close", {"session_id": session_id}).get("result", {})
+
+def bearingpro_sweep(args: Dict[str, Any],
+                     on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    # Long-running: runs on the persistent process (its worker pool stays warm)
+    return tools_call(bearingpro_shared(), "sweep", args, on_progress=on_progress).get("result", {})
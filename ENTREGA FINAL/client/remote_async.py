@@ -0,0 +1,218 @@
+# client/remote_async.py
+# Async HTTP JSON-RPC client for the remote MCP server (Cloud Run).
+# - One shared httpx.AsyncClient pool (HTTP/2 with REMOTE_MCP_HTTP2=1); the blocking
+#   helpers keep one client per URL on a background loop, so the pool and the
+#   initialize result outlive a single call
+# - Many tools/call in flight at once; one JSON-RPC batch POST when the server
+#   advertises capabilities.batch in its initialize result
+# - Per-call deadlines (asyncio.wait_for); a late call fails alone, the rest still return
+# - Replica fan-out: same call to several URLs (REMOTE_MCP_URLS=url1,url2,...)
+
+import asyncio, itertools, os, threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from client.remote_clients import (ACCEPT_ENCODING, DEFAULT_TIMEOUT, KEEPALIVE_SEC, POOL_SIZE, _idempotent,
+                                   _url, default_session, guard_for)
+
+try:
+    import httpx
+except ImportError:  # optional dependency: pip install httpx
+    httpx = None
+
+PROTOCOL_VERSION = "2025-06-18"
+
+class RemoteCallError(RuntimeError):
+    def __init__(self, message: str, code: int | None = None):
+        super().__init__(message)
+        self.code = code
+
+def replica_urls() -> List[str]:
+    urls = [u.strip() for u in os.getenv("REMOTE_MCP_URLS", "").split(",") if u.strip()]
+    return urls or [_url()]
+
+class AsyncRemoteClient:
+    def __init__(self, url: str | None = None, timeout: float = DEFAULT_TIMEOUT,
+                 pool_size: int = POOL_SIZE, http2: bool | None = None):
+        if httpx is None:
+            raise RuntimeError("httpx not installed (pip install httpx).")
+        self.url = url or _url()
+        self.timeout = timeout
+        self.pool_size = pool_size
+        if http2 is None:
+            http2 = os.getenv("REMOTE_MCP_HTTP2", "0").lower() in {"1", "true", "yes", "on"}
+        self.http2 = http2
+        self.server: Dict[str, Any] = {}      # initialize result
+        self.supports_batch = False
+        self._ids = itertools.count(1)
+        self._http = None
+
+    async def __aenter__(self):
+        limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size,
+                              keepalive_expiry=KEEPALIVE_SEC)
+        # pool limits live on the transport: httpx ignores the Client's when one is passed
+        transport = httpx.AsyncHTTPTransport(http2=self.http2, retries=1, limits=limits)
+        self._http = httpx.AsyncClient(timeout=self.timeout, headers={"Accept-Encoding": ACCEPT_ENCODING},
+                                       transport=transport)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._http.aclose()
+        self._http = None
+
+    def _request(self, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params}
+
+    async def _post(self, body, url: str | None = None):
+        url = url or self.url
+        guard = guard_for(url)   # one breaker per replica: a dead one does not block the others
+        # adaptive timeout only if every request in the body is a short idempotent call
+        adaptive = all(_idempotent(b) for b in (body if isinstance(body, list) else [body]))
+        async with guard.attempt_async() as att:
+            r = await self._http.post(url, json=body, timeout=guard.timeout(self.timeout, adaptive))
+            if r.status_code >= 500 or r.status_code == 429:
+                att.failed()
+            r.raise_for_status()
+            return r.json()
+
+    @staticmethod
+    def _result(msg: Dict[str, Any]) -> Dict[str, Any]:
+        if "error" in msg:
+            err = msg["error"] or {}
+            raise RemoteCallError(err.get("message", "remote error"), err.get("code"))
+        return msg.get("result", {})
+
+    async def call(self, method: str, params: Dict[str, Any] | None = None,
+                   deadline: float | None = None, url: str | None = None) -> Dict[str, Any]:
+        """One JSON-RPC call; deadline (s) bounds the whole call, including queueing."""
+        coro = self._post(self._request(method, params or {}), url)
+        msg = await (asyncio.wait_for(coro, deadline) if deadline else coro)
+        return self._result(msg)
+
+    async def initialize(self) -> Dict[str, Any]:
+        self.server = await self.call("initialize", {"protocolVersion": PROTOCOL_VERSION})
+        self.supports_batch = bool((self.server.get("capabilities") or {}).get("batch"))
+        return self.server
+
+    async def tools_call(self, name: str, arguments: Dict[str, Any] | None = None,
+                         deadline: float | None = None) -> Dict[str, Any]:
+        return await self.call("tools/call", {"name": name, "arguments": arguments or {}}, deadline)
+
+    async def call_many(self, calls: Iterable[Tuple[str, Dict[str, Any]]],
+                        deadline: float | None = None, batch: bool | None = None) -> List[Dict[str, Any]]:
+        """
+        Run (tool, arguments) pairs concurrently; results keep the input order.
+        A failed or late call becomes {"ok": False, "error": ...} in its slot.
+        batch=None uses a JSON-RPC batch only if the server advertised it.
+        """
+        calls = list(calls)
+        if not calls:
+            return []
+        if batch if batch is not None else self.supports_batch:
+            return await self._batch(calls, deadline)
+        outs = await asyncio.gather(*[self.tools_call(n, a, deadline) for n, a in calls],
+                                    return_exceptions=True)
+        return [_as_result(o) for o in outs]
+
+    async def _batch(self, calls, deadline):
+        reqs = [self._request("tools/call", {"name": n, "arguments": a or {}}) for n, a in calls]
+        coro = self._post(reqs)
+        try:
+            msgs = await (asyncio.wait_for(coro, deadline) if deadline else coro)
+        except Exception as e:
+            return [_as_result(e) for _ in reqs]
+        by_id = {m.get("id"): m for m in (msgs if isinstance(msgs, list) else [msgs])}
+        outs = []
+        for rq in reqs:
+            m = by_id.get(rq["id"])
+            if m is None:
+                outs.append({"ok": False, "error": "missing batch response"})
+                continue
+            try:
+                outs.append(self._result(m))
+            except RemoteCallError as e:
+                outs.append(_as_result(e))
+        return outs
+
+    async def fan_out(self, name: str, arguments: Dict[str, Any] | None = None,
+                      urls: List[str] | None = None, deadline: float | None = None) -> Dict[str, Dict[str, Any]]:
+        """Same tool call on every replica concurrently: {url: result}."""
+        urls = urls or replica_urls()
+        body = {"name": name, "arguments": arguments or {}}
+        outs = await asyncio.gather(*[self.call("tools/call", body, deadline, u) for u in urls],
+                                    return_exceptions=True)
+        return {u: _as_result(o) for u, o in zip(urls, outs)}
+
+def _as_result(o) -> Dict[str, Any]:
+    if isinstance(o, asyncio.TimeoutError):
+        return {"ok": False, "error": "deadline exceeded"}
+    if isinstance(o, BaseException):
+        return {"ok": False, "error": str(o) or type(o).__name__}
+    return o
+
+# ---------- blocking helpers for the (sync) host ----------
+# The host calls these from worker threads. They all run on one background event loop
+# with one AsyncRemoteClient per URL (an httpx pool is tied to the loop it was made on).
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_CLIENTS: Dict[str, AsyncRemoteClient] = {}
+_LOOP_LOCK = threading.Lock()
+
+def _run(coro_fn):
+    """Run coro_fn() on the shared loop (started on first use) and wait for the result."""
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            _LOOP = asyncio.new_event_loop()
+            threading.Thread(target=_LOOP.run_forever, name="remote-async", daemon=True).start()
+        loop = _LOOP
+    return asyncio.run_coroutine_threadsafe(coro_fn(), loop).result()
+
+async def _client(url: str) -> AsyncRemoteClient:
+    # only touched from the loop thread, so no lock
+    c = _CLIENTS.get(url)
+    if c is None:
+        c = await AsyncRemoteClient(url=url).__aenter__()
+        _CLIENTS[url] = c
+    return c
+
+async def _learn_batch(c: AsyncRemoteClient):
+    """Batch support from the sync RemoteSession if it already shook hands, else initialize once."""
+    if c.server:
+        return
+    sess = default_session()
+    if sess.initialized and sess.url == c.url:
+        c.server, c.supports_batch = sess.init_result, bool(sess.capabilities.get("batch"))
+        return
+    try:
+        await c.initialize()
+    except Exception:
+        pass   # unknown: no batch this time, asked again on the next call
+
+def run_many(calls: List[Tuple[str, Dict[str, Any]]], deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+    async def go():
+        c = await _client(_url())
+        await _learn_batch(c)
+        return await c.call_many(calls, deadline)
+    return _run(go)
+
+def run_fan_out(name: str, arguments: Dict[str, Any] | None = None,
+                deadline: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+    async def go():
+        c = await _client(replica_urls()[0])
+        return await c.fan_out(name, arguments, deadline=deadline)
+    return _run(go)
+
+def close():
+    """Close the shared clients and stop the background loop (host exit)."""
+    global _LOOP
+    with _LOOP_LOCK:
+        loop, _LOOP = _LOOP, None
+    if loop is None:
+        return
+    async def shut():
+        for c in list(_CLIENTS.values()):
+            await c.__aexit__(None, None, None)
+        _CLIENTS.clear()
+    try:
+        asyncio.run_coroutine_threadsafe(shut(), loop).result(timeout=5)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
@@ -1,10 +1,122 @@
 # client/remote_clients.py
 # Simple HTTP JSON-RPC client for remote MCP server (Cloud Run)
+# One pooled keep-alive session per process (TCP + TLS handshake paid once);
+# optional HTTP/2 via httpx (REMOTE_MCP_HTTP2=1, needs `pip install httpx[http2]`).
+# Responses are requested compressed (br when brotli is installed, else gzip).
+# Results that come with an ETag are kept in a small LRU and revalidated with
+# If-None-Match: an unchanged result costs a 304 with no body.
+# RemoteSession initializes once, keeps the Mcp-Session-Id, negotiated version and
+# capabilities, caches tools/list and re-initializes when the server drops the session.
+# Servers that answer with SSE (FastMCP streamable HTTP) are read through
+# client/streamable_http.py, so progress/log notifications arrive while a call runs.
 
-import os, json, requests
-from typing import Any, Dict
+import os, json, time, itertools, threading, requests
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import httpx
+except ImportError:  # optional: only needed for HTTP/2
+    httpx = None
+
+try:
+    import brotli  # noqa: F401  (lets requests/httpx decode Content-Encoding: br)
+    ACCEPT_ENCODING = "br, gzip"
+except ImportError:
+    ACCEPT_ENCODING = "gzip"
+
+# Rate limiter / adaptive concurrency / circuit breaker: client/resilience.py (stdlib only,
+# vendored from ENTREGA PARCIAL external/resilience.py)
+from client.resilience import Guard
+from client import streamable_http
 
 DEFAULT_TIMEOUT = 15.0
+PROTOCOL_VERSION = "2025-06-18"
+CLIENT_INFO = {"name": "BearingProHost", "version": "0.2.0"}
+# REMOTE_MCP_RATE, _BURST, _CONCURRENCY, _MAX_CONCURRENCY, _TARGET_LATENCY, _BREAKER_FAILURES, ...
+GUARD_DEFAULTS = dict(rate=0, burst=0, target_latency=3.0, concurrency=16, max_concurrency=64)  # rate 0 = no quota
+GUARD = Guard.from_env("REMOTE_MCP", **GUARD_DEFAULTS)
+_REPLICA_GUARDS: Dict[str, Guard] = {}
+
+POOL_SIZE = int(os.getenv("REMOTE_MCP_POOL", "10"))
+KEEPALIVE_SEC = float(os.getenv("REMOTE_MCP_KEEPALIVE", "60"))   # idle connection lifetime (httpx)
+RETRIES = int(os.getenv("REMOTE_MCP_RETRIES", "2"))
+RETRY_BACKOFF = 0.3
+RETRY_STATUS = {502, 503, 504}
+# JSON-RPC calls that are safe to resend after a read error / 5xx (plain POSTs are not)
+IDEMPOTENT_METHODS = {"initialize", "tools/list", "ping"}
+IDEMPOTENT_TOOLS = {t.strip() for t in os.getenv("REMOTE_MCP_IDEMPOTENT_TOOLS",
+                                                "echo,time_now,add,select_bearing,verify_point,catalog_list").split(",") if t.strip()}
+CACHE_SIZE = int(os.getenv("REMOTE_MCP_CACHE_SIZE", "256"))   # 0 disables the response cache
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+_TRANSPORT = "requests"
+
+def _new_session():
+    """requests.Session with a sized pool, or httpx.Client(http2=True) when asked for."""
+    global _TRANSPORT
+    if os.getenv("REMOTE_MCP_HTTP2", "0").lower() in {"1", "true", "yes", "on"}:
+        if httpx is None:
+            raise RuntimeError("REMOTE_MCP_HTTP2=1 needs httpx (pip install httpx[http2]).")
+        _TRANSPORT = "httpx-http2"
+        limits = httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE,
+                              keepalive_expiry=KEEPALIVE_SEC)
+        # transport retries cover connect errors only (request never sent). With an explicit
+        # transport httpx ignores the Client's http2/limits, so they go on the transport.
+        return httpx.Client(headers={"Accept-Encoding": ACCEPT_ENCODING},
+                            transport=httpx.HTTPTransport(http2=True, retries=RETRIES, limits=limits))
+    _TRANSPORT = "requests"
+    s = requests.Session()
+    # connect errors are retried for any method; read errors/status only for idempotent HTTP verbs
+    retry = Retry(total=RETRIES, connect=RETRIES, read=0, status=0, backoff_factor=RETRY_BACKOFF)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+    s.mount("http://", adapter)
+    s.mount("https://", adapter)
+    s.headers.update({"Connection": "keep-alive", "Accept-Encoding": ACCEPT_ENCODING})
+    return s
+
+def session():
+    """Process-wide pooled session (created on first use)."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _new_session()
+    return _SESSION
+
+def close():
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is not None:
+            _SESSION.close()
+            _SESSION = None
+
+def _transient_errors() -> tuple:
+    errs = (requests.ConnectionError, requests.Timeout)
+    return errs + (httpx.TransportError,) if httpx is not None else errs
+
+def _status_errors() -> tuple:
+    # raise_for_status() of either transport: requests, or httpx when HTTP/2 is on
+    errs = (requests.HTTPError,)
+    return errs + (httpx.HTTPStatusError,) if httpx is not None else errs
+
+def guard_for(url: str) -> Guard:
+    """GUARD for REMOTE_MCP_URL, a separate guard per extra replica URL."""
+    if url == os.getenv("REMOTE_MCP_URL", "").strip():
+        return GUARD
+    g = _REPLICA_GUARDS.get(url)
+    if g is None:
+        g = _REPLICA_GUARDS[url] = Guard.from_env("REMOTE_MCP", **GUARD_DEFAULTS)
+    return g
+
+def _idempotent(payload: Dict[str, Any]) -> bool:
+    method = payload.get("method")
+    if method == "tools/call":
+        return (payload.get("params") or {}).get("name") in IDEMPOTENT_TOOLS
+    return method in IDEMPOTENT_METHODS
 
 def _url() -> str:
     url = os.getenv("REMOTE_MCP_URL", "").strip()
@@ -12,19 +124,316 @@ def _url() -> str:
         raise RuntimeError("REMOTE_MCP_URL not set. Example: https://remote-mcp-xxxx-uc.a.run.app/mcp")
     return url
 
-def _post(payload: Dict[str, Any]) -> Dict[str, Any]:
-    # basic HTTP POST
-    r = requests.post(_url(), json=payload, timeout=DEFAULT_TIMEOUT)
-    r.raise_for_status()
-    return r.json()
+# ---------- response cache (ETag revalidation) ----------
+_CACHE: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()   # key -> {"etag", "result", "fresh_until"}
+_CACHE_LOCK = threading.Lock()
+_CACHE_STATS = {"fresh": 0, "revalidated": 0, "stored": 0}
+
+def _cache_key(payload: Dict[str, Any], url: str) -> str:
+    return url + " " + json.dumps([payload.get("method"), payload.get("params") or {}], sort_keys=True)
+
+def _cache_get(key: str):
+    with _CACHE_LOCK:
+        entry = _CACHE.get(key)
+        if entry is not None:
+            _CACHE.move_to_end(key)
+        return entry
+
+def _max_age(r) -> float:
+    for part in r.headers.get("Cache-Control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name == "max-age" and value.isdigit():
+            return float(value)
+    return 0.0
+
+def _cache_store(key: str, r, msg: Dict[str, Any]):
+    etag = r.headers.get("ETag")
+    if not etag or CACHE_SIZE <= 0 or "result" not in msg:
+        return
+    with _CACHE_LOCK:
+        _CACHE[key] = {"etag": etag, "result": msg["result"], "fresh_until": time.monotonic() + _max_age(r)}
+        _CACHE.move_to_end(key)
+        while len(_CACHE) > CACHE_SIZE:
+            _CACHE.popitem(last=False)
+        _CACHE_STATS["stored"] += 1
+
+def clear_cache():
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+def cache_info() -> Dict[str, Any]:
+    with _CACHE_LOCK:
+        return {"entries": len(_CACHE), "max_entries": CACHE_SIZE, **_CACHE_STATS}
+
+def _post_once(payload: Dict[str, Any], headers: Dict[str, str] | None = None, url: str | None = None):
+    # HTTP POST behind the guard: fails fast while the breaker is open
+    url = url or _url()
+    guard = guard_for(url)
+    with guard.attempt() as att:
+        # adaptive timeout only for short idempotent calls (a sweep or a write gets the full one)
+        r = session().post(url, json=payload, headers=headers,
+                           timeout=guard.timeout(DEFAULT_TIMEOUT, adaptive=_idempotent(payload)))
+        if r.status_code in RETRY_STATUS or r.status_code == 429:
+            att.failed()
+        return r
+
+def _post(payload: Dict[str, Any], headers: Dict[str, str] | None = None, url: str | None = None) -> Dict[str, Any]:
+    # A cached result is returned as is while fresh (max-age), else revalidated (If-None-Match)
+    url = url or _url()
+    key = _cache_key(payload, url) if CACHE_SIZE > 0 and "id" in payload else ""
+    entry = _cache_get(key) if key else None
+    if entry is not None and time.monotonic() < entry["fresh_until"]:
+        _CACHE_STATS["fresh"] += 1
+        return {"jsonrpc": "2.0", "id": payload.get("id"), "result": entry["result"]}
+    if entry is not None:
+        headers = {**(headers or {}), "If-None-Match": entry["etag"]}
+    # Idempotent calls are retried on read errors and 502/503/504 (exponential backoff)
+    attempts = 1 + (RETRIES if _idempotent(payload) else 0)
+    for i in range(attempts):
+        last = i == attempts - 1
+        try:
+            r = _post_once(payload, headers, url)
+        except _transient_errors():
+            if last:
+                raise
+        else:
+            if r.status_code == 304 and entry is not None:
+                _CACHE_STATS["revalidated"] += 1
+                entry["fresh_until"] = time.monotonic() + _max_age(r)
+                return {"jsonrpc": "2.0", "id": payload.get("id"), "result": entry["result"]}
+            if r.status_code not in RETRY_STATUS or last:
+                r.raise_for_status()
+                if r.status_code == 202 or not r.content:
+                    return {}                       # notification accepted, no body
+                msg = r.json()
+                if key:
+                    _cache_store(key, r, msg)
+                return msg
+        time.sleep(RETRY_BACKOFF * (2 ** i))
+
+class SessionExpired(RuntimeError):
+    """The server no longer knows our Mcp-Session-Id (HTTP 404)."""
+
+class RemoteSession:
+    """
+    One MCP session with the remote server: initialize once, then every request
+    carries Mcp-Session-Id / MCP-Protocol-Version. tools/list is cached until a
+    notifications/tools/list_changed arrives; an expired session (404) is
+    re-initialized and the request sent again, once.
+    transport: "auto" (streamable if the server answers initialize with SSE),
+    "streamable" or "json".
+    """
+
+    def __init__(self, url: str | None = None, protocol_version: str = PROTOCOL_VERSION,
+                 transport: str = "auto", on_message: Callable[[Dict[str, Any]], None] | None = None):
+        self.url = url or _url()
+        self.transport = transport
+        self.streamable = transport == "streamable"
+        self.on_message = on_message          # every server notification (logs, progress, ...)
+        self.requested_version = protocol_version
+        self.protocol_version: str | None = None
+        self.session_id: str | None = None
+        self.capabilities: Dict[str, Any] = {}
+        self.server_info: Dict[str, Any] = {}
+        self.init_result: Dict[str, Any] = {}
+        self._tools: list | None = None
+        self._ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self.stats = {"initializations": 0, "reinitializations": 0, "tools_list_fetches": 0, "tools_list_hits": 0}
+
+    # ---- low level ----
+    def _headers(self) -> Dict[str, str]:
+        h = {}
+        if self.session_id:
+            h["Mcp-Session-Id"] = self.session_id
+        if self.protocol_version:
+            h["MCP-Protocol-Version"] = self.protocol_version
+        return h
+
+    def _send(self, method: str, params: Dict[str, Any], notify: bool = False,
+              on_progress: Callable[[Dict[str, Any]], None] | None = None) -> Dict[str, Any]:
+        if self.streamable:
+            resp = {}
+            for msg in self.stream(method, params, notify, on_progress):
+                if "id" in msg:
+                    resp = msg
+            return resp
+        payload = {"jsonrpc": "2.0", "method": method, "params": params}
+        if not notify:
+            payload["id"] = next(self._ids)
+        try:
+            return _post(payload, self._headers(), self.url)
+        except _status_errors() as e:
+            if self.session_id and e.response is not None and e.response.status_code == 404:
+                raise SessionExpired(f"session {self.session_id} expired") from e
+            raise
+
+    def stream(self, method: str, params: Dict[str, Any] | None = None, notify: bool = False,
+               on_progress: Callable[[Dict[str, Any]], None] | None = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streamable HTTP: yield every message of the reply as it arrives (notifications,
+        then the response). on_progress asks for progress (params._meta.progressToken).
+        """
+        params = dict(params or {})
+        payload: Dict[str, Any] = {"jsonrpc": "2.0", "method": method, "params": params}
+        if not notify:
+            payload["id"] = next(self._ids)
+            if on_progress is not None:
+                params["_meta"] = {**(params.get("_meta") or {}), "progressToken": f"p{payload['id']}"}
+        guard = guard_for(self.url)
+        try:
+            with guard.attempt():
+                # full timeout: it is also the longest gap allowed between SSE events
+                reply = streamable_http.post(self.url, payload, self._headers(), DEFAULT_TIMEOUT)
+        except streamable_http.StreamError as e:
+            if self.session_id and e.status == 404:
+                raise SessionExpired(f"session {self.session_id} expired") from e
+            raise
+        for msg in reply:
+            if "id" not in msg:
+                self.handle_notification(msg)
+                if on_progress is not None and msg.get("method") == "notifications/progress":
+                    on_progress(msg.get("params") or {})
+            yield msg
+
+    # ---- lifecycle ----
+    @property
+    def initialized(self) -> bool:
+        return self.protocol_version is not None
+
+    def initialize(self, force: bool = False) -> Dict[str, Any]:
+        """Handshake once per session; later calls return the stored result."""
+        with self._lock:
+            if self.initialized and not force:
+                return self.init_result
+            self.session_id = self.protocol_version = None
+            params = {"protocolVersion": self.requested_version, "capabilities": {}, "clientInfo": CLIENT_INFO}
+            payload = {"jsonrpc": "2.0", "id": next(self._ids), "method": "initialize", "params": params}
+            guard = guard_for(self.url)
+            with guard.attempt():   # direct: we need the response headers (and maybe an SSE body)
+                reply = streamable_http.post(self.url, payload, timeout=DEFAULT_TIMEOUT)   # may hit a cold start
+                msg = next((m for m in reply if m.get("id") == payload["id"]), {})
+            if "error" in msg or "result" not in msg:
+                raise RuntimeError(f"initialize failed: {msg.get('error', msg)}")
+            res = msg["result"]
+            self.streamable = self.transport == "streamable" or (self.transport == "auto" and reply.is_sse)
+            self.session_id = reply.headers.get("Mcp-Session-Id")
+            self.protocol_version = res.get("protocolVersion", self.requested_version)
+            self.capabilities = res.get("capabilities") or {}
+            self.server_info = res.get("serverInfo") or {}
+            self.init_result = res
+            self._tools = None
+            self.stats["initializations"] += 1
+            try:
+                self._send("notifications/initialized", {}, notify=True)
+            except Exception:
+                pass   # older servers answer notifications with an error; the session is still usable
+            return res
+
+    def request(self, method: str, params: Dict[str, Any] | None = None,
+                on_progress: Callable[[Dict[str, Any]], None] | None = None) -> Dict[str, Any]:
+        """JSON-RPC request in this session; returns the full response message."""
+        self.initialize()
+        try:
+            return self._send(method, params or {}, on_progress=on_progress)
+        except SessionExpired:
+            with self._lock:
+                self.stats["reinitializations"] += 1
+                self.initialize(force=True)
+            return self._send(method, params or {}, on_progress=on_progress)
+
+    def handle_notification(self, msg: Dict[str, Any]):
+        """Server notifications (e.g. from a streamed response) that affect cached state."""
+        if msg.get("method") == "notifications/tools/list_changed":
+            self._tools = None
+        if self.on_message is not None:
+            self.on_message(msg)
+
+    def listen(self, stop: Callable[[], bool] = lambda: False) -> Iterator[Dict[str, Any]]:
+        """Server-initiated messages (GET stream, reconnects with Last-Event-ID)."""
+        self.initialize()
+        for msg in streamable_http.listen(self.url, self._headers(), stop):
+            if "id" not in msg:
+                self.handle_notification(msg)
+            yield msg
+
+    def close(self):
+        if self.session_id:
+            try:   # streamable HTTP: tell the server to drop the session (405 if it does not allow it)
+                streamable_http.stream_session().delete(self.url, headers=self._headers(), timeout=5)
+            except requests.RequestException:
+                pass
+        self.session_id = self.protocol_version = None
+        self._tools = None
+
+    # ---- MCP methods ----
+    def tools_list(self, refresh: bool = False) -> list:
+        """Tools from tools/list (all pages), cached until list_changed or refresh=True."""
+        with self._lock:
+            if self._tools is not None and not refresh:
+                self.stats["tools_list_hits"] += 1
+                return self._tools
+        tools, cursor = [], None
+        while True:
+            msg = self.request("tools/list", {"cursor": cursor} if cursor else {})
+            if "error" in msg:
+                # servers without tools/list: fall back to the list some send in initialize
+                tools = list(self.init_result.get("tools") or [])
+                break
+            res = msg.get("result") or {}
+            tools.extend(res.get("tools") or [])
+            cursor = res.get("nextCursor")
+            if not cursor:
+                break
+        with self._lock:
+            self._tools = tools
+            self.stats["tools_list_fetches"] += 1
+        return tools
+
+    def tools_call(self, name: str, arguments: Dict[str, Any] | None = None,
+                   on_progress: Callable[[Dict[str, Any]], None] | None = None) -> Dict[str, Any]:
+        msg = self.request("tools/call", {"name": name, "arguments": arguments or {}}, on_progress)
+        if "error" in msg:
+            err = msg["error"] or {}
+            return {"ok": False, "error": err.get("message", "remote error"), "code": err.get("code")}
+        return msg.get("result", {})
+
+    def info(self) -> Dict[str, Any]:
+        return {"url": self.url, "transport": "streamable-http" if self.streamable else "json",
+                "session_id": self.session_id, "protocol_version": self.protocol_version,
+                "capabilities": self.capabilities, "server": self.server_info,
+                "tools_cached": self._tools is not None, **self.stats}
+
+_DEFAULT_SESSION: RemoteSession | None = None
+
+def default_session() -> RemoteSession:
+    """Process-wide session for REMOTE_MCP_URL (created on first use)."""
+    global _DEFAULT_SESSION
+    with _SESSION_LOCK:
+        if _DEFAULT_SESSION is None or _DEFAULT_SESSION.url != _url():
+            _DEFAULT_SESSION = RemoteSession()
+        return _DEFAULT_SESSION
 
 def initialize() -> Dict[str, Any]:
-    payload = {"jsonrpc": "2.0", "id": "cli", "method": "initialize", "params": {"protocolVersion": "2025-06-18"}}
-    return _post(payload).get("result", {})
+    return default_session().initialize()
+
+def tools_list() -> Dict[str, Any]:
+    return {"tools": default_session().tools_list()}
 
 def tools_call(name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
-    payload = {"jsonrpc": "2.0", "id": "cli", "method": "tools/call", "params": {"name": name, "arguments": arguments}}
-    return _post(payload).get("result", {})
+    return default_session().tools_call(name, arguments)
+
+def guard_stats() -> Dict[str, Any]:
+    return GUARD.info()
+
+def transport_info() -> Dict[str, Any]:
+    info = {"transport": _TRANSPORT, "pool_size": POOL_SIZE, "keepalive_s": KEEPALIVE_SEC,
+            "retries": RETRIES, "open": _SESSION is not None, "cache": cache_info(),
+            "mcp_session": _DEFAULT_SESSION.info() if _DEFAULT_SESSION is not None else None}
+    if isinstance(_SESSION, requests.Session):
+        pools = _SESSION.get_adapter("https://").poolmanager.pools
+        info["connections_opened"] = sum(pools[k].num_connections for k in pools.keys())
+    return info
 
 # Convenience wrappers
 def remote_echo(text: str) -> Dict[str, Any]:
@@ -35,3 +444,10 @@ def remote_time() -> Dict[str, Any]:
 
 def remote_add(a: float, b: float) -> Dict[str, Any]:
     return tools_call("add", {"a": a, "b": b})
+
+# BearingPro engine on the remote server (stateless tools, any replica)
+def remote_bearing_select(args: Dict[str, Any]) -> Dict[str, Any]:
+    return tools_call("select_bearing", args)
+
+def remote_bearing_verify(args: Dict[str, Any]) -> Dict[str, Any]:
+    return tools_call("verify_point", args)
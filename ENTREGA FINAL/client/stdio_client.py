@@ -1,8 +1,10 @@
 # client/stdio_client.py
 # Robust stdio JSON-RPC client that can spawn a server subprocess (Windows-friendly).
+# Several requests may be in flight from different threads: the reader thread routes
+# each answer (and progress frame) to the waiting call by request id.
 
-import json, subprocess, sys, threading, queue, os, shlex
-from typing import Any, Dict, Optional
+import json, subprocess, sys, threading, queue, os, shlex, itertools
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
 from pathlib import Path
 
 class StdioClient:
@@ -32,8 +34,12 @@ class StdioClient:
             bufsize=0
         )
 
-        self._out_q = queue.Queue()
+        self._pending: Dict[Any, queue.Queue] = {}   # request id -> its messages
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
         self._err_q = queue.Queue()
+        self._ids = itertools.count(1)
+        self.stats = {"calls": 0, "max_in_flight": 0}
         threading.Thread(target=self._read_stdout, daemon=True).start()
         threading.Thread(target=self._read_stderr, daemon=True).start()
 
@@ -52,7 +58,7 @@ class StdioClient:
                 return
             s = line.strip().decode("utf-8", errors="replace")
             if s.startswith("{") or s.startswith("["):
-                self._out_q.put(s)
+                self._route(s)
                 continue
             if ":" in s:
                 k, v = s.split(":", 1)
@@ -72,7 +78,25 @@ class StdioClient:
                     length = 0
                 body = self.proc.stdout.read(length) if length > 0 else b""
                 if body:
-                    self._out_q.put(body.decode("utf-8", errors="replace"))
+                    self._route(body.decode("utf-8", errors="replace"))
+
+    def _route(self, raw: str):
+        try:
+            msg = json.loads(raw)
+        except ValueError:
+            return
+        for m in (msg if isinstance(msg, list) else [msg]):
+            key = m.get("id")
+            if key is None and m.get("method") == "notifications/progress":
+                token = str((m.get("params") or {}).get("progressToken") or "")
+                key = int(token[1:]) if token[1:].isdigit() else None
+            with self._pending_lock:
+                q = self._pending.get(key)
+                if q is None and key in (None, "cli") and "method" not in m and self._pending:
+                    q = self._pending[min(self._pending)]   # error without id: oldest caller
+            if q is not None:
+                q.put(m)
+            # else: other notifications (logs, list_changed) or a late answer to a call that timed out
 
     def _read_stderr(self):
         while True:
@@ -93,8 +117,7 @@ class StdioClient:
             pass
         return "\n".join(lines)
 
-    def call(self, method: str, params: Dict[str, Any]):
-        req = {"jsonrpc":"2.0","id":"cli","method":method,"params":params}
+    def _send(self, req: Dict[str, Any]):
         data = json.dumps(req, ensure_ascii=False).encode("utf-8")
         # ⬇⬇⬇ AÑADIR Content-Type
         header = (
@@ -104,14 +127,17 @@ class StdioClient:
         )
         frame = header + data
         try:
-            self.proc.stdin.write(frame)
-            self.proc.stdin.flush()
+            with self._write_lock:
+                self.proc.stdin.write(frame)
+                self.proc.stdin.flush()
         except Exception as e:
             err = self._drain_stderr()
             raise RuntimeError(f"Failed to write to server stdin: {e}\nServer stderr:\n{err}")
 
+    def _next_message(self, q: queue.Queue) -> Dict[str, Any]:
+        # Timeout is per message: every progress frame keeps the call alive
         try:
-            resp = self._out_q.get(timeout=self.timeout)
+            return q.get(timeout=self.timeout)
         except queue.Empty:
             code = self.proc.poll()
             err = self._drain_stderr()
@@ -119,8 +145,41 @@ class StdioClient:
                 raise RuntimeError(f"Server exited (code={code}). Stderr:\n{err}")
             raise TimeoutError(f"No response within {self.timeout}s. Stderr so far:\n{err}")
 
-        return json.loads(resp)
+    def call_iter(self, method: str, params: Dict[str, Any], progress: bool = True) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Send a request and yield ("progress", params) for each notifications/progress
+        frame, then ("response", message) once. Progress is requested through
+        params._meta.progressToken (MCP).
+        """
+        req_id = next(self._ids)
+        params = dict(params or {})
+        if progress:
+            params["_meta"] = {**(params.get("_meta") or {}), "progressToken": f"p{req_id}"}
+        q: queue.Queue = queue.Queue()
+        with self._pending_lock:
+            self._pending[req_id] = q
+            self.stats["calls"] += 1
+            self.stats["max_in_flight"] = max(self.stats["max_in_flight"], len(self._pending))
+        try:
+            self._send({"jsonrpc": "2.0", "id": req_id, "method": method, "params": params})
+            while True:
+                msg = self._next_message(q)
+                if "id" not in msg and msg.get("method") == "notifications/progress":
+                    yield "progress", msg.get("params") or {}
+                    continue
+                yield "response", msg
+                return
+        finally:
+            with self._pending_lock:
+                self._pending.pop(req_id, None)
 
+    def call(self, method: str, params: Dict[str, Any],
+             on_progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        for kind, msg in self.call_iter(method, params, progress=on_progress is not None):
+            if kind == "progress":
+                on_progress(msg)
+            else:
+                return msg
 
     def close(self):
         try:
@@ -0,0 +1,212 @@
+# client/streamable_http.py
+# MCP streamable-HTTP transport (FastMCP / mcp-on-cloudrun/server.py).
+# - POST one JSON-RPC message with Accept: application/json, text/event-stream; the
+#   server answers 202 (notification), one JSON body, or an SSE stream that carries
+#   notifications (progress, logs) and finally the response
+# - SSEParser is incremental: events are yielded as bytes arrive, not when the body ends
+# - A dropped stream is resumed with GET + Last-Event-ID (servers with an event store
+#   replay what we missed); listen() keeps a long-lived GET stream for server messages
+# Streams use their own pooled requests.Session so long-lived SSE connections do not
+# hold slots of the request pool in client/remote_clients.py.
+
+import codecs, json, threading, time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+ACCEPT = "application/json, text/event-stream"
+MAX_RESUMES = 3
+DEFAULT_RETRY_MS = 1000
+
+@dataclass
+class SSEEvent:
+    event: str = "message"
+    data: str = ""
+    id: Optional[str] = None
+    retry: Optional[int] = None
+
+class SSEParser:
+    """Incremental text/event-stream parser (WHATWG rules): feed bytes, get events."""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._buf = ""
+        self._started = False
+        self._event, self._data, self._id, self._retry = "", [], None, None
+        self.last_event_id: Optional[str] = None
+        self.retry_ms: Optional[int] = None
+
+    def feed(self, chunk: bytes) -> List[SSEEvent]:
+        text = self._decoder.decode(chunk)
+        if not self._started and text:
+            self._started = True
+            text = text.lstrip("\ufeff")
+        self._buf += text
+        out = []
+        while True:
+            i = min((p for p in (self._buf.find("\r"), self._buf.find("\n")) if p >= 0), default=-1)
+            if i < 0:
+                break
+            if self._buf[i] == "\r":
+                if i + 1 == len(self._buf):
+                    break                   # wait: a "\n" may follow in the next chunk
+                end = i + 2 if self._buf[i + 1] == "\n" else i + 1
+            else:
+                end = i + 1
+            line, self._buf = self._buf[:i], self._buf[end:]
+            ev = self._line(line)
+            if ev is not None:
+                out.append(ev)
+        return out
+
+    def _line(self, line: str) -> Optional[SSEEvent]:
+        if line == "":
+            return self._dispatch()
+        if line.startswith(":"):
+            return None                     # comment / keep-alive
+        field, sep, value = line.partition(":")
+        if sep and value.startswith(" "):
+            value = value[1:]
+        if field == "event":
+            self._event = value
+        elif field == "data":
+            self._data.append(value)
+        elif field == "id" and "\0" not in value:
+            self._id = value                # committed at dispatch: a half-received event is not "seen"
+        elif field == "retry" and value.isdigit():
+            self._retry = self.retry_ms = int(value)
+        return None
+
+    def _dispatch(self) -> Optional[SSEEvent]:
+        if self._id is not None:
+            self.last_event_id = self._id
+        data, event, retry = self._data, self._event, self._retry
+        self._event, self._data, self._id, self._retry = "", [], None, None
+        if not data:
+            return None
+        return SSEEvent(event or "message", "\n".join(data), self.last_event_id, retry)
+
+# ---------- HTTP side ----------
+_SESSION: requests.Session | None = None
+_LOCK = threading.Lock()
+
+def stream_session() -> requests.Session:
+    global _SESSION
+    with _LOCK:
+        if _SESSION is None:
+            _SESSION = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=10)
+            _SESSION.mount("http://", adapter)
+            _SESSION.mount("https://", adapter)
+        return _SESSION
+
+class StreamError(RuntimeError):
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+class Reply:
+    """Answer to one POST: iterate it for the JSON-RPC messages, as they arrive."""
+
+    def __init__(self, url: str, resp: requests.Response, headers: Dict[str, str], timeout: float):
+        self.url, self.headers, self.status = url, resp.headers, resp.status_code
+        self.is_sse = "text/event-stream" in resp.headers.get("Content-Type", "")
+        self.last_event_id: Optional[str] = None
+        self.resumes = 0
+        self._resp, self._req_headers, self._timeout = resp, headers, timeout
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        resp = self._resp
+        try:
+            if resp.status_code == 202 or not (self.is_sse or resp.content):
+                return
+            if not self.is_sse:
+                body = resp.json()
+                yield from (body if isinstance(body, list) else [body])
+                return
+            yield from self._events(resp)
+        finally:
+            resp.close()
+
+    def _events(self, resp) -> Iterator[Dict[str, Any]]:
+        parser = SSEParser()
+        while True:
+            try:
+                for chunk in resp.iter_content(chunk_size=None):
+                    for ev in parser.feed(chunk):
+                        if ev.id is not None:
+                            self.last_event_id = ev.id
+                        if ev.event == "message" and ev.data.strip():
+                            yield json.loads(ev.data)
+                return                                   # server closed the stream normally
+            except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError):
+                if self.last_event_id is None or self.resumes >= MAX_RESUMES:
+                    raise
+            # dropped mid-stream: ask the server to replay everything after our last event
+            self.resumes += 1
+            resp.close()
+            time.sleep((parser.retry_ms or 0) / 1000)
+            resp = open_stream(self.url, {**self._req_headers, "Last-Event-ID": self.last_event_id},
+                               self._timeout)
+            self._resp = resp
+            parser = SSEParser()
+
+def _check(resp: requests.Response):
+    if resp.status_code >= 400:
+        body = resp.text[:300]
+        resp.close()
+        raise StreamError(f"HTTP {resp.status_code}: {body}", resp.status_code)
+
+def post(url: str, message: Dict[str, Any], headers: Dict[str, str] | None = None,
+         timeout: float = 30.0) -> Reply:
+    """POST one message; iterate the Reply for notifications + the response."""
+    h = {"Accept": ACCEPT, "Content-Type": "application/json", **(headers or {})}
+    resp = stream_session().post(url, data=json.dumps(message), headers=h, stream=True, timeout=timeout)
+    _check(resp)
+    return Reply(url, resp, {k: v for k, v in h.items() if k != "Content-Type"}, timeout)
+
+def open_stream(url: str, headers: Dict[str, str] | None = None, timeout: float = 30.0) -> requests.Response:
+    """GET an SSE stream (resumption with Last-Event-ID, or server-initiated messages)."""
+    h = {**(headers or {}), "Accept": "text/event-stream"}
+    resp = stream_session().get(url, headers=h, stream=True, timeout=(timeout, None))
+    _check(resp)
+    return resp
+
+def listen(url: str, headers: Dict[str, str] | None = None, stop: Callable[[], bool] = lambda: False,
+           timeout: float = 30.0) -> Iterator[Dict[str, Any]]:
+    """
+    Server-initiated messages over a long-lived GET stream; reconnects after the
+    server's retry delay, resuming from the last event id. Ends if the server has
+    no such stream (405) or stop() returns True.
+    """
+    last_id, retry_ms = None, DEFAULT_RETRY_MS
+    while not stop():
+        h = dict(headers or {})
+        if last_id:
+            h["Last-Event-ID"] = last_id
+        try:
+            resp = open_stream(url, h, timeout)
+        except StreamError as e:
+            if e.status == 405:
+                return
+            raise
+        except requests.ConnectionError:
+            time.sleep(retry_ms / 1000)
+            continue
+        parser = SSEParser()
+        try:
+            for chunk in resp.iter_content(chunk_size=None):
+                for ev in parser.feed(chunk):
+                    if ev.event == "message" and ev.data.strip():
+                        yield json.loads(ev.data)
+                last_id = parser.last_event_id or last_id
+                retry_ms = parser.retry_ms or retry_ms
+                if stop():
+                    return
+        except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError):
+            pass
+        finally:
+            resp.close()
+        time.sleep(retry_ms / 1000)
@@ -1,22 +1,26 @@
 # host/chat.py
 # Terminal UI with colors + menu (HCI-aware), planner, and MCP local/remote integration.
 # - LLM on/off (Anthropic wrapper)
-# - Planner mode (LLM proposes tool calls; host executes MCP)
+# - Planner mode (native LLM tool use; host runs the requested MCP tools concurrently)
 # - Local BearingPro MCP (catalog/select/verify)
 # - Remote MCP (Cloud Run demo: init/time/add)
 # - Colors + menu + help + status line (UI/UX improvements)
+# - asyncio loop: stdin reader thread, cancellable LLM/MCP tasks (Ctrl+C), spinner, warm-up
 #
 
 
-import os, re, json, time
+import asyncio, itertools, os, queue, re, json, signal, sys, threading, time
+from concurrent.futures import Future, InvalidStateError
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # LLM wrapper (optional)
 try:
     from host.llm_anthropic import LLMAnthropic
 except Exception:
     LLMAnthropic = None
+from host.context import ContextWindow
+from host.speculative import Speculator
 
 # UI colors on Windows
 try:
@@ -28,9 +32,15 @@ except Exception:
 
 # Local MCP helpers (BearingPro)
 from client.local_clients import bearingpro_select, bearingpro_verify, bearingpro_catalog
+from client.local_clients import bearingpro_whatif_open, bearingpro_whatif_update, bearingpro_whatif_close
+from client.local_clients import bearingpro_shared, bearingpro_shared_close, bearingpro_sweep
+from client.local_clients import bearingpro_tools, tools_call
 
 # Remote MCP helpers (Cloud Run)
 from client.remote_clients import initialize as remote_init, remote_echo, remote_time, remote_add
+from client.remote_clients import default_session as remote_session
+from client.remote_async import run_many as remote_run_many, run_fan_out as remote_fan_out
+from client.remote_async import close as remote_async_close
 
 LOG_DIR = Path("logs"); LOG_DIR.mkdir(exist_ok=True)
 CHAT_LOG = LOG_DIR / "chat.log"
@@ -87,87 +97,144 @@ def c(txt: str, key: str) -> str:
     return THEME[key] + txt + THEME["RESET"]
 
 # =========================
-# Planner spec + prompts
+# Planner: native tool use
 # =========================
-TOOLS_SPEC = {
-    "tools": [
-        {
-            "name": "select_bearing",
-            "description": "Select bearing candidates by loads",
-            "args_schema": {"Fr_N": "float", "Fa_N": "float", "rpm": "float", "L10h_target": "float"}
-        },
-        {
-            "name": "verify_point",
-            "description": "Verify model at operating point",
-            "args_schema": {"model":"string","Fr_N":"float","Fa_N":"float","rpm":"float","L10h_target":"float"}
-        },
-        {
-            "name": "catalog_list",
-            "description": "List catalog models",
-            "args_schema": {}
-        }
-    ],
-    "response_format": {"action":"call_tool|answer","tool":"name if call_tool","args":"object","text":"answer text"}
-}
+# Static system prefixes: identical every turn, so the provider caches them (cache_control)
+CHAT_SYSTEM = (
+    "Eres el asistente técnico de BearingPro (selección y verificación de rodamientos). "
+    "Responde en español, breve y claro. No inventes datos de catálogo ni resultados de cálculo."
+)
+PLANNER_SYSTEM = (
+    CHAT_SYSTEM + " Usa las herramientas para seleccionar, verificar o consultar el catálogo; si necesitas "
+    "varias consultas independientes (p. ej. verificar varios modelos), pídelas todas a la vez. "
+    "Si faltan parámetros imprescindibles, pide SOLO lo necesario. Con los resultados, responde solo con texto."
+)
+MAX_TOOL_ROUNDS = int(os.getenv("HOST_PLANNER_ROUNDS", "3"))   # tool rounds per turn; then a text answer
+PLANNER_SKIP = ("whatif_", "sweep")   # stateful sessions / long sweeps keep their own commands
+REMOTE_PREFIX = "remoto_"
+_PLANNER_TOOLS: Optional[List[Dict[str, Any]]] = None
+SPEC = Speculator()   # speculative BearingPro call from detect_intent while the LLM plans
+
+def _llm_tool(t: Dict[str, Any], name: str) -> Dict[str, Any]:
+    # MCP tool (inputSchema) -> provider tool definition (input_schema)
+    schema = t.get("inputSchema") or {"type": "object", "properties": {}}
+    return {"name": name, "description": t.get("description") or t["name"], "input_schema": schema}
+
+def planner_tools() -> List[Dict[str, Any]]:
+    """
+    Tool definitions for the LLM from the servers' tools/list: BearingPro (BEARINGPRO_CMD)
+    and, with REMOTE_MCP_URL, the remote server's tools as remoto_<name>, minus the ones
+    BearingPro already provides. PLANNER_SKIP applies to both. Built once (same list
+    every turn, so it stays in the prompt cache).
+    """
+    global _PLANNER_TOOLS
+    if _PLANNER_TOOLS is not None:
+        return _PLANNER_TOOLS
+    tools, local, complete = [], set(), True
+    if os.getenv("BEARINGPRO_CMD"):
+        try:
+            listed = bearingpro_tools()
+            local = {t["name"] for t in listed}
+            tools += [_llm_tool(t, t["name"]) for t in listed if not t["name"].startswith(PLANNER_SKIP)]
+        except Exception as e:
+            complete = False; log(f"PLANNER_TOOLS(bearingpro): {e}")
+    if os.getenv("REMOTE_MCP_URL"):
+        try:
+            tools += [_llm_tool(t, REMOTE_PREFIX + t["name"]) for t in remote_session().tools_list()
+                      if t["name"] not in local and not t["name"].startswith(PLANNER_SKIP)]
+        except Exception as e:
+            complete = False; log(f"PLANNER_TOOLS(remote): {e}")
+    if complete:      # a server that failed is retried next turn
+        _PLANNER_TOOLS = tools
+    return tools
 
-def planner_prompt(user_text: str) -> str:
-    # LLM: propose a JSON plan to use tools when needed
-    return (
-        "Eres un asistente técnico. Usa herramientas cuando el usuario pida selección/verificación de rodamientos. "
-        "Responde SIEMPRE con JSON válido: {\"action\":\"call_tool|answer\",\"tool\":\"...\",\"args\":{...},\"text\":\"...\"}. "
-        "No inventes datos; si faltan parámetros, pide SOLO lo necesario. "
-        f"TOOLS_SPEC={json.dumps(TOOLS_SPEC, ensure_ascii=False)} "
-        f"USUARIO: {user_text}"
-    )
-
-def planner_observation_prompt(plan_json: dict, observation: dict) -> str:
-    # LLM: produce final natural answer using the observation
-    return (
-        "Observación de tool (JSON abajo). Genera respuesta final breve y clara para el usuario (solo texto):\n"
-        + json.dumps({"plan": plan_json, "observation": observation}, ensure_ascii=False)
-    )
-
-def try_parse_json(s: str):
+def call_tool(name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one tool_use block on its MCP server; errors become a result the LLM can read."""
     try:
-        return json.loads(s)
-    except Exception:
-        m = re.search(r"\{.*\}", s, re.S)
-        if m:
-            try: return json.loads(m.group(0))
-            except Exception: pass
-    return None
-
-def run_planner_turn(llm, ctx_llm, user_text: str):
-    # 1) Ask LLM for a plan
-    plan_txt = llm.chat(ctx_llm, planner_prompt(user_text))
-    plan = try_parse_json(plan_txt) or {"action": "answer", "text": plan_txt}
-
-    if plan.get("action") == "call_tool":
-        tool = (plan.get("tool") or "").strip()
-        args = plan.get("args") or {}
-        # 2) Execute tool via local MCP
-        if tool == "select_bearing":
-            obs = bearingpro_select(args)
-        elif tool == "verify_point":
-            obs = bearingpro_verify(args)
-        elif tool == "catalog_list":
-            obs = bearingpro_catalog()
-        else:
-            obs = {"ok": False, "error": f"unknown tool requested: {tool}"}
-
-        # 3) Feed observation back to LLM for final answer
-        final_txt = llm.chat(ctx_llm + [{"role":"user","content": user_text}], planner_observation_prompt(plan, obs))
-        return final_txt, {"plan": plan, "observation": obs}
-
-    # If no call_tool, return direct answer
-    return plan.get("text") or "(sin respuesta)", {"plan": plan}
+        if name.startswith(REMOTE_PREFIX):
+            return remote_session().tools_call(name[len(REMOTE_PREFIX):], args)
+        resp = tools_call(bearingpro_shared(), name, args)
+        if "error" in resp:
+            return {"ok": False, "error": (resp["error"] or {}).get("message", "tool error")}
+        return resp.get("result", {})
+    except Exception as e:
+        return {"ok": False, "error": str(e)}
+
+def _timed_call(name: str, args: Dict[str, Any]):
+    t0 = time.perf_counter()
+    out = call_tool(name, args)
+    return out, round((time.perf_counter() - t0) * 1000, 1)
+
+def _blocks(msg) -> List[Dict[str, Any]]:
+    # assistant content to send back in the next round (text + tool_use blocks)
+    out = []
+    for b in msg.content:
+        if b.type == "text" and b.text:
+            out.append({"type": "text", "text": b.text})
+        elif b.type == "tool_use":
+            out.append({"type": "tool_use", "id": b.id, "name": b.name, "input": b.input})
+    return out
+
+def planner_prefix() -> str:
+    return c("Host (Planner):", "OK")
+
+async def run_planner_turn(llm, ctx: ContextWindow, user_text: str):
+    """
+    Planner turn on the provider's tool-use API: the model answers or asks for tool
+    calls; all tool_use blocks of a round run concurrently and their results go back
+    together in one message. Prints the answer (streamed); returns it + debug info.
+    The likely BearingPro call (detect_intent) starts before the LLM is asked; if the
+    model requests the same call, its result is reused.
+    """
+    if os.getenv("BEARINGPRO_CMD"):
+        warm("bearingpro", bearingpro_shared)
+        SPEC.begin(user_text, lambda tool, args: in_thread(_timed_call, tool, args))
+    tools = await run_task("Herramientas", planner_tools)
+    messages = llm.build_messages(ctx.messages(), user_text)
+    summary = ctx.system_summary()
+    usage: Dict[str, Any] = {}
+    calls: List[Dict[str, Any]] = []
+    answer, rounds = "", 0
+    for rounds in range(1, MAX_TOOL_ROUNDS + 2):
+        choice = {"type": "none"} if rounds > MAX_TOOL_ROUNDS else None
+        msg, shown = await stream_call("Planificando" if rounds == 1 else "Redactando", planner_prefix(), llm,
+                                       lambda on_delta: llm.respond(messages, tools, system=PLANNER_SYSTEM,
+                                                                    system_extra=summary, on_delta=on_delta,
+                                                                    tool_choice=choice))
+        usage = add_usage(usage, llm.last_stats)
+        answer = "".join(b.text for b in msg.content if b.type == "text").strip()
+        uses = [b for b in msg.content if b.type == "tool_use"]
+        if msg.stop_reason != "tool_use" or not uses:
+            if not shown:
+                print(planner_prefix(), answer or "(sin respuesta)")
+            break
+        t0 = time.perf_counter()
+        results = await run_parallel(" + ".join(b.name for b in uses),
+                                     [SPEC.claim(b.name, b.input) or (_timed_call, b.name, b.input) for b in uses])
+        wall = round((time.perf_counter() - t0) * 1000, 1)
+        print(c(f"(herramientas: {', '.join(b.name for b in uses)} · {wall:.0f} ms"
+                f"{' en paralelo' if len(uses) > 1 else ''})", "MUTED"))
+        for b, (out, ms) in zip(uses, results):
+            calls.append({"round": rounds, "tool": b.name, "args": b.input, "result": out, "ms": ms})
+        messages.append({"role": "assistant", "content": _blocks(msg)})
+        messages.append({"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": b.id, "content": json.dumps(out, ensure_ascii=False),
+             **({"is_error": True} if isinstance(out, dict) and out.get("ok") is False else {})}
+            for b, (out, _) in zip(uses, results)]})
+    spec = SPEC.settle()
+    if spec is not None:
+        info = SPEC.info()
+        print(c(f"(especulativo: {spec['tool']} " + (f"reutilizado · {spec['saved_ms']:.0f} ms ahorrados"
+                if spec["hit"] else "descartado") + f" · aciertos {info['hits']}/{info['hits'] + info['misses']})",
+                "MUTED"))
+    return answer or "(sin respuesta)", {"rounds": rounds, "tool_calls": calls, "usage": usage, "speculation": spec}
 
 # =========================
 # Simple guided forms (HCI)
 # =========================
 def ask_float(prompt: str, default: float) -> float:
     # simple numeric question with default
-    raw = input(c(f"{prompt} [{default}]: ", "INPUT")).strip()
+    raw = read_line(c(f"{prompt} [{default}]: ", "INPUT")).strip()
     if not raw: return float(default)
     try:
         return float(raw)
@@ -176,7 +243,7 @@ def ask_float(prompt: str, default: float) -> float:
         return float(default)
 
 def ask_text(prompt: str, default: str = "") -> str:
-    raw = input(c(f"{prompt}{f' [{default}]' if default else ''}: ", "INPUT")).strip()
+    raw = read_line(c(f"{prompt}{f' [{default}]' if default else ''}: ", "INPUT")).strip()
     return raw or default
 
 def guided_selection():
@@ -198,7 +265,52 @@ def guided_verify():
     rpm = ask_float("rpm", 1800.0)
     L10h = ask_float("L10h objetivo (h)", 12000.0)
     args = {"model": model, "Fr_N": Fr, "Fa_N": Fa, "rpm": rpm, "L10h_target": L10h}
-    out = bearingpro_verify(args)
+    out = bearingpro_whatif_open(args)
+    sid = out.get("session_id")
+    if not sid:
+        return out
+    # What-if loop: send only the changed parameters; the server recomputes incrementally
+    try:
+        while True:
+            print(c("Verificación:", "INFO"), pretty(out))
+            raw = ask_text("¿Qué cambias? (ej. rpm=2400 Fa=300, Enter = terminar)")
+            if not raw:
+                return out
+            deltas = _parse_deltas(raw)
+            if not deltas:
+                print(c("No entendí el cambio. Usa clave=valor (Fr, Fa, rpm, L10h, T, conf).", "WARN"))
+                continue
+            out = bearingpro_whatif_update(sid, deltas)
+            if not out.get("ok"):
+                return out
+    finally:
+        try:
+            bearingpro_whatif_close(sid)
+        except Exception:
+            pass
+
+def show_progress(p: Dict[str, Any]):
+    # Live progress line for notifications/progress (overwritten in place)
+    done, total = p.get("progress", 0), p.get("total") or 0
+    pct = f"{100.0 * done / total:5.1f}%" if total else "..."
+    best = ((p.get("partial") or {}).get("models") or [{}])[0]
+    tail = f" | mejor: {best.get('model')} pass={best.get('pass_rate')}" if best else ""
+    print("\r" + c(f"Progreso {pct} {p.get('message') or ''}{tail}", "MUTED") + " " * 8, end="", flush=True)
+
+def guided_sweep():
+    print(c("\nBarrido de diseño (rango min..max, puntos por eje):", "INFO"))
+    n = int(ask_float("Puntos por eje", 20))
+    axis = lambda name, lo, hi: {"start": ask_float(f"{name} min", lo), "stop": ask_float(f"{name} max", hi), "num": n}
+    args = {
+        "Fr_N": axis("Fr (N)", 500.0, 8000.0),
+        "Fa_N": axis("Fa (N)", 0.0, 3000.0),
+        "rpm": axis("rpm", 500.0, 6000.0),
+        "temperature_C": [25, 80, 110],
+        "reliability_percent": [90, 95, 99],
+        "L10h_target": ask_float("L10h objetivo (h)", 12000.0),
+    }
+    out = bearingpro_sweep(args, on_progress=show_progress)
+    print()
     return out
 
 # =========================
@@ -236,8 +348,9 @@ def ui_help():
     print("- catálogo")
     print("- selección Fr=.. Fa=.. rpm=.. L10h=..")
     print("- verificar <modelo> con Fr=.. Fa=.. rpm=.. L10h=..")
-    print("- remoto init | remoto hora | remoto suma A B")
-    print("- modo planner on/off | modo llm on/off | tema oscuro | tema claro | menu | ayuda")
+    print("- barrido (sweep guiado con progreso en vivo)")
+    print("- remoto init | remoto hora | remoto suma A B | remoto todo | remoto replicas | remoto tools")
+    print("- modo planner on/off | modo llm on/off | contexto | tema oscuro | tema claro | menu | ayuda")
     print(c("\nAtajos:", "INFO"))
     print("1..9, 0 (ver Menú)")
     print(c("\nNotas HCI:", "MUTED"))
@@ -262,6 +375,20 @@ def _parse_args_verify(text: str):
     base["model"] = model
     return base
 
+DELTA_ALIASES = {
+    "fr": "Fr_N", "fa": "Fa_N", "rpm": "rpm", "l10h": "L10h_target",
+    "t": "temperature_C", "temp": "temperature_C", "conf": "reliability_percent",
+}
+
+def _parse_deltas(text: str) -> Dict[str, float]:
+    # "rpm=2400 Fa=300" -> {"rpm": 2400.0, "Fa_N": 300.0}
+    out = {}
+    for k, v in re.findall(r"([A-Za-z0-9_]+)\s*=\s*([-+]?[0-9\.]+)", text):
+        key = DELTA_ALIASES.get(k.lower())
+        if key:
+            out[key] = float(v)
+    return out
+
 def handle_bearing_selection(user_text: str):
     args = _parse_args_selection(user_text)
     return bearingpro_select(args)
@@ -276,13 +403,255 @@ def handle_bearing_verify(user_text: str):
         return {"ok": False, "message": f"me falta {', '.join(need)}. ¿Me lo das?"}
     return bearingpro_verify(args)
 
+# =========================
+# Async runtime: input reader, cancellable tasks, spinner, warm-up
+# =========================
+SPINNER_FRAMES = "|/-\\"
+SPINNER_DELAY = 0.15   # s; calls that finish sooner never show the spinner (no flicker)
+
+class Interrupted(asyncio.CancelledError):
+    """The user cancelled the running task (Ctrl+C); the host goes back to the prompt."""
+
+class InputReader:
+    """
+    The only thread that reads stdin. Prompts are queued and answered through
+    futures, so the event loop never blocks on input() and guided forms running in
+    worker threads read through the same place. A line typed for a prompt that was
+    abandoned (Ctrl+C) is handed to the next prompt instead of being lost.
+    """
+
+    def __init__(self):
+        self._q: "queue.Queue[tuple[str, Future]]" = queue.Queue()
+        self._spare: Optional[str] = None
+        self.current: Optional[Future] = None
+        threading.Thread(target=self._run, name="stdin-reader", daemon=True).start()
+
+    def _run(self):
+        while True:
+            prompt, fut = self._q.get()
+            if fut.cancelled():
+                continue
+            self.current = fut
+            try:
+                if self._spare is not None:
+                    line, self._spare = self._spare, None
+                else:
+                    line = input(prompt)
+            except BaseException as e:   # EOFError: stdin closed
+                try:
+                    fut.set_exception(e)
+                except InvalidStateError:
+                    pass
+                continue
+            finally:
+                self.current = None
+            try:
+                fut.set_result(line)
+            except InvalidStateError:    # abandoned while the user typed
+                self._spare = line
+
+    def ask(self, prompt: str) -> Future:
+        fut: Future = Future()
+        self._q.put((prompt, fut))
+        return fut
+
+    def abandon(self):
+        fut = self.current
+        if fut is not None:
+            fut.cancel()
+
+    def waiting_abandoned(self) -> bool:
+        fut = self.current
+        return fut is not None and fut.cancelled()
+
+READER: Optional[InputReader] = None
+RUNNING: set = set()          # tasks Ctrl+C cancels
+USER_CANCELLED: set = set()
+WARM: Dict[str, asyncio.Future] = {}
+
+def read_line(prompt: str) -> str:
+    # guided forms run in worker threads: they read through the host's reader
+    return READER.ask(prompt).result() if READER is not None else input(prompt)
+
+class Spinner:
+    """Spinner + elapsed time drawn by a loop task (label=None or no tty: nothing); stop() clears it."""
+
+    def __init__(self, label: Optional[str]):
+        self.label, self.drawn = label, False
+        self._task = asyncio.create_task(self._run()) if label and sys.stdout.isatty() else None
+
+    async def _run(self):
+        await asyncio.sleep(SPINNER_DELAY)
+        t0 = time.perf_counter() - SPINNER_DELAY
+        for i in itertools.count():
+            frame = SPINNER_FRAMES[i % len(SPINNER_FRAMES)]
+            print("\r" + c(f"{frame} {self.label}… {time.perf_counter() - t0:4.1f}s", "MUTED"), end="", flush=True)
+            self.drawn = True
+            await asyncio.sleep(0.1)
+
+    def stop(self):
+        # runs on the loop thread, so the task cannot draw again after this
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.drawn:
+            print("\r\033[K", end="", flush=True)
+            self.drawn = False
+
+def in_thread(fn, *args) -> asyncio.Future:
+    """fn(*args) on a daemon thread; an abandoned (cancelled) call never delays exit."""
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+
+    def settle(ok: bool, value):
+        if not fut.done():
+            (fut.set_result if ok else fut.set_exception)(value)
+
+    def work():
+        try:
+            res = (True, fn(*args))
+        except BaseException as e:
+            res = (False, e)
+        try:
+            loop.call_soon_threadsafe(settle, *res)
+        except RuntimeError:     # loop already closed (host exited meanwhile)
+            pass
+
+    threading.Thread(target=work, name=getattr(fn, "__name__", "call"), daemon=True).start()
+    return fut
+
+class StreamStopped(Exception):
+    """Raised inside a streamed LLM call whose task was cancelled (closes the stream)."""
+
+async def _run(spin: Spinner, fn, args, stop: Optional[threading.Event] = None):
+    return await _await(spin, in_thread(fn, *args), stop)
+
+async def _await(spin: Spinner, task: asyncio.Future, stop: Optional[threading.Event] = None):
+    RUNNING.add(task)
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if stop is not None:
+            stop.set()
+        if task in USER_CANCELLED:
+            raise Interrupted() from None
+        raise
+    finally:
+        RUNNING.discard(task)
+        USER_CANCELLED.discard(task)
+        spin.stop()
+
+async def run_task(label: Optional[str], fn, *args):
+    """
+    Run a blocking call (LLM, MCP) in a worker thread as a task Ctrl+C can cancel,
+    with a spinner + elapsed time (label=None: no spinner, e.g. forms or calls that
+    print their own progress). A cancelled call's thread finishes in the background
+    and its result is dropped.
+    """
+    return await _run(Spinner(label), fn, args)
+
+async def run_parallel(label: str, calls) -> list:
+    """
+    Several blocking calls [(fn, *args), ...] at once, one worker thread each, under one
+    spinner; results in order. An entry may also be a call already started with
+    in_thread (a speculated one). Ctrl+C cancels them all (as one task).
+    """
+    spin = Spinner(label)
+    futs = [call if isinstance(call, asyncio.Future) else in_thread(*call) for call in calls]
+    return await _await(spin, asyncio.gather(*futs))
+
+async def run_stream(label: str, prefix: str, llm, history, user_text: str, **kw) -> str:
+    """
+    Streamed LLM answer: spinner until the first token, then prefix + the text as it
+    arrives. Deltas are printed from the loop thread (never over the spinner); a
+    cancelled task stops the stream at its next delta. TTFT and tokens/s are
+    printed after the answer and logged. kw (system prompts) go to llm.chat.
+    """
+    answer, shown = await stream_call(label, prefix, llm,
+                                      lambda on_delta: llm.chat(history, user_text, on_delta=on_delta, **kw))
+    if not shown:
+        print(prefix, answer)
+    return answer
+
+async def stream_call(label: str, prefix: str, llm, fn):
+    """run_stream for any streamed call fn(on_delta) (e.g. llm.respond); returns (result, text shown?)."""
+    loop = asyncio.get_running_loop()
+    spin, stop, shown = Spinner(label), threading.Event(), []
+
+    def render(delta: str):
+        if not shown:
+            spin.stop()
+            print(prefix, end=" ", flush=True)
+            shown.append(True)
+        print(delta, end="", flush=True)
+
+    def on_delta(delta: str):
+        if stop.is_set():
+            raise StreamStopped()
+        loop.call_soon_threadsafe(render, delta)
+
+    try:
+        result = await _run(spin, fn, (on_delta,), stop)
+    finally:
+        if shown:
+            print()
+    st = getattr(llm, "last_stats", None) or {}
+    if st.get("ttft_ms") is not None:
+        print(c(f"(TTFT {st['ttft_ms']:.0f} ms · {st.get('tokens_per_s') or 0:.0f} tok/s · "
+                f"{st.get('output_tokens', 0)} tokens)", "MUTED"))
+        log(f"LLM_STATS: {json.dumps(st)}")
+    return result, bool(shown)
+
+def add_usage(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    # usage of a turn made of several LLM calls (planner: tool rounds + answer)
+    keys = ("input_tokens", "output_tokens", "cache_read_input_tokens", "cache_creation_input_tokens")
+    return {k: (a.get(k) or 0) + (b.get(k) or 0) for k in keys}
+
+def remember(ctx: ContextWindow, user: str, answer: str, sent: int, usage: Dict[str, Any]):
+    """Record the turn, report the context savings, compact in the background if over budget."""
+    rep = ctx.report(sent, usage)
+    ctx.add(user, answer)
+    cache = ""
+    if rep["cache_read"] or rep["cache_write"]:
+        cache = f", caché: {rep['cache_read']} leídos / {rep['cache_write']} escritos"
+    print(c(f"(contexto: {rep['sent']} tok de historial enviados, {rep['saved_window']} ahorrados por ventana{cache})",
+            "MUTED"))
+    log(f"CTX: {json.dumps(rep)}")
+    if ctx.over_budget():
+        warm("contexto", ctx.compact)
+
+def warm(name: str, fn) -> asyncio.Future:
+    """Start fn in the background unless it is already running (warm-ups are idempotent)."""
+    t = WARM.get(name)
+    if t is None or t.done():
+        t = WARM[name] = in_thread(fn)
+        # a failed warm-up is not an error yet: the real call retries and reports it
+        t.add_done_callback(lambda t: t.cancelled() or t.exception() is None
+                            or log(f"WARM({name}): {t.exception()}"))
+    return t
+
+def on_interrupt():
+    # Ctrl+C: cancel the running task (back to the prompt); at the prompt nothing runs,
+    # so abandoning the prompt ends the host
+    for t in RUNNING:
+        USER_CANCELLED.add(t)
+        t.cancel()
+    if READER is not None:
+        READER.abandon()
+
+def install_interrupt(loop: asyncio.AbstractEventLoop, handler):
+    try:
+        loop.add_signal_handler(signal.SIGINT, handler)
+    except (NotImplementedError, RuntimeError):   # Windows event loops
+        signal.signal(signal.SIGINT, lambda *_: loop.call_soon_threadsafe(handler))
+
 # =========================
 # Main
 # =========================
 THEME = THEMES["DARK"]  # default theme
 
-def main():
-    global THEME
+async def main_async():
+    global THEME, READER
 
     # LLM setup
     use_llm = True
@@ -298,146 +667,208 @@ def main():
         use_llm = False
 
     planner_on = False
-    ctx_llm: List[Dict[str, str]] = []
+    # sliding window + summary of older turns (the summarizer uses the LLM when it is on)
+    ctx = ContextWindow(summarizer=lambda prev, turns: llm.summarize(prev, turns) if use_llm and llm else "")
+
+    READER = InputReader()
+    install_interrupt(asyncio.get_running_loop(), on_interrupt)
+    # Warm-up while the user reads the menu: BearingPro process + remote handshake
+    if os.getenv("BEARINGPRO_CMD"):
+        warm("bearingpro", bearingpro_shared)
+    if os.getenv("REMOTE_MCP_URL"):
+        warm("remoto", remote_init)
 
     ui_banner()
     ui_status(use_llm, planner_on)
     ui_menu()
-    print(c("\nEscribe un número (0–9) o un comando. 'ayuda' para más info.", "MUTED"))
+    print(c("\nEscribe un número (0–9) o un comando. 'ayuda' para más info. Ctrl+C cancela la tarea en curso.", "MUTED"))
 
     while True:
-        user = input(c("\nTú: ", "INPUT")).strip()
-
-        # Quick menu actions (shortcuts)
-        if user == "0" or user.lower() in {"salir","exit","quit"}:
-            print(c("Hasta luego 👋", "INFO"))
-            break
+        try:
+            user = (await asyncio.wrap_future(READER.ask(c("\nTú: ", "INPUT")))).strip()
+        except (EOFError, asyncio.CancelledError):   # stdin closed / Ctrl+C at the prompt
+            user = "salir"
 
-        # Theme toggle
-        if user.lower() == "tema oscuro":
-            THEME = THEMES["DARK"]; ui_banner(); ui_status(use_llm, planner_on); continue
-        if user.lower() == "tema claro":
-            THEME = THEMES["LIGHT"]; ui_banner(); ui_status(use_llm, planner_on); continue
-
-        # Show menu/help
-        if user == "9" or user.lower() in {"ayuda","help"}:
-            ui_help(); continue
-        if user.lower() == "menu":
-            ui_menu(); continue
-
-        # Planner toggle
-        if user == "7" or user.lower() == "modo planner on":
-            planner_on = True; print(c("Planner activado.", "OK")); ui_status(use_llm, planner_on); continue
-        if user.lower() == "modo planner off":
-            planner_on = False; print(c("Planner desactivado.", "WARN")); ui_status(use_llm, planner_on); continue
-
-        # LLM toggle
-        if user == "8" or user.lower() == "modo llm on":
-            if llm is None and LLMAnthropic is not None:
+        try:
+            # Quick menu actions (shortcuts)
+            if user == "0" or user.lower() in {"salir","exit","quit"}:
+                print(c("Hasta luego 👋", "INFO"))
+                bearingpro_shared_close()
+                remote_async_close()
+                break
+
+            # Theme toggle
+            if user.lower() == "tema oscuro":
+                THEME = THEMES["DARK"]; ui_banner(); ui_status(use_llm, planner_on); continue
+            if user.lower() == "tema claro":
+                THEME = THEMES["LIGHT"]; ui_banner(); ui_status(use_llm, planner_on); continue
+
+            # Show menu/help
+            if user == "9" or user.lower() in {"ayuda","help"}:
+                ui_help(); continue
+            if user.lower() == "menu":
+                ui_menu(); continue
+            if user.lower() in {"contexto", "context"}:
+                print(c("Contexto LLM:", "INFO"), pretty({**ctx.info(), "summary": ctx.summary,
+                                                        "especulativo": SPEC.info()})); continue
+
+            # Planner toggle
+            if user == "7" or user.lower() == "modo planner on":
+                planner_on = True; print(c("Planner activado.", "OK")); ui_status(use_llm, planner_on); continue
+            if user.lower() == "modo planner off":
+                planner_on = False; print(c("Planner desactivado.", "WARN")); ui_status(use_llm, planner_on); continue
+
+            # LLM toggle
+            if user == "8" or user.lower() == "modo llm on":
+                if llm is None and LLMAnthropic is not None:
+                    try:
+                        llm = LLMAnthropic()
+                    except Exception as e:
+                        print(c(f"No pude activar LLM: {e}", "ERR"))
+                        continue
+                use_llm = llm is not None
+                print(c(f"LLM {'activado' if use_llm else 'no disponible'}.", "INFO")); ui_status(use_llm, planner_on); continue
+            if user.lower() == "modo llm off":
+                use_llm = False; print(c("LLM desactivado.", "WARN")); ui_status(use_llm, planner_on); continue
+
+            # Menu numeric actions
+            if user == "1":
+                out = await run_task("Catálogo", bearingpro_catalog)
+                print(c("Catálogo:", "INFO"), pretty(out)); log(f"RESP(BEARINGPRO.catalog): {pretty(out)}"); continue
+            if user == "2":
+                out = await run_task(None, guided_selection)
+                print(c("Selección:", "INFO"), pretty(out)); log(f"RESP(BEARINGPRO.select): {pretty(out)}"); continue
+            if user == "3":
+                out = await run_task(None, guided_verify)
+                print(c("Verificación (final):", "INFO"), pretty(out)); log(f"RESP(BEARINGPRO.verify): {pretty(out)}"); continue
+            if user == "4":
                 try:
-                    llm = LLMAnthropic()
+                    out = await run_task("Remoto init", remote_init)
+                    print(c("Remoto init:", "INFO"), pretty(out)); log(f"RESP(REMOTE.init): {pretty(out)}")
                 except Exception as e:
-                    print(c(f"No pude activar LLM: {e}", "ERR"))
-                    continue
-            use_llm = llm is not None
-            print(c(f"LLM {'activado' if use_llm else 'no disponible'}.", "INFO")); ui_status(use_llm, planner_on); continue
-        if user.lower() == "modo llm off":
-            use_llm = False; print(c("LLM desactivado.", "WARN")); ui_status(use_llm, planner_on); continue
-
-        # Menu numeric actions
-        if user == "1":
-            out = bearingpro_catalog()
-            print(c("Catálogo:", "INFO"), pretty(out)); log(f"RESP(BEARINGPRO.catalog): {pretty(out)}"); continue
-        if user == "2":
-            out = guided_selection()
-            print(c("Selección:", "INFO"), pretty(out)); log(f"RESP(BEARINGPRO.select): {pretty(out)}"); continue
-        if user == "3":
-            out = guided_verify()
-            print(c("Verificación:", "INFO"), pretty(out)); log(f"RESP(BEARINGPRO.verify): {pretty(out)}"); continue
-        if user == "4":
-            try:
-                out = remote_init()
-                print(c("Remoto init:", "INFO"), pretty(out)); log(f"RESP(REMOTE.init): {pretty(out)}")
-            except Exception as e:
-                print(c(f"Error remoto init: {e}", "ERR"))
-            continue
-        if user == "5":
-            try:
-                out = remote_time()
-                print(c("Remoto hora:", "INFO"), pretty(out)); log(f"RESP(REMOTE.time): {pretty(out)}")
-            except Exception as e:
-                print(c(f"Error remoto hora: {e}", "ERR"))
-            continue
-        if user.startswith("6"):
-            # Accept "6" or "6 3 4"
-            parts = user.split()
-            if len(parts) == 3:
+                    print(c(f"Error remoto init: {e}", "ERR"))
+                continue
+            if user == "5":
+                try:
+                    out = await run_task("Remoto hora", remote_time)
+                    print(c("Remoto hora:", "INFO"), pretty(out)); log(f"RESP(REMOTE.time): {pretty(out)}")
+                except Exception as e:
+                    print(c(f"Error remoto hora: {e}", "ERR"))
+                continue
+            if user.startswith("6"):
+                # Accept "6" or "6 3 4"
+                parts = user.split()
+                if len(parts) == 3:
+                    try:
+                        a = float(parts[1]); b = float(parts[2])
+                        out = await run_task("Remoto suma", remote_add, a, b)
+                        print(c("Remoto suma:", "INFO"), pretty(out)); log(f"RESP(REMOTE.add): {pretty(out)}")
+                    except Exception as e:
+                        print(c(f"Uso: 6 <a> <b> (ej. '6 3 4') | Error: {e}", "ERR"))
+                else:
+                    print(c("Uso: 6 <a> <b> (ej. '6 3 4')", "WARN"))
+                continue
+
+            # Direct commands (compatibility with previous)
+            if user.lower().startswith(("catalogo","catálogo","catalog","lista")):
+                out = await run_task("Catálogo", bearingpro_catalog)
+                print(c("Catálogo:", "INFO"), pretty(out)); log(f"RESP(BEARINGPRO.catalog): {pretty(out)}"); continue
+            if user.lower().startswith(("seleccion", "selección", "seleccionar")):
+                out = await run_task("Selección", handle_bearing_selection, user)
+                print(c("Selección:", "INFO"), pretty(out)); log(f"RESP(BEARINGPRO.select): {pretty(out)}"); continue
+            if user.lower().startswith(("barrido", "sweep")):
+                try:
+                    out = await run_task(None, guided_sweep)
+                    print(c("Barrido:", "INFO"), pretty(out)); log(f"RESP(BEARINGPRO.sweep): {pretty(out)}")
+                except Exception as e:
+                    print(c(f"\nError en barrido: {e}", "ERR"))
+                continue
+            if user.lower().startswith(("verificar", "check", "validar")):
+                out = await run_task("Verificación", handle_bearing_verify, user)
+                print(c("Verificación:", "INFO"), pretty(out)); log(f"RESP(BEARINGPRO.verify): {pretty(out)}"); continue
+            if user.lower().startswith(("remoto init","remote init","mcp remoto init")):
                 try:
-                    a = float(parts[1]); b = float(parts[2])
-                    out = remote_add(a, b)
+                    out = await run_task("Remoto init", remote_init)
+                    print(c("Remoto init:", "INFO"), pretty(out)); log(f"RESP(REMOTE.init): {pretty(out)}")
+                except Exception as e:
+                    print(c(f"Error remoto init: {e}", "ERR"))
+                continue
+            if user.lower().startswith(("remoto tools", "remote tools", "remoto sesion", "remoto sesión")):
+                # tools/list is cached per session (no round trip after the first one)
+                try:
+                    sess = remote_session()
+                    tools = await run_task("Remoto tools", sess.tools_list)
+                    out = {"tools": [t.get("name") for t in tools], "session": sess.info()}
+                    print(c("Remoto (sesión):", "INFO"), pretty(out)); log(f"RESP(REMOTE.session): {pretty(out)}")
+                except Exception as e:
+                    print(c(f"Error remoto: {e}", "ERR"))
+                continue
+            if user.lower().startswith(("remoto hora","remoto time","remote time")):
+                try:
+                    out = await run_task("Remoto hora", remote_time)
+                    print(c("Remoto hora:", "INFO"), pretty(out)); log(f"RESP(REMOTE.time): {pretty(out)}")
+                except Exception as e:
+                    print(c(f"Error remoto hora: {e}", "ERR"))
+                continue
+            if user.lower().startswith(("remoto suma","remote add")):
+                parts = user.split()
+                try:
+                    a = float(parts[-2]); b = float(parts[-1])
+                    out = await run_task("Remoto suma", remote_add, a, b)
                     print(c("Remoto suma:", "INFO"), pretty(out)); log(f"RESP(REMOTE.add): {pretty(out)}")
+                except Exception:
+                    print(c("Uso: remoto suma 3 4", "WARN"))
+                continue
+            if user.lower().startswith(("remoto todo", "remote all")):
+                # hora + suma + eco in parallel (one round trip instead of three)
+                try:
+                    t0 = time.perf_counter()
+                    calls = [("time_now", {}), ("add", {"a": 3, "b": 4}), ("echo", {"text": "hola"})]
+                    outs = await run_task("Remoto (paralelo)", lambda: remote_run_many(calls, deadline=5.0))
+                    out = {"hora": outs[0], "suma": outs[1], "eco": outs[2], "ms": round((time.perf_counter() - t0) * 1000, 1)}
+                    print(c("Remoto (paralelo):", "INFO"), pretty(out)); log(f"RESP(REMOTE.many): {pretty(out)}")
                 except Exception as e:
-                    print(c(f"Uso: 6 <a> <b> (ej. '6 3 4') | Error: {e}", "ERR"))
+                    print(c(f"Error remoto: {e}", "ERR"))
+                continue
+            if user.lower().startswith(("remoto replicas", "remote replicas")):
+                try:
+                    out = await run_task("Réplicas", lambda: remote_fan_out("time_now", deadline=5.0))
+                    print(c("Réplicas (REMOTE_MCP_URLS):", "INFO"), pretty(out)); log(f"RESP(REMOTE.fanout): {pretty(out)}")
+                except Exception as e:
+                    print(c(f"Error remoto: {e}", "ERR"))
+                continue
+
+            # Planner path: LLM decides and calls tools
+            if planner_on and use_llm and llm:
+                sent = ctx.window_tokens()
+                answer, dbg = await run_planner_turn(llm, ctx, user)
+                log(f"USER: {user}")
+                log(f"PLAN: {pretty({'rounds': dbg['rounds'], 'tools': [{k: t[k] for k in ('tool', 'args', 'ms')} for t in dbg['tool_calls']]})}")
+                if dbg["tool_calls"]:
+                    log(f"OBS: {pretty([t['result'] for t in dbg['tool_calls']])}")
+                if dbg["speculation"]:
+                    log(f"SPEC: {json.dumps({**dbg['speculation'], **SPEC.info()})}")
+                remember(ctx, user, answer, sent, dbg.get("usage"))
+                continue
+
+            # Default: small talk via LLM (if enabled)
+            if use_llm and llm:
+                sent = ctx.window_tokens()
+                answer = await run_stream("Pensando", c("Host (LLM):", "OK"), llm, ctx.messages(), user,
+                                          system=CHAT_SYSTEM, system_extra=ctx.system_summary())
+                remember(ctx, user, answer, sent, llm.last_stats)
+                log(f"USER: {user}")
+                log(f"RESP(LLM): {pretty({'answer': answer})}")
             else:
-                print(c("Uso: 6 <a> <b> (ej. '6 3 4')", "WARN"))
-            continue
-
-        # Direct commands (compatibility with previous)
-        if user.lower().startswith(("catalogo","catálogo","catalog","lista")):
-            out = bearingpro_catalog()
-            print(c("Catálogo:", "INFO"), pretty(out)); log(f"RESP(BEARINGPRO.catalog): {pretty(out)}"); continue
-        if user.lower().startswith(("seleccion", "selección", "seleccionar")):
-            out = handle_bearing_selection(user)
-            print(c("Selección:", "INFO"), pretty(out)); log(f"RESP(BEARINGPRO.select): {pretty(out)}"); continue
-        if user.lower().startswith(("verificar", "check", "validar")):
-            out = handle_bearing_verify(user)
-            print(c("Verificación:", "INFO"), pretty(out)); log(f"RESP(BEARINGPRO.verify): {pretty(out)}"); continue
-        if user.lower().startswith(("remoto init","remote init","mcp remoto init")):
-            try:
-                out = remote_init()
-                print(c("Remoto init:", "INFO"), pretty(out)); log(f"RESP(REMOTE.init): {pretty(out)}")
-            except Exception as e:
-                print(c(f"Error remoto init: {e}", "ERR"))
-            continue
-        if user.lower().startswith(("remoto hora","remoto time","remote time")):
-            try:
-                out = remote_time()
-                print(c("Remoto hora:", "INFO"), pretty(out)); log(f"RESP(REMOTE.time): {pretty(out)}")
-            except Exception as e:
-                print(c(f"Error remoto hora: {e}", "ERR"))
-            continue
-        if user.lower().startswith(("remoto suma","remote add")):
-            parts = user.split()
-            try:
-                a = float(parts[-2]); b = float(parts[-1])
-                out = remote_add(a, b)
-                print(c("Remoto suma:", "INFO"), pretty(out)); log(f"RESP(REMOTE.add): {pretty(out)}")
-            except Exception:
-                print(c("Uso: remoto suma 3 4", "WARN"))
-            continue
-
-        # Planner path: LLM decides and calls tools
-        if planner_on and use_llm and llm:
-            answer, dbg = run_planner_turn(llm, ctx_llm, user)
-            print(c("Host (Planner):", "OK"), answer)
-            log(f"USER: {user}")
-            log(f"PLAN: {pretty(dbg.get('plan'))}")
-            if 'observation' in dbg:
-                log(f"OBS: {pretty(dbg['observation'])}")
-            ctx_llm.append({"role":"user","content":user})
-            ctx_llm.append({"role":"assistant","content":answer})
-            continue
-
-        # Default: small talk via LLM (if enabled)
-        if use_llm and llm:
-            answer = llm.chat(ctx_llm, user)
-            print(c("Host (LLM):", "OK"), answer)
-            ctx_llm.append({"role":"user","content":user})
-            ctx_llm.append({"role":"assistant","content":answer})
-            log(f"USER: {user}")
-            log(f"RESP(LLM): {pretty({'answer': answer})}")
-        else:
-            print(c("LLM no disponible. Usa '8' o 'modo llm on' tras configurar ANTHROPIC_API_KEY.", "WARN"))
+                print(c("LLM no disponible. Usa '8' o 'modo llm on' tras configurar ANTHROPIC_API_KEY.", "WARN"))
+        except Interrupted:
+            print(c("\nCancelado.", "WARN")); log(f"CANCEL: {user}")
+            if READER.waiting_abandoned():
+                # the reader is still inside the abandoned input(): show the prompt it will answer
+                print(c("Tú: ", "INPUT"), end="", flush=True)
+
+def main():
+    asyncio.run(main_async())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,117 @@
+# host/context.py
+# Token-budgeted conversation context for the chat host.
+# - The last turns are sent verbatim while they fit in budget_tokens; older turns are
+#   folded into a running summary (LLM summarizer, or an extractive fallback), which
+#   travels in the system prompt right after the static prefix.
+# - compact() does the folding; the host runs it in the background after each answer,
+#   so the summarizer call is not on the next turn's critical path. It folds down to
+#   low_water * budget, not just under the budget: every compaction changes the prompt
+#   prefix (cache miss), so it should happen every few turns, not on every turn.
+# - report() compares what is sent with the naive "resend everything" history and adds
+#   the provider's prompt-cache numbers (cache_read/cache_creation input tokens).
+# Tokens are estimated (CHARS_PER_TOKEN); exact counts come back in the usage of each call.
+# Env: HOST_CONTEXT_TOKENS (budget, default 1500), HOST_CONTEXT_KEEP (turns always kept, 2),
+#      HOST_CONTEXT_LOW_WATER (fraction of the budget left after compacting, 0.5).
+
+import os, threading
+from typing import Any, Callable, Dict, List, Optional
+
+CHARS_PER_TOKEN = 4
+SUMMARY_MAX_CHARS = 1200      # extractive fallback cap
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+def _turns_tokens(turns: List[Dict[str, str]]) -> int:
+    return sum(estimate_tokens(t.get("content", "")) + 4 for t in turns)   # + role/framing overhead
+
+def extractive_summary(previous: str, turns: List[Dict[str, str]]) -> str:
+    """No-LLM fallback: previous summary + the start of each folded turn, capped."""
+    lines = [previous] if previous else []
+    for t in turns:
+        who = "Usuario" if t.get("role") == "user" else "Asistente"
+        lines.append(f"{who}: {' '.join(t.get('content', '').split())[:160]}")
+    return "\n".join(lines)[-SUMMARY_MAX_CHARS:]
+
+class ContextWindow:
+    def __init__(self, budget_tokens: int | None = None, keep_turns: int | None = None,
+                 summarizer: Optional[Callable[[str, List[Dict[str, str]]], str]] = None,
+                 low_water: float | None = None):
+        self.budget = budget_tokens if budget_tokens is not None else int(os.getenv("HOST_CONTEXT_TOKENS", "1500"))
+        self.keep = keep_turns if keep_turns is not None else int(os.getenv("HOST_CONTEXT_KEEP", "2"))
+        self.low_water = low_water if low_water is not None else float(os.getenv("HOST_CONTEXT_LOW_WATER", "0.5"))
+        self.summarizer = summarizer
+        self.turns: List[Dict[str, str]] = []
+        self.summary = ""
+        self.folded = 0                 # turns already inside the summary
+        self.naive_tokens = 0           # what the unbounded history would weigh now
+        self.totals = {"turns": 0, "saved": 0, "cache_read": 0, "cache_write": 0, "compactions": 0}
+        self._lock = threading.Lock()
+
+    # ---- history ----
+    def add(self, user_text: str, answer: str):
+        pair = [{"role": "user", "content": user_text}, {"role": "assistant", "content": answer}]
+        with self._lock:
+            self.turns.extend(pair)
+            self.naive_tokens += _turns_tokens(pair)
+
+    def messages(self) -> List[Dict[str, str]]:
+        with self._lock:
+            return list(self.turns)
+
+    def system_summary(self) -> str:
+        return f"Resumen de la conversación anterior:\n{self.summary}" if self.summary else ""
+
+    def window_tokens(self) -> int:
+        with self._lock:
+            return _turns_tokens(self.turns) + estimate_tokens(self.system_summary())
+
+    def over_budget(self) -> bool:
+        return self.window_tokens() > self.budget and len(self.turns) > 2 * self.keep
+
+    def compact(self) -> bool:
+        """Fold the oldest turns into the summary down to the low-water mark (keeps `keep` turns)."""
+        with self._lock:
+            target = int(self.budget * self.low_water)
+            excess = _turns_tokens(self.turns) + estimate_tokens(self.system_summary()) - target
+            n = 0
+            while excess > 0 and len(self.turns) - n > 2 * self.keep:
+                excess -= _turns_tokens(self.turns[n:n + 2])
+                n += 2
+            if not n:
+                return False
+            old, previous = self.turns[:n], self.summary
+        # slow part (LLM) outside the lock: new turns may be appended meanwhile
+        try:
+            summary = self.summarizer(previous, old) if self.summarizer else ""
+        except Exception:
+            summary = ""
+        summary = summary or extractive_summary(previous, old)
+        with self._lock:
+            del self.turns[:n]
+            self.summary = summary
+            self.folded += n
+            self.totals["compactions"] += 1
+        return True
+
+    # ---- reporting ----
+    def report(self, sent_history_tokens: int, usage: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        """
+        Per-turn numbers: history tokens sent vs the naive full history (saved by the
+        window), plus prompt-cache reads/writes from the call's usage.
+        """
+        usage = usage or {}
+        saved = max(0, self.naive_tokens - sent_history_tokens)
+        out = {"sent": sent_history_tokens, "naive": self.naive_tokens, "saved_window": saved,
+               "cache_read": usage.get("cache_read_input_tokens", 0) or 0,
+               "cache_write": usage.get("cache_creation_input_tokens", 0) or 0,
+               "turns_kept": len(self.turns) // 2, "turns_folded": self.folded // 2}
+        self.totals["turns"] += 1
+        self.totals["saved"] += saved
+        self.totals["cache_read"] += out["cache_read"]
+        self.totals["cache_write"] += out["cache_write"]
+        return out
+
+    def info(self) -> Dict[str, Any]:
+        return {"budget": self.budget, "window_tokens": self.window_tokens(), "naive_tokens": self.naive_tokens,
+                "summary_chars": len(self.summary), **self.totals}
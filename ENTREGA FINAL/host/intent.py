@@ -0,0 +1,75 @@
+# host/intent.py
+# Rule-based intent detection & param extraction from free text (ported from ENTREGA PARCIAL).
+# Microseconds, no LLM: the planner uses it to start the likely tool call speculatively
+# while the LLM plans (host/speculative.py). Intents are the BearingPro tools.
+
+import re
+from typing import Dict, Any, Optional
+
+NUM = r"[-+]?\d+(?:\.\d+)?"
+
+def parse_floats(text: str) -> Dict[str, float]:
+    """Extract common numeric parameters (Fr, Fa, rpm, L10h_target, temperature)."""
+    out = {}
+    # crude patterns like: Fr=3500, Fa=1200, rpm 1800, 1800 rpm, L10h 12000, T=40C
+    patterns = {
+        "Fr_N": r"(?:Fr[_\s]*=|Fr[_\s]*:|Fr\s*)(%s)" % NUM,
+        "Fa_N": r"(?:Fa[_\s]*=|Fa[_\s]*:|Fa\s*)(%s)" % NUM,
+        "rpm": r"(?:rpm[_\s]*=|rpm[_\s]*:|rpm\s*)(%s)" % NUM,
+        "L10h_target": r"(?:L10h[_\s]*=|L10h[_\s]*:|L10h\s*)(%s)" % NUM,
+        "temperature_C": r"(?:\bT\s*=?\s*|\btemp(?:eratura|erature)?\s*)(%s)" % NUM,
+    }
+    for k, pat in patterns.items():
+        m = re.search(pat, text, re.IGNORECASE)
+        if m:
+            out[k] = float(m.group(1))
+    if "rpm" not in out:
+        m = re.search(r"(%s)\s*rpm\b" % NUM, text, re.IGNORECASE)   # "a 1800 rpm"
+        if m:
+            out["rpm"] = float(m.group(1))
+    return out
+
+def extract_model(text: str) -> Optional[str]:
+    # capture like 6205, 6205C3, SKF_6205, NTN_6205LLU, SKF_6205_2RS
+    m = re.search(r"\b((?:[A-Z]+_)?6\d{3}[A-Z0-9_\-]*)\b", text.upper())
+    return m.group(1) if m else None
+
+def detect_intent(text: str) -> Dict[str, Any]:
+    """
+    Returns:
+      { "intent": "...", "params": {...}, "needs": [ ... ] }
+    needs: parameters the tool cannot default (L10h_target defaults to 12000 on the server).
+    """
+    t = text.strip()
+    up = t.upper()
+    params: Dict[str, Any] = {}
+
+    # 1) Verify point (verify_point)
+    if any(k in up for k in ["VERIF", "COMPROB", "COMPRUEB", "VALID"]) and ("RODAM" in up or extract_model(t)):
+        model = extract_model(t)
+        if model: params["model"] = model
+        params.update(parse_floats(t))
+        needs = []
+        if "model" not in params: needs.append("model")
+        if not ("Fr_N" in params or "Fa_N" in params): needs.append("Fr_N or Fa_N")
+        if "rpm" not in params: needs.append("rpm")
+        return {"intent": "verify_point", "params": params, "needs": needs}
+
+    # 2) Select bearing (select_bearing)
+    if any(k in up for k in ["SELEC", "ELEGIR", "ELIJ", "ESCOGER", "RECOMIEND"]) and "RODAM" in up:
+        params.update(parse_floats(t))
+        # optional reliability, lubrication
+        if re.search(r"\b95%|\b95\b", up): params["reliability_percent"] = 95
+        if "ACEITE" in up: params["lubrication"] = "oil"
+        if "GRASA" in up: params["lubrication"] = "grease"
+        needs = []
+        if "rpm" not in params: needs.append("rpm")
+        if not ("Fr_N" in params or "Fa_N" in params): needs.append("Fr_N or Fa_N")
+        return {"intent": "select_bearing", "params": params, "needs": needs}
+
+    # 3) Catalog list
+    if "CATÁLOG" in up or "CATALOG" in up:
+        return {"intent": "catalog_list", "params": {}, "needs": []}
+
+    # Fallback
+    return {"intent": "smalltalk", "params": {}, "needs": []}
@@ -1,27 +1,43 @@
 # host/llm_anthropic.py
 # Minimal Anthropic SDK wrapper for chat with context.
+# Answers are streamed (messages.stream): stream() yields text deltas as they arrive and
+# chat() joins them, optionally passing each one to on_delta. Every call records
+# time-to-first-token and output tokens/s in last_stats.
+# ANTHROPIC_BASE_URL (or base_url=) points the client at another endpoint, e.g. a local
+# stub of /v1/messages (scripts/llm_stream_test.py).
+# Prompt caching (ANTHROPIC_PROMPT_CACHE=1, default): the static system prefix and the end
+# of the history carry cache_control breakpoints, so a turn re-reads them from the
+# provider's cache instead of reprocessing them. Prefixes shorter than the model's minimum
+# (about 1024 tokens) are simply not cached. last_stats reports cache reads/writes.
+# Tool use: respond() sends tool definitions (the planner builds them from the MCP
+# servers' tools/list) and returns the final Message, whose tool_use blocks the host runs;
+# the tool definitions come first in the prompt and are cached with the system prefix.
 
-import os
-from typing import List, Dict
+import os, time
+from typing import Any, Callable, Dict, Iterator, List, Optional
 import anthropic
 
 DEFAULT_MODEL = os.getenv("ANTHROPIC_MODEL", "claude-opus-4-1-20250805")
+SUMMARY_MODEL = os.getenv("ANTHROPIC_SUMMARY_MODEL", "")        # empty: same as the chat model
+PROMPT_CACHE = os.getenv("ANTHROPIC_PROMPT_CACHE", "1") != "0"
+EPHEMERAL = {"type": "ephemeral"}
+SUMMARY_SYSTEM = ("Resume la conversación para que un asistente pueda continuarla. Máximo 120 palabras. "
+                  "Conserva datos técnicos exactos: cargas, rpm, L10h, modelos, resultados y decisiones.")
 
 class LLMAnthropic:
-    def __init__(self, model: str | None = None, max_tokens: int = 500):
+    def __init__(self, model: str | None = None, max_tokens: int = 500, base_url: str | None = None):
         api_key = os.getenv("ANTHROPIC_API_KEY")
         if not api_key:
             raise RuntimeError("Missing ANTHROPIC_API_KEY.")
-        self.client = anthropic.Anthropic(api_key=api_key)
+        self.client = anthropic.Anthropic(api_key=api_key, base_url=base_url or os.getenv("ANTHROPIC_BASE_URL"))
         self.model = model or DEFAULT_MODEL
         self.max_tokens = max_tokens
+        self.prompt_cache = PROMPT_CACHE
+        self.last_stats: Dict[str, Any] = {}
+        self.last_message = None
 
-    def chat(self, history: List[Dict[str, str]], user_text: str) -> str:
-        """
-        history: list of {"role": "user"|"assistant", "content": "text"}
-        user_text: the new user message
-        returns: assistant text
-        """
+    @staticmethod
+    def build_messages(history: List[Dict[str, str]], user_text: str) -> List[Dict[str, Any]]:
         msgs = []
         for turn in history:
             role = turn.get("role")
@@ -29,16 +45,111 @@ class LLMAnthropic:
             if role in ("user", "assistant") and content:
                 msgs.append({"role": role, "content": content})
         msgs.append({"role": "user", "content": user_text})
+        return msgs
+
+    def _request(self, messages: List[Dict[str, Any]], system: str = "", system_extra: str = "",
+                 tools: Optional[List[Dict[str, Any]]] = None,
+                 tool_choice: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        messages.create/stream kwargs. system is the static prefix (cached); system_extra
+        changes between turns (e.g. the conversation summary) and goes after it.
+        """
+        msgs = [dict(m) for m in messages]      # breakpoints are added on copies
+        kw: Dict[str, Any] = {"model": self.model, "max_tokens": self.max_tokens, "messages": msgs}
+        if tools:
+            kw["tools"] = [*tools[:-1], {**tools[-1], "cache_control": EPHEMERAL}] if self.prompt_cache else tools
+            if tool_choice:
+                kw["tool_choice"] = tool_choice
+        blocks = []
+        if system:
+            blocks.append({"type": "text", "text": system, **({"cache_control": EPHEMERAL} if self.prompt_cache else {})})
+        if system_extra:
+            blocks.append({"type": "text", "text": system_extra})
+        if blocks:
+            kw["system"] = blocks
+        if self.prompt_cache and len(msgs) > 1:
+            # second breakpoint at the end of the history: the conversation prefix is cached too
+            last = msgs[-2]
+            content = last["content"]
+            if isinstance(content, str):
+                last["content"] = [{"type": "text", "text": content, "cache_control": EPHEMERAL}]
+            else:   # tool-use rounds: content blocks
+                last["content"] = [*content[:-1], {**content[-1], "cache_control": EPHEMERAL}]
+        return kw
+
+    def stream(self, history: List[Dict[str, str]], user_text: str,
+               system: str = "", system_extra: str = "") -> Iterator[str]:
+        """
+        Yield the assistant's text deltas as they arrive. When the stream ends,
+        last_stats holds ttft_ms, total_ms, input/output/cache tokens and tokens_per_s
+        (output tokens over the time after the first token).
+        """
+        yield from self._stream(self._request(self.build_messages(history, user_text), system, system_extra))
+
+    def _stream(self, kw: Dict[str, Any]) -> Iterator[str]:
+        t0 = time.perf_counter()
+        t_first = None
+        self.last_stats = {}
+        with self.client.messages.stream(**kw) as stream:
+            for text in stream.text_stream:
+                if not text:
+                    continue
+                if t_first is None:
+                    t_first = time.perf_counter()
+                yield text
+            final = self.last_message = stream.get_final_message()
+        t_end = time.perf_counter()
+        out_tokens = getattr(final.usage, "output_tokens", 0) or 0
+        gen_s = t_end - (t_first or t_end)
+        self.last_stats = {
+            "ttft_ms": round((t_first - t0) * 1000, 1) if t_first else None,
+            "total_ms": round((t_end - t0) * 1000, 1),
+            "input_tokens": getattr(final.usage, "input_tokens", 0) or 0,
+            "output_tokens": out_tokens,
+            "tokens_per_s": round(out_tokens / gen_s, 1) if gen_s > 0 else None,
+            "cache_read_input_tokens": getattr(final.usage, "cache_read_input_tokens", 0) or 0,
+            "cache_creation_input_tokens": getattr(final.usage, "cache_creation_input_tokens", 0) or 0,
+            "stop_reason": final.stop_reason,
+        }
 
+    def chat(self, history: List[Dict[str, str]], user_text: str,
+             on_delta: Optional[Callable[[str], None]] = None, system: str = "", system_extra: str = "") -> str:
+        """
+        history: list of {"role": "user"|"assistant", "content": "text"}
+        user_text: the new user message
+        on_delta: called with each text delta as it arrives (incremental rendering)
+        system / system_extra: static (cached) and per-turn system prompt
+        returns: assistant text
+        """
+        parts = []
+        for text in self.stream(history, user_text, system, system_extra):
+            parts.append(text)
+            if on_delta is not None:
+                on_delta(text)
+        return "".join(parts).strip() or "(sin respuesta)"
+
+    def respond(self, messages: List[Dict[str, Any]], tools: Optional[List[Dict[str, Any]]] = None,
+                system: str = "", system_extra: str = "", on_delta: Optional[Callable[[str], None]] = None,
+                tool_choice: Optional[Dict[str, Any]] = None):
+        """
+        One streamed round of a tool-use conversation. messages: API messages (content
+        may be blocks: tool_use / tool_result). tools: [{"name", "description",
+        "input_schema"}]; tool_choice {"type": "none"} forces a text answer.
+        Text deltas go to on_delta; returns the final Message (stop_reason "tool_use":
+        run its tool_use blocks and send the results back in the next round).
+        """
+        for text in self._stream(self._request(messages, system, system_extra, tools, tool_choice)):
+            if on_delta is not None:
+                on_delta(text)
+        return self.last_message
+
+    def summarize(self, previous: str, turns: List[Dict[str, str]]) -> str:
+        """Fold turns into the running summary (one short, non-streamed call)."""
+        text = "\n".join(f"{t.get('role')}: {t.get('content', '')}" for t in turns)
         resp = self.client.messages.create(
-            model=self.model,
-            max_tokens=self.max_tokens,
-            messages=msgs
+            model=SUMMARY_MODEL or self.model,
+            max_tokens=250,
+            system=SUMMARY_SYSTEM,
+            messages=[{"role": "user", "content": f"Resumen previo:\n{previous or '(ninguno)'}\n\nTurnos nuevos:\n{text}"}]
         )
-        parts = []
-        for block in resp.content:
-            if hasattr(block, "text"):
-                parts.append(block.text)
-            elif isinstance(block, dict) and "text" in block:
-                parts.append(block["text"])
-        return "\n".join(parts).strip() or "(sin respuesta)"
+        return "".join(getattr(b, "text", "") for b in resp.content).strip()
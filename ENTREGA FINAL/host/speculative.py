@@ -0,0 +1,104 @@
+# host/speculative.py
+# Speculative tool execution for the planner.
+# - begin(): detect_intent() guesses the tool call from the user text (microseconds) and,
+#   when it has the parameters, starts it right away, while the LLM is still planning.
+# - claim(): when the LLM asks for a tool, the speculated call is reused if it is the same
+#   tool with the same arguments (after filling the server defaults); otherwise it runs
+#   normally and the speculated result is discarded at settle().
+# - Only read-only BearingPro tools are speculated (a wrong guess costs some server work,
+#   never a side effect). Hit rate and latency saved are kept in stats.
+# Latency saved on a hit = min(call duration, time between the start and the LLM's request).
+# Env: HOST_SPECULATE=0 turns it off.
+
+import json, os, threading, time
+from typing import Any, Callable, Dict, Optional
+
+from host.intent import detect_intent
+
+SPECULATIVE_TOOLS = ("select_bearing", "verify_point", "catalog_list")
+# server-side defaults (LoadCase.from_params / L10h_target): an omitted argument equals its default
+ARG_DEFAULTS = {"Fr_N": 0.0, "Fa_N": 0.0, "rpm": 1800.0, "L10h_target": 12000.0,
+                "reliability_percent": 90.0, "temperature_C": 25.0, "lubrication": "grease"}
+
+def call_key(tool: str, args: Dict[str, Any]) -> str:
+    """Comparable form of a tool call: defaults filled in, numbers as floats, text case-folded."""
+    full = {} if tool == "catalog_list" else dict(ARG_DEFAULTS)
+    for k, v in (args or {}).items():
+        if v is None or v == "":
+            continue
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            v = round(float(v), 6)
+        elif isinstance(v, str):
+            v = v.strip().lower()
+            try:
+                v = round(float(v), 6)
+            except ValueError:
+                pass
+        full[k] = v
+    return json.dumps([tool, full], sort_keys=True)
+
+class Speculator:
+    def __init__(self, enabled: bool | None = None, tools=SPECULATIVE_TOOLS):
+        self.enabled = enabled if enabled is not None else os.getenv("HOST_SPECULATE", "1") != "0"
+        self.tools = tuple(tools)
+        self.stats = {"started": 0, "hits": 0, "misses": 0, "saved_ms": 0.0, "wasted_ms": 0.0}
+        self._cur: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def guess(self, text: str) -> Optional[Dict[str, Any]]:
+        d = detect_intent(text)
+        if d["intent"] not in self.tools or d["needs"]:
+            return None
+        return {"tool": d["intent"], "args": d["params"]}
+
+    def begin(self, text: str, start: Callable[[str, Dict[str, Any]], Any]) -> Optional[Dict[str, Any]]:
+        """
+        Start the guessed call for this turn. start(tool, args) launches it and returns a
+        future of (result, ms). A turn that never settled (cancelled) is dropped.
+        """
+        self._cur = None
+        g = self.guess(text) if self.enabled else None
+        if g is None:
+            return None
+        cur = {**g, "key": call_key(g["tool"], g["args"]), "t0": time.perf_counter(), "claimed_at": None}
+        cur["future"] = start(g["tool"], g["args"])
+        with self._lock:
+            self.stats["started"] += 1
+        self._cur = cur
+        return g
+
+    def claim(self, tool: str, args: Dict[str, Any]):
+        """The speculated future if this call matches it (once per turn), else None."""
+        cur = self._cur
+        if cur is None or cur["claimed_at"] is not None or call_key(tool, args) != cur["key"]:
+            return None
+        cur["claimed_at"] = time.perf_counter()
+        return cur["future"]
+
+    def settle(self) -> Optional[Dict[str, Any]]:
+        """End of the turn: count the hit or miss; returns the turn's report (None: nothing speculated)."""
+        cur, self._cur = self._cur, None
+        if cur is None:
+            return None
+        fut, hit = cur["future"], cur["claimed_at"] is not None
+        ms = None
+        if fut.done() and not fut.cancelled() and fut.exception() is None:
+            ms = fut.result()[1]
+        rep = {"tool": cur["tool"], "args": cur["args"], "hit": hit, "call_ms": ms, "saved_ms": 0.0}
+        with self._lock:
+            if hit:
+                ahead = (cur["claimed_at"] - cur["t0"]) * 1000
+                rep["saved_ms"] = round(min(ms if ms is not None else ahead, ahead), 1)
+                self.stats["hits"] += 1
+                self.stats["saved_ms"] += rep["saved_ms"]
+            else:
+                self.stats["misses"] += 1
+                self.stats["wasted_ms"] += ms or 0.0
+        return rep
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            done = self.stats["hits"] + self.stats["misses"]
+            return {**self.stats, "saved_ms": round(self.stats["saved_ms"], 1),
+                    "wasted_ms": round(self.stats["wasted_ms"], 1),
+                    "hit_rate": round(self.stats["hits"] / done, 3) if done else None}
@@ -0,0 +1,5 @@
+# bearing_engine/__init__.py
+# Vendored copy of the shared life engine (ENTREGA PARCIAL/models: constants, factors,
+# life_engine), so this deliverable runs on its own and nothing on sys.path can shadow it.
+# Edit it there and copy the files here; ENTREGA PARCIAL/tests/test_vendored.py fails
+# while the two copies differ.
@@ -0,0 +1,158 @@
+# Table-driven X/Y factor engine for the equivalent dynamic load P = X*Fr + Y*Fa.
+# Tables are compiled once at import into interpolation arrays; catalogs are
+# compiled once into column arrays so P can be evaluated for all models and
+# many load cases in one shot (numpy if available, pure Python otherwise).
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+from .constants import XY_TABLES, F0_BY_TYPE, FALLBACK_X, FALLBACK_Y
+
+try:
+    import numpy as np
+except ImportError:  # optional: same results, slower batch evaluation
+    np = None
+
+FALLBACK_GROUP = "__fallback__"
+
+
+@dataclass(frozen=True)
+class FactorTable:
+    X: float
+    ratio: Sequence[float]  # f0*Fa/C0 breakpoints (ascending)
+    e: Sequence[float]
+    Y: Sequence[float]
+
+    def interp(self, r: float) -> tuple[float, float]:
+        """Return (e, Y) at ratio r, clamped to the table ends."""
+        xs = self.ratio
+        if r <= xs[0]:
+            return self.e[0], self.Y[0]
+        if r >= xs[-1]:
+            return self.e[-1], self.Y[-1]
+        i = bisect_right(xs, r) - 1
+        t = (r - xs[i]) / (xs[i + 1] - xs[i])
+        return (self.e[i] + t * (self.e[i + 1] - self.e[i]),
+                self.Y[i] + t * (self.Y[i + 1] - self.Y[i]))
+
+
+def _compile_tables() -> Dict[str, FactorTable]:
+    out = {}
+    for btype, spec in XY_TABLES.items():
+        rows = sorted(spec["rows"])
+        ratio, e, Y = (tuple(float(v) for v in col) for col in zip(*rows))
+        out[btype] = FactorTable(X=float(spec["X"]), ratio=ratio, e=e, Y=Y)
+    return out
+
+
+TABLES = _compile_tables()
+# Same tables as float arrays for np.interp (built once)
+NP_TABLES = ({k: tuple(np.asarray(col, dtype=float) for col in (t.ratio, t.e, t.Y))
+              for k, t in TABLES.items()} if np is not None else {})
+
+
+def xy_factors(Fr_N: float, Fa_N: float, bearing_type: str, C0_N: float | None = None,
+               f0: float | None = None) -> tuple[float, float]:
+    """(X, Y) for one load case. Falls back to (1, 1) without table or C0."""
+    tab = TABLES.get(bearing_type)
+    C0 = float(C0_N or 0.0)
+    if tab is None or C0 <= 0:
+        return FALLBACK_X, FALLBACK_Y
+    Fr = max(0.0, float(Fr_N or 0.0))
+    Fa = max(0.0, float(Fa_N or 0.0))
+    if Fa <= 0:
+        return 1.0, 0.0
+    f0 = float(f0 or F0_BY_TYPE.get(bearing_type, 14.0))
+    e, Y = tab.interp(f0 * Fa / C0)
+    if Fa > e * Fr:
+        return tab.X, Y
+    return 1.0, 0.0
+
+
+def equivalent_load(Fr_N: float, Fa_N: float, bearing_type: str, C0_N: float | None = None,
+                    f0: float | None = None) -> float:
+    """Scalar P [N] for one model and one load case."""
+    Fr = max(0.0, float(Fr_N or 0.0))
+    Fa = max(0.0, float(Fa_N or 0.0))
+    X, Y = xy_factors(Fr, Fa, bearing_type, C0_N, f0)
+    return X * Fr + Y * Fa
+
+
+@dataclass
+class CatalogArrays:
+    """Column view of a catalog, grouped by factor table (built once per catalog)."""
+    models: List[Dict[str, Any]]
+    C: Any
+    C0: Any
+    f0: Any
+    groups: Dict[str, Any] = field(default_factory=dict)  # table name -> model indices
+
+    @classmethod
+    def from_bearings(cls, bearings: List[Dict[str, Any]]) -> "CatalogArrays":
+        C, C0, f0, groups = [], [], [], {}
+        for i, b in enumerate(bearings):
+            btype = b.get("type", "")
+            c0 = float(b.get("C0_N") or 0.0)
+            C.append(float(b.get("C_N") or 0.0))
+            C0.append(c0)
+            f0.append(float(b.get("f0") or F0_BY_TYPE.get(btype, 14.0)))
+            key = btype if (btype in TABLES and c0 > 0) else FALLBACK_GROUP
+            groups.setdefault(key, []).append(i)
+        if np is not None:
+            C, C0, f0 = (np.asarray(v, dtype=float) for v in (C, C0, f0))
+            groups = {k: np.asarray(v, dtype=np.intp) for k, v in groups.items()}
+        return cls(models=list(bearings), C=C, C0=C0, f0=f0, groups=groups)
+
+    def take(self, idx: Sequence[int]) -> "CatalogArrays":
+        """Sub-catalog of the models at idx, sliced from the columns (no re-parse)."""
+        idx = list(idx)
+        pos = {j: k for k, j in enumerate(idx)}
+        groups = {}
+        for key, members in self.groups.items():
+            sub = [pos[j] for j in (members.tolist() if np is not None else members) if j in pos]
+            if sub:
+                groups[key] = sub
+        models = [self.models[j] for j in idx]
+        if np is None:
+            return CatalogArrays(models=models, C=[self.C[j] for j in idx], C0=[self.C0[j] for j in idx],
+                                 f0=[self.f0[j] for j in idx], groups=groups)
+        sel = np.asarray(idx, dtype=np.intp)
+        return CatalogArrays(models=models, C=self.C[sel], C0=self.C0[sel], f0=self.f0[sel],
+                             groups={k: np.asarray(v, dtype=np.intp) for k, v in groups.items()})
+
+    def __len__(self) -> int:
+        return len(self.models)
+
+
+def equivalent_load_matrix(Fr_N, Fa_N, cat: CatalogArrays):
+    """
+    P [N] for every (load case, model) pair.
+    Fr_N/Fa_N: scalars or equal-length sequences of load cases.
+    Returns an (n_cases, n_models) array (nested lists without numpy).
+    """
+    if np is None:
+        Frs = [Fr_N] if isinstance(Fr_N, (int, float)) else list(Fr_N)
+        Fas = [Fa_N] if isinstance(Fa_N, (int, float)) else list(Fa_N)
+        return [[equivalent_load(fr, fa, b.get("type", ""), cat.C0[j], cat.f0[j])
+                 for j, b in enumerate(cat.models)]
+                for fr, fa in zip(Frs, Fas)]
+
+    Fr = np.maximum(np.atleast_1d(np.asarray(Fr_N, dtype=float)), 0.0)[:, None]
+    Fa = np.maximum(np.atleast_1d(np.asarray(Fa_N, dtype=float)), 0.0)[:, None]
+    P = np.empty((max(Fr.shape[0], Fa.shape[0]), len(cat)))
+    for key, idx in cat.groups.items():
+        if key == FALLBACK_GROUP:
+            P[:, idx] = FALLBACK_X * Fr + FALLBACK_Y * Fa
+            continue
+        xs, es, ys = NP_TABLES[key]
+        r = cat.f0[idx] * Fa / cat.C0[idx]
+        e = np.interp(r, xs, es)
+        Y = np.interp(r, xs, ys)
+        P[:, idx] = np.where(Fa > e * Fr, TABLES[key].X * Fr + Y * Fa, Fr)
+    return P
+
+
+def equivalent_load_row(Fr_N: float, Fa_N: float, cat: CatalogArrays) -> List[float]:
+    """P [N] for one load case across the whole catalog, as a plain list."""
+    P = equivalent_load_matrix(float(Fr_N or 0.0), float(Fa_N or 0.0), cat)
+    return P[0].tolist() if np is not None else P[0]
@@ -0,0 +1,268 @@
+# Shared bearing life engine: P -> L10 -> L10h -> adjusted life.
+# Single source of truth for every server tool (PARCIAL stdio server, FINAL
+# BearingPro stdio server, HTTP server). Each formula is a pluggable strategy
+# with a scalar API (one model, one load case) and a batch API (whole catalog
+# x many load cases, numpy when available, scalar loop otherwise).
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+from .constants import (P_EXPONENT_BY_TYPE, RELIABILITY_A1, TEMPERATURE_STEPS,
+                        temperature_factor, lubrication_factor)
+from .factors import CatalogArrays, equivalent_load, equivalent_load_matrix, np
+
+DEFAULT_EXPONENT = 3.0
+P_MIN_N = 1e-6   # zero load: a very long but finite life (inf is not valid JSON), as the old servers did
+
+
+@dataclass(frozen=True)
+class LoadCase:
+    Fr_N: float
+    Fa_N: float = 0.0
+    rpm: float = 1800.0
+    reliability_percent: int = 90
+    temperature_C: float = 25.0
+    lubrication: str = "grease"
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any], rpm_default: float = 1800.0) -> "LoadCase":
+        """
+        Build from tool arguments. Only a missing, None or "" value takes the default
+        (0 is a value); non-numeric or out-of-range values raise ValueError.
+        """
+        def num(key: str, default: float) -> float:
+            v = params.get(key)
+            v = default if v is None or v == "" else float(v)
+            if not math.isfinite(v):
+                raise ValueError(f"{key} must be a finite number")
+            return v
+        case = cls(
+            Fr_N=num("Fr_N", 0.0),
+            Fa_N=num("Fa_N", 0.0),
+            rpm=num("rpm", rpm_default),
+            reliability_percent=int(num("reliability_percent", 90)),
+            temperature_C=num("temperature_C", 25.0),
+            lubrication=str(params.get("lubrication") or "grease"),
+        )
+        case.validate()
+        return case
+
+    def validate(self):
+        """Raise ValueError for an operating point outside the model's domain."""
+        if self.Fr_N < 0 or self.Fa_N < 0:
+            raise ValueError("Fr_N and Fa_N must be >= 0")
+        if self.rpm <= 0:
+            raise ValueError("rpm must be > 0")
+        if not 0 < self.reliability_percent < 100:
+            raise ValueError("reliability_percent must be between 0 and 100")
+        if self.temperature_C < -273.15:
+            raise ValueError("temperature_C is below absolute zero")
+
+
+@dataclass
+class CaseArrays:
+    """Column view of many load cases (what the batch API consumes)."""
+    Fr_N: Any
+    Fa_N: Any
+    rpm: Any
+    reliability_percent: Any
+    temperature_C: Any
+    lubrication: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_cases(cls, cases: Sequence[LoadCase]) -> "CaseArrays":
+        cols = {k: [getattr(c, k) for c in cases] for k in
+                ("Fr_N", "Fa_N", "rpm", "reliability_percent", "temperature_C")}
+        if np is not None:
+            cols = {k: np.asarray(v, dtype=float) for k, v in cols.items()}
+        return cls(lubrication=[c.lubrication for c in cases], **cols)
+
+    def __len__(self) -> int:
+        return len(self.Fr_N)
+
+    def case(self, i: int) -> LoadCase:
+        return LoadCase(float(self.Fr_N[i]), float(self.Fa_N[i]), float(self.rpm[i]),
+                        int(self.reliability_percent[i]), float(self.temperature_C[i]),
+                        self.lubrication[i] if self.lubrication else "grease")
+
+
+# =========================
+# Strategies
+# =========================
+class ISO281Load:
+    """P = X*Fr + Y*Fa from the precompiled X/Y tables (Fr + Fa without C0/table)."""
+    name = "iso281_xy"
+
+    def scalar(self, Fr: float, Fa: float, bearing: Dict[str, Any]) -> float:
+        return equivalent_load(Fr, Fa, bearing.get("type", ""), bearing.get("C0_N"), bearing.get("f0"))
+
+    def batch(self, Fr, Fa, cat: CatalogArrays):
+        return equivalent_load_matrix(Fr, Fa, cat)
+
+
+class ConservativeLoad:
+    """P = Fr + Y*Fa with a fixed Y (the old demo formulas: Y=1 or Y=1.5)."""
+
+    def __init__(self, Y: float = 1.0):
+        self.Y = float(Y)
+        self.name = f"conservative_y{self.Y:g}"
+
+    def scalar(self, Fr: float, Fa: float, bearing: Dict[str, Any]) -> float:
+        return max(0.0, float(Fr or 0.0)) + self.Y * max(0.0, float(Fa or 0.0))
+
+    def batch(self, Fr, Fa, cat: CatalogArrays):
+        Fr = np.maximum(np.atleast_1d(np.asarray(Fr, dtype=float)), 0.0)[:, None]
+        Fa = np.maximum(np.atleast_1d(np.asarray(Fa, dtype=float)), 0.0)[:, None]
+        return np.broadcast_to(Fr + self.Y * Fa, (max(len(Fr), len(Fa)), len(cat)))
+
+
+class ExponentByType:
+    """Life exponent p: 3 for ball bearings, 10/3 for rollers."""
+    name = "by_type"
+
+    def __init__(self, table: Dict[str, float] | None = None, default: float = DEFAULT_EXPONENT):
+        self.table = dict(table or P_EXPONENT_BY_TYPE)
+        self.default = float(default)
+
+    def scalar(self, bearing_type: str) -> float:
+        return self.table.get(bearing_type, self.default)
+
+    def batch(self, cat: CatalogArrays):
+        return np.asarray([self.scalar(b.get("type", "")) for b in cat.models], dtype=float)
+
+
+class DemoAdjustments:
+    """a1 (reliability) * a3 (temperature) * a_lub; demo tables in constants.py."""
+    name = "demo_a1_a3"
+
+    def scalar(self, case: LoadCase) -> float:
+        a1 = RELIABILITY_A1.get(int(case.reliability_percent), 1.0)
+        a3 = temperature_factor(case.temperature_C, case.lubrication or "grease")
+        return a1 * a3 * lubrication_factor(case.lubrication or "grease")
+
+    def batch(self, cases: CaseArrays):
+        rel = np.asarray(cases.reliability_percent, dtype=float).astype(int)
+        a1 = np.ones(len(rel))
+        for pct, val in RELIABILITY_A1.items():
+            a1[rel == pct] = val
+        bounds = np.asarray([b for b, _ in TEMPERATURE_STEPS])
+        steps = np.asarray([a for _, a in TEMPERATURE_STEPS])
+        a3 = steps[np.minimum(np.searchsorted(bounds, cases.temperature_C, side="left"), len(steps) - 1)]
+        lubs = cases.lubrication or ["grease"] * len(rel)
+        a_lub = {l: lubrication_factor(l) for l in set(lubs)}
+        return a1 * a3 * np.asarray([a_lub[l] for l in lubs], dtype=float)
+
+
+class NoAdjustments:
+    """Plain L10h (a = 1)."""
+    name = "none"
+
+    def scalar(self, case: LoadCase) -> float:
+        return 1.0
+
+    def batch(self, cases: CaseArrays):
+        return np.ones(len(cases))
+
+
+LOAD_STRATEGIES = {
+    "iso281_xy": ISO281Load,
+    "conservative": ConservativeLoad,
+}
+EXPONENT_STRATEGIES = {
+    "by_type": ExponentByType,
+}
+ADJUSTMENT_STRATEGIES = {
+    "demo_a1_a3": DemoAdjustments,
+    "none": NoAdjustments,
+}
+
+
+# =========================
+# Engine
+# =========================
+@dataclass(frozen=True)
+class LifeResult:
+    P_N: float
+    L10_mrev: float
+    L10h: float
+    L10h_adj: float
+
+
+@dataclass
+class BatchResult:
+    """(n_cases, n_models) matrices; ndarrays with numpy, nested lists without."""
+    P_N: Any
+    L10h: Any
+    L10h_adj: Any
+
+
+@dataclass
+class LifeEngine:
+    load: Any = field(default_factory=ISO281Load)
+    exponent: Any = field(default_factory=ExponentByType)
+    adjustments: Any = field(default_factory=DemoAdjustments)
+
+    @property
+    def name(self) -> str:
+        return f"{self.load.name}+{self.exponent.name}+{self.adjustments.name}"
+
+    # ---- scalar API ----
+    def life(self, C_N: float, P_N: float, bearing_type: str, rpm: float) -> tuple[float, float]:
+        """(L10 [Mrev], L10h [h]) for a given P (clamped to P_MIN_N)."""
+        L10 = (float(C_N) / max(float(P_N), P_MIN_N)) ** self.exponent.scalar(bearing_type)
+        rpm = max(1.0, float(rpm or 1.0))
+        return L10, (1e6 * L10) / (60.0 * rpm)
+
+    def evaluate(self, bearing: Dict[str, Any], case: LoadCase) -> LifeResult:
+        P = self.load.scalar(case.Fr_N, case.Fa_N, bearing)
+        L10, L10h = self.life(float(bearing.get("C_N") or 0.0), P, bearing.get("type", ""), case.rpm)
+        return LifeResult(P, L10, L10h, L10h * self.adjustments.scalar(case))
+
+    # ---- batch API ----
+    def evaluate_catalog(self, cat: CatalogArrays, cases) -> BatchResult:
+        """Every (load case, model) pair. `cases`: LoadCase, list of LoadCase or CaseArrays."""
+        if isinstance(cases, LoadCase):
+            cases = [cases]
+        if not isinstance(cases, CaseArrays):
+            cases = CaseArrays.from_cases(cases)
+        if np is None:
+            rows = [[self.evaluate(b, cases.case(i)) for b in cat.models] for i in range(len(cases))]
+            return BatchResult(P_N=[[r.P_N for r in row] for row in rows],
+                               L10h=[[r.L10h for r in row] for row in rows],
+                               L10h_adj=[[r.L10h_adj for r in row] for row in rows])
+
+        P = self.load.batch(cases.Fr_N, cases.Fa_N, cat)
+        p = self.exponent.batch(cat)
+        rpm = np.maximum(np.asarray(cases.rpm, dtype=float), 1.0)[:, None]
+        L10 = (cat.C / np.maximum(P, P_MIN_N)) ** p
+        L10h = (1e6 * L10) / (60.0 * rpm)
+        L10h_adj = L10h * np.asarray(self.adjustments.batch(cases), dtype=float)[:, None]
+        return BatchResult(P_N=P, L10h=L10h, L10h_adj=L10h_adj)
+
+    def evaluate_row(self, cat: CatalogArrays, case: LoadCase) -> List[LifeResult]:
+        """One load case across the catalog, as plain LifeResult objects."""
+        res = self.evaluate_catalog(cat, case)
+        P, L10h, adj = (_row0(res.P_N), _row0(res.L10h), _row0(res.L10h_adj))
+        rev_per_h = 60.0 * max(1.0, float(case.rpm or 1.0)) / 1e6
+        return [LifeResult(P[j], L10h[j] * rev_per_h, L10h[j], adj[j]) for j in range(len(cat))]
+
+
+def _row0(m) -> List[float]:
+    row = m[0]
+    return row.tolist() if hasattr(row, "tolist") else list(row)
+
+
+def margin_percent(L10h: float, target: float) -> float:
+    """(L10h - target) * 100 / target, with the divisor clamped to >= 1 h."""
+    return (L10h - float(target)) * 100.0 / max(float(target), 1.0)
+
+
+def build_engine(load: str = "iso281_xy", exponent: str = "by_type",
+                 adjustments: str = "demo_a1_a3", **load_kwargs) -> LifeEngine:
+    """Engine from strategy names (see *_STRATEGIES)."""
+    return LifeEngine(load=LOAD_STRATEGIES[load](**load_kwargs),
+                      exponent=EXPONENT_STRATEGIES[exponent](),
+                      adjustments=ADJUSTMENT_STRATEGIES[adjustments]())
+
+
+DEFAULT_ENGINE = build_engine()
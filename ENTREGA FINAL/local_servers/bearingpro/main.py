@@ -1,13 +1,57 @@
 # main.py
 # bearingpro-mcp: JSON-RPC over stdio (MCP-like) for bearing selection/verification
+# tools/list returns TOOLS with JSON Schemas (the host builds LLM tool definitions from
+# them). tools/call runs on a small thread pool, so several calls can be in flight on
+# the one pipe (answers carry their request id; frames are written under a lock);
+# what-if calls stay on the reader thread because the session store is not shared-safe.
 
-import sys, json
+import sys, json, os, threading, time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from bearing_utils import adjusted_P, calc_l10h, round2
+from bearing_utils import ENGINE, CatalogArrays, LoadCase, margin_percent, round2
+from sweep import iter_sweep
+from whatif import STORE as WHATIF
 
 CATALOG_PATH = Path(__file__).parent / "catalog.json"
 CAT = json.loads(CATALOG_PATH.read_text(encoding="utf-8"))
 BEARINGS = CAT.get("bearings", [])
+ARRAYS = CatalogArrays.from_bearings(BEARINGS)  # column view for batch evaluation
+PROGRESS_MIN_INTERVAL = 0.25  # seconds between progress frames (last one always sent)
+CALL_WORKERS = int(os.getenv("BEARINGPRO_CALL_WORKERS", "4"))
+_WRITE_LOCK = threading.Lock()
+
+LOAD_PROPS = {
+    "Fr_N": {"type": "number", "description": "Radial load [N]"},
+    "Fa_N": {"type": "number", "description": "Axial load [N]"},
+    "rpm": {"type": "number", "description": "Speed [rpm]"},
+    "L10h_target": {"type": "number", "description": "Required life [h] (default 12000)"},
+    "reliability_percent": {"type": "integer", "description": "90..99 (default 90)"},
+    "temperature_C": {"type": "number", "description": "Operating temperature [C] (default 25)"},
+    "lubrication": {"type": "string", "enum": ["grease", "oil"]},
+}
+SWEEP_AXIS = {"description": "scalar, list or {start, stop, num}"}
+
+def _schema(props=None, required=()):
+    return {"type": "object", "properties": props or {}, "required": list(required)}
+
+TOOLS = [
+    {"name": "select_bearing", "description": "Select bearings from the catalog that meet L10h_target for the given loads",
+     "inputSchema": _schema(LOAD_PROPS)},
+    {"name": "verify_point", "description": "Verify one catalog model at an operating point",
+     "inputSchema": _schema({"model": {"type": "string", "description": "Catalog model, e.g. SKF_6205"}, **LOAD_PROPS},
+                            ["model"])},
+    {"name": "catalog_list", "description": "List the bearing catalog", "inputSchema": _schema()},
+    {"name": "whatif_open", "description": "Open a what-if session for a model at a base operating point",
+     "inputSchema": _schema({"model": {"type": "string"}, **LOAD_PROPS}, ["model"])},
+    {"name": "whatif_update", "description": "Apply parameter deltas to a what-if session (incremental recompute)",
+     "inputSchema": _schema({"session_id": {"type": "string"}, **LOAD_PROPS}, ["session_id"])},
+    {"name": "whatif_close", "description": "Close a what-if session",
+     "inputSchema": _schema({"session_id": {"type": "string"}}, ["session_id"])},
+    {"name": "sweep", "description": "Design-space sweep (rpm x Fr x Fa x T x reliability) over the catalog",
+     "inputSchema": _schema({**{ax: SWEEP_AXIS for ax in ("rpm", "Fr_N", "Fa_N", "temperature_C", "reliability_percent")},
+                             "L10h_target": {"type": "number"}, "models": {"type": "array", "items": {"type": "string"}},
+                             "top": {"type": "integer"}})},
+]
 
 def _read_frame():
     # Read headers
@@ -27,9 +71,10 @@ def _read_frame():
 
 def _write_frame(obj):
     data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
-    sys.stdout.buffer.write(f"Content-Length: {len(data)}\r\nContent-Type: application/json\r\n\r\n".encode("utf-8"))
-    sys.stdout.buffer.write(data)
-    sys.stdout.buffer.flush()
+    with _WRITE_LOCK:   # pool threads answer concurrently: one whole frame at a time
+        sys.stdout.buffer.write(f"Content-Length: {len(data)}\r\nContent-Type: application/json\r\n\r\n".encode("utf-8"))
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
 
 def _ok(id_, result):
     return {"jsonrpc": "2.0", "id": id_, "result": result}
@@ -37,6 +82,27 @@ def _ok(id_, result):
 def _err(id_, code=-32601, msg="method not found"):
     return {"jsonrpc": "2.0", "id": id_, "error": {"code": code, "message": msg}}
 
+def _progress_fn(req):
+    # MCP progress: the caller opts in with params._meta.progressToken
+    token = ((req.get("params") or {}).get("_meta") or {}).get("progressToken")
+    if token is None:
+        return None
+    last = [0.0]
+    def progress(done, total=None, message=None, partial=None, force=False):
+        now = time.monotonic()
+        if not force and now - last[0] < PROGRESS_MIN_INTERVAL:
+            return
+        last[0] = now
+        params = {"progressToken": token, "progress": done}
+        if total is not None:
+            params["total"] = total
+        if message:
+            params["message"] = message
+        if partial is not None:
+            params["partial"] = partial
+        _write_frame({"jsonrpc": "2.0", "method": "notifications/progress", "params": params})
+    return progress
+
 def _find_model(model):
     if not model: 
         return None
@@ -56,25 +122,28 @@ def tool_catalog_list(_args):
 
 def tool_select_bearing(args):
     # Inputs: Fr_N, Fa_N, rpm, L10h_target (defaults allowed)
-    Fr = float(args.get("Fr_N", 0) or 0)
-    Fa = float(args.get("Fa_N", 0) or 0)
-    rpm = float(args.get("rpm", 1800) or 1800)
+    try:
+        case = LoadCase.from_params(args)
+    except (ValueError, TypeError) as e:
+        return {"ok": False, "error": f"invalid operating point: {e}"}
     L10h_target = float(args.get("L10h_target", 12000) or 12000)
 
-    P = adjusted_P(Fr, Fa)
+    # one batch pass over the whole catalog (shared engine)
+    rows = ENGINE.evaluate_row(ARRAYS, case)
     cands = []
-    for it in BEARINGS:
-        C = float(it.get("C_N", 0) or 0)
-        L10h = calc_l10h(C, P, rpm)
-        if L10h >= L10h_target:
+    for it, r in zip(BEARINGS, rows):
+        if r.L10h_adj >= L10h_target:
             out = dict(it)
-            out["L10h_pred"] = round2(L10h)
-            out["margin_percent"] = round2((L10h - L10h_target) * 100.0 / max(L10h_target,1))
+            out["P_equiv_N"] = round2(r.P_N)
+            out["L10h_pred"] = round2(r.L10h_adj)
+            out["margin_percent"] = round2(margin_percent(r.L10h_adj, L10h_target))
             cands.append(out)
 
     # sort by minimal oversize (closest to target)
     cands.sort(key=lambda x: x.get("L10h_pred", 0))
-    return {"ok": True, "candidates": cands, "P_equiv_N": round2(P)}
+    # top-level P_equiv_N (clients read it): the first candidate's; none qualifies -> the largest P
+    P_top = cands[0]["P_equiv_N"] if cands else round2(max((r.P_N for r in rows), default=0.0))
+    return {"ok": True, "candidates": cands, "P_equiv_N": P_top, "engine": ENGINE.name}
 
 def tool_verify_point(args):
     # Inputs: model (required), Fr_N/Fa_N, rpm, L10h_target (defaults allowed)
@@ -83,55 +152,124 @@ def tool_verify_point(args):
     if not b:
         return {"ok": False, "error": f"model not found: {model}"}
 
-    Fr = float(args.get("Fr_N", 0) or 0)
-    Fa = float(args.get("Fa_N", 0) or 0)
-    rpm = float(args.get("rpm", 1800) or 1800)
+    try:
+        case = LoadCase.from_params(args)
+    except (ValueError, TypeError) as e:
+        return {"ok": False, "error": f"invalid operating point: {e}"}
     L10h_target = float(args.get("L10h_target", 12000) or 12000)
 
-    P = adjusted_P(Fr, Fa)
-    L10h = calc_l10h(float(b.get("C_N",0)), P, rpm)
+    r = ENGINE.evaluate(b, case)
+    P, L10h = r.P_N, r.L10h_adj
     res = {
         "ok": True,
         "model": b.get("model"),
         "type": b.get("type"),
-        "C_N": b.get("C_N"),
+        "C_N": b.get("C_N"), "C0_N": b.get("C0_N"),
         "d_mm": b.get("d_mm"), "D_mm": b.get("D_mm"), "B_mm": b.get("B_mm"),
         "P_equiv_N": round2(P),
         "L10h_pred": round2(L10h),
         "meets_target": bool(L10h >= L10h_target),
-        "margin_percent": round2((L10h - L10h_target) * 100.0 / max(L10h_target,1))
+        "margin_percent": round2(margin_percent(L10h, L10h_target))
     }
     return res
 
+def tool_whatif_open(args):
+    # Inputs: model + base operating point (same as verify_point) -> session_id
+    b = _find_model(args.get("model"))
+    if not b:
+        return {"ok": False, "error": f"model not found: {args.get('model')}"}
+    try:
+        sid = WHATIF.open(b, args)
+    except (ValueError, TypeError) as e:
+        return {"ok": False, "error": f"invalid operating point: {e}"}
+    return {**WHATIF.get(sid).result(), "session_id": sid}
+
+def tool_whatif_update(args):
+    # Inputs: session_id + only the changed parameters (Fr_N, Fa_N, rpm, ...)
+    sid = args.get("session_id")
+    deltas = {k: v for k, v in args.items() if k != "session_id"}
+    try:
+        s = WHATIF.update(sid, deltas)     # a bad value leaves the session as it was
+    except (ValueError, TypeError) as e:
+        return {"ok": False, "error": f"invalid update: {e}", "session_id": sid}
+    if s is None:
+        return {"ok": False, "error": f"unknown or expired session: {sid}"}
+    return {**s.result(), "session_id": sid, "recomputed": dict(s.recomputed)}
+
+def tool_whatif_close(args):
+    return {"ok": WHATIF.close(args.get("session_id")), "open_sessions": len(WHATIF)}
+
+def tool_sweep(args, progress=None):
+    # Inputs: rpm/Fr_N/Fa_N/temperature_C/reliability_percent as list, scalar or
+    # {start,stop,num}; L10h_target, models?, chunk_size?, workers?
+    # With progress: partial aggregates are streamed as notifications/progress.
+    out = None
+    try:
+        for out in iter_sweep(BEARINGS, args):
+            if progress and not out["done"]:
+                progress(out["evaluated"], out["total"],
+                         f"{out['evaluated']}/{out['total']} casos",
+                         partial={"models": out["models"]},
+                         force=out["evaluated"] == out["total"])
+    except (ValueError, KeyError, TypeError) as e:
+        return {"ok": False, "error": f"invalid sweep: {e}"}
+    return {"ok": True, **out}
+
+STATELESS = {
+    "catalog_list": tool_catalog_list,
+    "select_bearing": tool_select_bearing,
+    "verify_point": tool_verify_point,
+}
+WHATIF_TOOLS = {
+    "whatif_open": tool_whatif_open,
+    "whatif_update": tool_whatif_update,
+    "whatif_close": tool_whatif_close,
+}
+
+def _call(req):
+    mid = req.get("id")
+    name = (req.get("params") or {}).get("name")
+    args = (req.get("params") or {}).get("arguments") or {}
+    try:
+        if name in STATELESS:
+            _write_frame(_ok(mid, STATELESS[name](args)))
+        elif name == "sweep":
+            _write_frame(_ok(mid, tool_sweep(args, _progress_fn(req))))
+        else:
+            _write_frame(_err(mid, -32601, f"unknown tool: {name}"))
+    except Exception as e:
+        _write_frame(_err(mid, -32603, f"{name} failed: {e}"))
+
 def main():
+    pool = ThreadPoolExecutor(max_workers=CALL_WORKERS, thread_name_prefix="call")
     while True:
         req = _read_frame()
         if req is None:
+            pool.shutdown(wait=True)
             return
         mid = req.get("id")
         m = req.get("method")
         if m == "initialize":
             resp = _ok(mid, {
                 "protocolVersion": "2025-06-18",
-                "tools": [
-                    {"name": "select_bearing", "description": "Select bearing by loads"},
-                    {"name": "verify_point",   "description": "Verify model at operating point"},
-                    {"name": "catalog_list",   "description": "List catalog"}
-                ]
+                "capabilities": {"tools": {"listChanged": False}},
+                "tools": [{"name": t["name"], "description": t["description"]} for t in TOOLS]
             })
             _write_frame(resp)
             continue
+        if m == "tools/list":
+            _write_frame(_ok(mid, {"tools": TOOLS})); continue
         if m == "tools/call":
             name = (req.get("params") or {}).get("name")
-            args = (req.get("params") or {}).get("arguments") or {}
-            if name == "catalog_list":
-                _write_frame(_ok(mid, tool_catalog_list(args))); continue
-            if name == "select_bearing":
-                _write_frame(_ok(mid, tool_select_bearing(args))); continue
-            if name == "verify_point":
-                _write_frame(_ok(mid, tool_verify_point(args))); continue
-            _write_frame(_err(mid, -32601, f"unknown tool: {name}")); continue
+            if name in WHATIF_TOOLS:
+                args = (req.get("params") or {}).get("arguments") or {}
+                try:
+                    _write_frame(_ok(mid, WHATIF_TOOLS[name](args)))
+                except Exception as e:      # same contract as _call: answer, keep reading
+                    _write_frame(_err(mid, -32603, f"{name} failed: {e}"))
+                continue
+            pool.submit(_call, req); continue
         _write_frame(_err(mid))
-        
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
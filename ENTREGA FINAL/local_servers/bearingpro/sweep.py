@@ -0,0 +1,216 @@
+# sweep.py
+# Design-space sweep: rpm x Fr x Fa x temperature x reliability over the catalog.
+# The grid is never materialized: each chunk is a flat index range that the
+# worker unravels into load cases, evaluates with the shared engine in batch,
+# and reduces to per-model aggregates (pass count, min margin). Chunks run on
+# a ProcessPoolExecutor: the parent builds the catalog arrays once and hands
+# them to each worker through the pool initializer, so chunks carry only the
+# grid axes and index range, and model filters are column slices of them.
+# Workers start from a forkserver (spawn where there is none): the server calls tools
+# from a thread pool while its main thread blocks reading stdin, and a plain fork
+# copies that stdin lock held, so the child deadlocks closing its stdin.
+
+import math, multiprocessing, os, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List
+
+from bearing_utils import ENGINE, CatalogArrays, CaseArrays, LoadCase, round2
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+AXES = ["rpm", "Fr_N", "Fa_N", "temperature_C", "reliability_percent"]
+AXIS_DEFAULTS = {"rpm": 1800.0, "Fr_N": 0.0, "Fa_N": 0.0, "temperature_C": 25.0, "reliability_percent": 90}
+DEFAULT_CHUNK = 50_000
+INLINE_MAX = 20_000        # grids up to this size run in-process (no pool overhead)
+MAX_CASES = 50_000_000
+
+_POOL = None
+_POOL_WORKERS = 0
+_POOL_FOR = None           # catalog arrays the live pool's workers hold
+_POOL_CATALOG = None
+_WORKER_CATALOG: CatalogArrays | None = None
+_WORKER_ARRAYS: Dict[tuple, CatalogArrays] = {}
+
+# =========================
+# Grid parsing
+# =========================
+def _axis_values(spec) -> List[float]:
+    """Axis as list, scalar or {"start","stop","num"} (inclusive linspace)."""
+    if isinstance(spec, dict):
+        start, stop = float(spec["start"]), float(spec["stop"])
+        num = max(int(spec.get("num", 2)), 1)
+        if num == 1:
+            return [start]
+        return [start + (stop - start) * i / (num - 1) for i in range(num)]
+    if isinstance(spec, (list, tuple)):
+        return [float(v) for v in spec]
+    return [float(spec)]
+
+def _axis_len(spec) -> int:
+    if isinstance(spec, dict):
+        return max(int(spec.get("num", 2)), 1)
+    if isinstance(spec, (list, tuple)):
+        return len(spec)
+    return 1
+
+def grid_size(args: Dict[str, Any]) -> int:
+    """Number of cases, from the axis lengths only (no value list is built)."""
+    total = 1
+    for ax in AXES:
+        total *= _axis_len(args.get(ax, AXIS_DEFAULTS[ax]))
+    return total
+
+def parse_grid(args: Dict[str, Any], max_cases: int = MAX_CASES) -> Dict[str, List[float]]:
+    # size first: {"num": 10**9} is rejected before anything is allocated
+    total = grid_size(args)
+    if total > max_cases:
+        raise ValueError(f"grid too large: {total} cases (max {max_cases})")
+    return {ax: _axis_values(args.get(ax, AXIS_DEFAULTS[ax])) for ax in AXES}
+
+# =========================
+# Worker side
+# =========================
+def _init_worker(catalog: CatalogArrays):
+    # Runs once per worker process: keep the parent's catalog arrays resident, read-only
+    global _WORKER_CATALOG
+    if _WORKER_CATALOG is not catalog:
+        _WORKER_CATALOG = catalog
+        _WORKER_ARRAYS.clear()
+
+def _arrays_for(model_idx: tuple) -> CatalogArrays:
+    if len(model_idx) == len(_WORKER_CATALOG):
+        return _WORKER_CATALOG
+    cat = _WORKER_ARRAYS.get(model_idx)
+    if cat is None:
+        cat = _WORKER_CATALOG.take(model_idx)
+        _WORKER_ARRAYS[model_idx] = cat
+    return cat
+
+def _catalog(bearings: List[Dict[str, Any]]) -> CatalogArrays:
+    # Built once per catalog in the server process
+    global _POOL_CATALOG
+    if _POOL_CATALOG is None or _POOL_CATALOG.models != bearings:
+        _POOL_CATALOG = CatalogArrays.from_bearings(bearings)
+    return _POOL_CATALOG
+
+def _chunk_cases(grid: Dict[str, List[float]], start: int, stop: int, lubrication: str) -> CaseArrays:
+    shape = [len(grid[ax]) for ax in AXES]
+    if np is not None:
+        idx = np.unravel_index(np.arange(start, stop), shape)
+        cols = {ax: np.asarray(grid[ax], dtype=float)[i] for ax, i in zip(AXES, idx)}
+        return CaseArrays(lubrication=[lubrication] * (stop - start), **cols)
+    cases = []
+    for flat in range(start, stop):
+        vals, rem = {}, flat
+        for ax, n in zip(reversed(AXES), reversed(shape)):
+            rem, i = divmod(rem, n)
+            vals[ax] = grid[ax][i]
+        cases.append(LoadCase(vals["Fr_N"], vals["Fa_N"], vals["rpm"],
+                              int(vals["reliability_percent"]), vals["temperature_C"], lubrication))
+    return CaseArrays.from_cases(cases)
+
+def _eval_chunk(grid, start, stop, target, lubrication, model_idx) -> Dict[str, Any]:
+    """Evaluate one flat index range and reduce it to per-model aggregates."""
+    cat = _arrays_for(model_idx)
+    cases = _chunk_cases(grid, start, stop, lubrication)
+    L = ENGINE.evaluate_catalog(cat, cases).L10h_adj
+    if np is not None:
+        L = np.asarray(L)
+        passed = (L >= target).sum(axis=0).tolist()
+        worst = L.min(axis=0).tolist()
+    else:
+        passed = [sum(1 for row in L if row[j] >= target) for j in range(len(cat))]
+        worst = [min(row[j] for row in L) for j in range(len(cat))]
+    return {"n": stop - start, "passed": passed, "min_L10h": worst}
+
+def _get_pool(workers: int, catalog: CatalogArrays) -> ProcessPoolExecutor:
+    # One long-lived pool per server process and catalog (arrays sent once per worker)
+    global _POOL, _POOL_WORKERS, _POOL_FOR
+    if _POOL is None or _POOL_WORKERS != workers or _POOL_FOR is not catalog:
+        if _POOL is not None:
+            _POOL.shutdown(cancel_futures=True)
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        _POOL = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(catalog,),
+                                    mp_context=multiprocessing.get_context(method))
+        _POOL_WORKERS, _POOL_FOR = workers, catalog
+    return _POOL
+
+# =========================
+# Driver
+# =========================
+class _Aggregate:
+    def __init__(self, models: List[str], target: float, total: int):
+        self.models, self.target, self.total = models, target, total
+        self.done = 0
+        self.passed = [0] * len(models)
+        self.min_L10h = [float("inf")] * len(models)
+
+    def add(self, part: Dict[str, Any]):
+        self.done += part["n"]
+        self.passed = [a + b for a, b in zip(self.passed, part["passed"])]
+        self.min_L10h = [min(a, b) for a, b in zip(self.min_L10h, part["min_L10h"])]
+
+    def snapshot(self, top: int | None = None) -> Dict[str, Any]:
+        rows = []
+        for m, p, lo in zip(self.models, self.passed, self.min_L10h):
+            rows.append({
+                "model": m,
+                "pass_rate": round(p / self.done, 4) if self.done else 0.0,
+                # None until a case was evaluated (inf is not valid JSON)
+                "min_margin_percent": round2((lo - self.target) * 100.0 / max(self.target, 1))
+                                      if math.isfinite(lo) else None,
+            })
+        rows.sort(key=lambda r: (-r["pass_rate"], r["min_margin_percent"] is None, -(r["min_margin_percent"] or 0)))
+        return {"evaluated": self.done, "total": self.total,
+                "models": rows[:top] if top else rows}
+
+def iter_sweep(bearings: List[Dict[str, Any]], args: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield partial aggregates as chunks finish; the last item has done=True.
+    args: axes (list | scalar | {start,stop,num}), L10h_target, lubrication,
+          models (optional filter), chunk_size, workers, top (rows per partial).
+    """
+    t0 = time.perf_counter()
+    grid = parse_grid(args)
+    total = grid_size(args)
+
+    wanted = {str(m).lower() for m in (args.get("models") or [])}
+    model_idx = tuple(i for i, b in enumerate(bearings)
+                      if not wanted or b.get("model", "").lower() in wanted)
+    if not model_idx:
+        raise ValueError("no catalog models match 'models'")
+    names = [bearings[i].get("model") for i in model_idx]
+
+    target = float(args.get("L10h_target", 12000) or 12000)
+    lubrication = str(args.get("lubrication", "grease") or "grease")
+    chunk = max(int(args.get("chunk_size", DEFAULT_CHUNK) or DEFAULT_CHUNK), 1)
+    workers = int(args.get("workers") or os.getenv("BEARINGPRO_SWEEP_WORKERS") or os.cpu_count() or 1)
+    top = int(args.get("top", 10) or 10)
+
+    agg = _Aggregate(names, target, total)
+    ranges = [(s, min(s + chunk, total)) for s in range(0, total, chunk)]
+    meta = {"grid": {ax: len(grid[ax]) for ax in AXES}, "chunks": len(ranges), "workers": 1}
+
+    if total <= INLINE_MAX or workers <= 1:
+        _init_worker(_catalog(bearings))
+        for s, e in ranges:
+            agg.add(_eval_chunk(grid, s, e, target, lubrication, model_idx))
+            yield {**meta, **agg.snapshot(top), "done": False}
+    else:
+        meta["workers"] = workers
+        pool = _get_pool(workers, _catalog(bearings))
+        futs = [pool.submit(_eval_chunk, grid, s, e, target, lubrication, model_idx) for s, e in ranges]
+        for fut in as_completed(futs):
+            agg.add(fut.result())
+            yield {**meta, **agg.snapshot(top), "done": False}
+
+    yield {**meta, **agg.snapshot(), "done": True, "elapsed_s": round(time.perf_counter() - t0, 3)}
+
+def run_sweep(bearings: List[Dict[str, Any]], args: Dict[str, Any]) -> Dict[str, Any]:
+    final = None
+    for final in iter_sweep(bearings, args):
+        pass
+    return final
@@ -0,0 +1,127 @@
+# whatif.py
+# Stateful what-if sessions for verify_point. A session pins one model and an
+# operating point and caches the intermediates of the life chain:
+#   P (Fr, Fa) -> L10 = (C/P)^p -> L10h (rpm) -> a-factors (reliability, T, lub)
+# An update only recomputes the stages downstream of the changed parameters.
+# Idle sessions expire after a TTL and the store is capped (LRU eviction).
+
+import os, time, uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+from bearing_utils import ENGINE, LoadCase, margin_percent, round2
+
+SESSION_TTL_SEC = float(os.getenv("BEARINGPRO_SESSION_TTL", "600"))
+MAX_SESSIONS = int(os.getenv("BEARINGPRO_MAX_SESSIONS", "256"))
+
+LOAD_KEYS = {"Fr_N", "Fa_N"}
+SPEED_KEYS = {"rpm"}
+ADJ_KEYS = {"reliability_percent", "temperature_C", "lubrication"}
+TARGET_KEYS = {"L10h_target"}
+DELTA_KEYS = LOAD_KEYS | SPEED_KEYS | ADJ_KEYS | TARGET_KEYS
+
+@dataclass
+class WhatIfSession:
+    bearing: Dict[str, Any]
+    case: LoadCase
+    target: float
+    P: float = 0.0
+    L10: float = 0.0
+    L10h: float = 0.0
+    a: float = 1.0
+    last_used: float = field(default_factory=time.monotonic)
+    recomputed: Dict[str, int] = field(default_factory=lambda: {"P": 0, "L10": 0, "L10h": 0, "a": 0})
+
+    def compute(self, stages: set):
+        # Stage order matters: each stage feeds the next one
+        if "P" in stages:
+            self.P = ENGINE.load.scalar(self.case.Fr_N, self.case.Fa_N, self.bearing)
+            self.recomputed["P"] += 1
+        if "L10" in stages:
+            self.L10 = ENGINE.life(float(self.bearing.get("C_N") or 0.0), self.P,
+                                   self.bearing.get("type", ""), 1.0)[0]
+            self.recomputed["L10"] += 1
+        if "L10h" in stages:
+            self.L10h = (1e6 * self.L10) / (60.0 * max(1.0, float(self.case.rpm or 1.0)))
+            self.recomputed["L10h"] += 1
+        if "a" in stages:
+            self.a = ENGINE.adjustments.scalar(self.case)
+            self.recomputed["a"] += 1
+
+    def result(self) -> Dict[str, Any]:
+        L10h_adj = self.L10h * self.a
+        return {
+            "ok": True,
+            "model": self.bearing.get("model"),
+            "operating_point": {"Fr_N": self.case.Fr_N, "Fa_N": self.case.Fa_N, "rpm": self.case.rpm,
+                                "reliability_percent": self.case.reliability_percent,
+                                "temperature_C": self.case.temperature_C, "lubrication": self.case.lubrication,
+                                "L10h_target": self.target},
+            "P_equiv_N": round2(self.P),
+            "L10h_pred": round2(L10h_adj),
+            "meets_target": bool(L10h_adj >= self.target),
+            "margin_percent": round2(margin_percent(L10h_adj, self.target)),
+        }
+
+def stages_for(changed: set) -> set:
+    """Stages to recompute for a set of changed parameters."""
+    stages = set()
+    if changed & LOAD_KEYS:
+        stages |= {"P", "L10", "L10h"}
+    if changed & SPEED_KEYS:
+        stages.add("L10h")
+    if changed & ADJ_KEYS:
+        stages.add("a")
+    return stages
+
+class SessionStore:
+    def __init__(self, ttl_sec: float = SESSION_TTL_SEC, max_sessions: int = MAX_SESSIONS):
+        self.ttl = ttl_sec
+        self.max = max_sessions
+        self._items: "OrderedDict[str, WhatIfSession]" = OrderedDict()
+
+    def expire(self):
+        now = time.monotonic()
+        for sid in [k for k, s in self._items.items() if now - s.last_used > self.ttl]:
+            del self._items[sid]
+        while len(self._items) > self.max:
+            self._items.popitem(last=False)  # least recently used
+
+    def open(self, bearing: Dict[str, Any], args: Dict[str, Any]) -> str:
+        self.expire()
+        s = WhatIfSession(bearing=bearing, case=LoadCase.from_params(args),
+                          target=float(args.get("L10h_target", 12000) or 12000))
+        s.compute({"P", "L10", "L10h", "a"})
+        sid = uuid.uuid4().hex
+        self._items[sid] = s
+        self.expire()
+        return sid
+
+    def get(self, sid: str) -> WhatIfSession | None:
+        self.expire()
+        s = self._items.get(sid or "")
+        if s is not None:
+            s.last_used = time.monotonic()
+            self._items.move_to_end(sid)
+        return s
+
+    def update(self, sid: str, deltas: Dict[str, Any]) -> WhatIfSession | None:
+        s = self.get(sid)
+        if s is None:
+            return None
+        changed = {k for k in deltas if k in DELTA_KEYS}
+        # parse everything before touching the session: a bad value raises and changes nothing
+        case = LoadCase.from_params({**s.case.__dict__, **{k: deltas[k] for k in changed - TARGET_KEYS}})
+        target = float(deltas["L10h_target"] or s.target) if "L10h_target" in changed else s.target
+        s.case, s.target = case, target
+        s.compute(stages_for(changed))
+        return s
+
+    def close(self, sid: str) -> bool:
+        return self._items.pop(sid or "", None) is not None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+STORE = SessionStore()
@@ -2,7 +2,7 @@ import asyncio
 import logging
 import os
 
-from fastmcp import FastMCP 
+from fastmcp import Context, FastMCP
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(format="[%(levelname)s]: %(message)s", level=logging.INFO)
@@ -37,6 +37,24 @@ def subtract(a: int, b: int) -> int:
     logger.info(f">>> Tool: 'subtract' called with numbers '{a}' and '{b}'")
     return a - b
 
+@mcp.tool()
+async def count(n: int = 5, delay: float = 0.2, ctx: Context = None) -> int:
+    """Count to n slowly, reporting progress after each step (streaming demo).
+
+    Args:
+        n: How many steps.
+        delay: Seconds per step.
+
+    Returns:
+        n, once all steps are done.
+    """
+    n = max(1, min(int(n), 100))
+    for i in range(1, n + 1):
+        await asyncio.sleep(max(0.0, min(float(delay), 5.0)))
+        if ctx is not None:
+            await ctx.report_progress(i, n)
+    return n
+
 if __name__ == "__main__":
     logger.info(f" MCP server started on port {os.getenv('PORT', 8080)}")
     # Could also use 'sse' transport, host="0.0.0.0" required for Cloud Run.
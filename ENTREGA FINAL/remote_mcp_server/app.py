@@ -1,25 +1,72 @@
 # app.py
 # Minimal remote MCP-like server over HTTP JSON-RPC (Cloud Run friendly).
+# Tools live in a registry (name -> handler + schema): tools/list and tools/call
+# read it, so adding a tool is one decorated function. JSON-RPC batches (arrays)
+# are accepted and advertised in initialize (capabilities.batch).
+# Served by gunicorn with gunicorn.conf.py (gthread workers, keep-alive).
+# Responses above COMPRESS_MIN_BYTES are compressed (br if brotli is installed
+# and accepted, else gzip) according to the client's Accept-Encoding.
+# Read-only results (initialize, tools/list, tools marked cacheable) carry an ETag;
+# a request with a matching If-None-Match gets 304 and no body. Cacheable tool results are
+# kept per worker (bounded LRU, RESULT_CACHE_SIZE): a repeat call skips the handler.
+# The BearingPro engine tools (bearingpro_tools.py) are registered when the engine is
+# reachable; /healthz is liveness, /readyz readiness (503 until the catalog is loaded).
+# STARTUP_MODE=fast (Cloud Run cold starts): the engine is imported after the worker
+# is serving (gunicorn post_worker_init) instead of before the port opens.
 
-import json, datetime
+import gzip, hashlib, json, datetime, os, threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict
 from flask import Flask, request, make_response
 
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
 app = Flask(__name__)
 
+PROTOCOL_VERSION = "2025-06-18"
+MAX_BATCH = 100
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))   # below this, headers cost more than we save
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))              # fast levels: latency matters more than ratio
+MAX_ROWS = 50_000
+CACHE_MAX_AGE = int(os.getenv("CACHE_MAX_AGE", "0"))   # 0: clients revalidate every time (no-cache)
+STATIC_METHODS = {"initialize", "tools/list"}            # results fixed for the life of the process
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "512"))   # cacheable tools/call results per worker
+
+TOOLS: Dict[str, Dict[str, Any]] = {}
+
+def tool(name: str, description: str, properties: Dict[str, Any] | None = None, required=(),
+         cacheable: bool = False):
+    """Register a tool handler (args dict -> result dict). cacheable: same args, same result."""
+    def deco(fn: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        TOOLS[name] = {"fn": fn, "cacheable": cacheable, "spec": {
+            "name": name,
+            "description": description,
+            "inputSchema": {"type": "object", "properties": properties or {}, "required": list(required)},
+        }}
+        return fn
+    return deco
+
 def jsonrpc_ok(id_, result):
     return {"jsonrpc": "2.0", "id": id_, "result": result}
 
 def jsonrpc_err(id_, code=-32601, msg="method not found"):
     return {"jsonrpc": "2.0", "id": id_, "error": {"code": code, "message": msg}}
 
+@tool("echo", "Return back provided text", {"text": {"type": "string"}}, cacheable=True)
 def tool_echo(args):
     # demo tool: echo the text
     return {"ok": True, "text": str(args.get("text", ""))}
 
+@tool("time_now", "Current UTC time")
 def tool_time_now(_args):
     # demo tool: current server time
     return {"ok": True, "iso": datetime.datetime.utcnow().isoformat() + "Z"}
 
+@tool("add", "Add two numbers a+b", {"a": {"type": "number"}, "b": {"type": "number"}}, required=("a", "b"), cacheable=True)
 def tool_add(args):
     # demo tool: add a + b
     try:
@@ -29,6 +76,81 @@ def tool_add(args):
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
+@tool("rows", "Synthetic table of n bearing-like rows (payload size testing)",
+      {"n": {"type": "integer", "minimum": 1, "maximum": MAX_ROWS}}, cacheable=True)
+def tool_rows(args):
+    # demo tool: large, realistic JSON result (like catalog/sweep outputs)
+    n = max(1, min(int(args.get("n", 100) or 100), MAX_ROWS))
+    rows = [{"model": f"DEMO_{6200 + i % 100}_{i}", "type": "deep_groove_ball", "C_N": 10000 + 37 * i,
+             "C0_N": 5000 + 11 * i, "L10h_pred": round(1000 + i * 3.7, 2), "margin_percent": round((i % 200) - 50.5, 2)}
+            for i in range(n)]
+    return {"ok": True, "count": n, "rows": rows}
+
+# =========================
+# BearingPro engine (stateless tools; loaded at import = once per process)
+# =========================
+FAST_START = os.getenv("STARTUP_MODE", "").lower() == "fast"
+BEARINGPRO_REQUIRED = os.getenv("BEARINGPRO_REQUIRED", "0").lower() in {"1", "true", "yes", "on"}
+if os.getenv("BEARINGPRO_TOOLS", "1").lower() in {"0", "false", "no", "off"}:
+    BEARINGPRO = {"enabled": False}
+else:
+    try:
+        import bearingpro_tools
+        BEARINGPRO = {"enabled": True, "status": bearingpro_tools.register(tool, lazy=FAST_START)}
+    except Exception as e:   # engine not in this image: the demo tools still work
+        BEARINGPRO = {"enabled": False, "error": f"{type(e).__name__}: {e}"}
+        app.logger.warning("BearingPro tools unavailable: %s", BEARINGPRO["error"])
+
+def tool_specs():
+    return [t["spec"] for t in TOOLS.values()]
+
+# =========================
+# JSON-RPC methods
+# =========================
+def m_initialize(_params):
+    return {
+        "protocolVersion": PROTOCOL_VERSION,
+        "capabilities": {"tools": {"listChanged": False}, "batch": True},
+        "serverInfo": {"name": "remote-mcp", "version": "0.2.0"},
+        "tools": tool_specs(),   # kept for older clients that read tools from initialize
+    }
+
+def m_tools_list(_params):
+    return {"tools": tool_specs()}
+
+def m_tools_call(params):
+    name = params.get("name")
+    entry = TOOLS.get(name)
+    if entry is None:
+        raise LookupError(f"unknown tool: {name}")
+    return entry["fn"](params.get("arguments") or {})
+
+METHODS = {
+    "initialize": m_initialize,
+    "tools/list": m_tools_list,
+    "tools/call": m_tools_call,
+    "ping": lambda _params: {},
+}
+
+def handle_one(req) -> Dict[str, Any] | None:
+    """One JSON-RPC request -> response (None for notifications)."""
+    if not isinstance(req, dict):
+        return jsonrpc_err(None, -32600, "invalid request")
+    _id = req.get("id")
+    method = req.get("method")
+    params = req.get("params") or {}
+    fn = METHODS.get(method)
+    if fn is None:
+        resp = None if method and method.startswith("notifications/") else jsonrpc_err(_id)
+    else:
+        try:
+            resp = jsonrpc_ok(_id, fn(params))
+        except LookupError as e:
+            resp = jsonrpc_err(_id, -32601, str(e))
+        except Exception as e:
+            resp = jsonrpc_err(_id, -32603, f"internal error: {e}")
+    return None if "id" not in req else resp
+
 @app.route("/mcp", methods=["POST"])
 def mcp():
     try:
@@ -36,34 +158,122 @@ def mcp():
     except Exception:
         return make_response({"error": "invalid json"}, 400)
 
-    _id = req.get("id")
-    method = req.get("method")
-    params = req.get("params") or {}
+    if isinstance(req, list):
+        if not req:
+            return jsonrpc_err(None, -32600, "empty batch")
+        if len(req) > MAX_BATCH:
+            return jsonrpc_err(None, -32600, f"batch too large (max {MAX_BATCH})")
+        out = [r for r in (handle_one(x) for x in req) if r is not None]
+        if not out:
+            return make_response("", 202)   # only notifications
+        return make_response(json.dumps(out), 200, {"Content-Type": "application/json"})
+
+    if isinstance(req, dict) and "id" in req and _cacheable(req):
+        return _conditional(req)
+    resp = handle_one(req)
+    return resp if resp is not None else make_response("", 202)
+
+# =========================
+# Conditional requests (ETag / If-None-Match)
+# =========================
+_STATIC: Dict[str, tuple] = {}   # method -> (result, etag), built on first use per worker
+_RESULTS: "OrderedDict[str, tuple]" = OrderedDict()   # (tool, canonical args) -> (result, etag), LRU
+_RESULTS_LOCK = threading.Lock()                      # gthread: requests share the worker
 
-    if method == "initialize":
-        result = {
-            "protocolVersion": "2025-06-18",
-            "tools": [
-                {"name": "echo", "description": "Return back provided text"},
-                {"name": "time_now", "description": "Current UTC time"},
-                {"name": "add", "description": "Add two numbers a+b"}
-            ]
-        }
-        return jsonrpc_ok(_id, result)
+def _etag(result) -> str:
+    raw = json.dumps(result, sort_keys=True, separators=(",", ":")).encode()
+    return 'W/"%s"' % hashlib.sha1(raw).hexdigest()[:20]   # weak: same for gzip/br/identity bodies
 
+def _cacheable(req) -> bool:
+    method = req.get("method")
     if method == "tools/call":
-        name = params.get("name")
-        args = params.get("arguments") or {}
-        if name == "echo":
-            return jsonrpc_ok(_id, tool_echo(args))
-        if name == "time_now":
-            return jsonrpc_ok(_id, tool_time_now(args))
-        if name == "add":
-            return jsonrpc_ok(_id, tool_add(args))
-        return jsonrpc_err(_id, -32601, f"unknown tool: {name}")
-
-    return jsonrpc_err(_id)
+        return bool(TOOLS.get((req.get("params") or {}).get("name"), {}).get("cacheable"))
+    return method in STATIC_METHODS
+
+def _matches(header: str, tag: str) -> bool:
+    wanted = {t.strip().removeprefix("W/") for t in header.split(",") if t.strip()}
+    return "*" in wanted or tag.removeprefix("W/") in wanted
+
+def _conditional(req):
+    """Cacheable request: 304 when the client's copy is current, else the result + ETag."""
+    method = req["method"]
+    if method in STATIC_METHODS:
+        if method not in _STATIC:
+            result = METHODS[method]({})
+            _STATIC[method] = (result, _etag(result))
+        result, tag = _STATIC[method]       # no handler call, no hashing on later requests
+    else:
+        params = req.get("params") or {}
+        key = json.dumps([params.get("name"), params.get("arguments") or {}], sort_keys=True, default=str)
+        with _RESULTS_LOCK:
+            hit = _RESULTS.get(key)
+            if hit is not None:
+                _RESULTS.move_to_end(key)
+        if hit is None:
+            resp = handle_one(req)
+            if "error" in resp:
+                return resp
+            hit = (resp["result"], _etag(resp["result"]))
+            if RESULT_CACHE_SIZE > 0:
+                with _RESULTS_LOCK:
+                    _RESULTS[key] = hit
+                    while len(_RESULTS) > RESULT_CACHE_SIZE:
+                        _RESULTS.popitem(last=False)
+        result, tag = hit                   # a hit: no handler call, no hashing
+    headers = {"ETag": tag,
+               "Cache-Control": f"private, max-age={CACHE_MAX_AGE}" if CACHE_MAX_AGE > 0 else "private, no-cache"}
+    if _matches(request.headers.get("If-None-Match", ""), tag):
+        return make_response("", 304, headers)   # nothing serialized or sent
+    return make_response(json.dumps(jsonrpc_ok(req.get("id"), result)), 200,
+                         {"Content-Type": "application/json", **headers})
+
+def _accepted(header: str) -> Dict[str, float]:
+    """'gzip;q=0.8, br' -> {'gzip': 0.8, 'br': 1.0}"""
+    out = {}
+    for part in header.split(","):
+        name, _, q = part.strip().partition(";q=")
+        if name:
+            try:
+                out[name.strip().lower()] = float(q) if q else 1.0
+            except ValueError:
+                out[name.strip().lower()] = 0.0
+    return out
+
+@app.after_request
+def compress(resp):
+    if resp.direct_passthrough or resp.status_code != 200 or "Content-Encoding" in resp.headers:
+        return resp
+    resp.vary.add("Accept-Encoding")
+    data = resp.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return resp
+    acc = _accepted(request.headers.get("Accept-Encoding", ""))
+    if "*" in acc:
+        acc.setdefault("gzip", acc["*"])
+    if brotli is not None and acc.get("br", 0) > 0 and acc.get("br", 0) >= acc.get("gzip", 0):
+        body, enc = brotli.compress(data, quality=BROTLI_QUALITY), "br"
+    elif acc.get("gzip", 0) > 0:
+        body, enc = gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0), "gzip"
+    else:
+        return resp
+    resp.set_data(body)
+    resp.headers["Content-Encoding"] = enc
+    return resp
 
 @app.route("/", methods=["GET"])
 def health():
     return {"ok": True, "service": "remote-mcp", "status": "ready"}
+
+@app.route("/healthz", methods=["GET"])
+def liveness():
+    # the process answers: no dependencies checked (a failing check here restarts the container)
+    return {"ok": True}
+
+@app.route("/readyz", methods=["GET"])
+def readiness():
+    # ready to take traffic: registry built and, if required, the BearingPro catalog loaded
+    # (fast start: loading continues in the background, so this turns 200 a bit later)
+    loaded = BEARINGPRO["enabled"] and BEARINGPRO["status"].get("loaded")
+    ready = bool(TOOLS) and (loaded or not BEARINGPRO_REQUIRED)
+    body = {"ok": ready, "tools": len(TOOLS), "bearingpro": BEARINGPRO, "pid": os.getpid()}
+    return make_response(body, 200 if ready else 503)
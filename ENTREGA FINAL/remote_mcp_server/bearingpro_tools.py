@@ -0,0 +1,95 @@
+# bearingpro_tools.py
+# BearingPro engine as stateless HTTP tools: select_bearing, verify_point,
+# catalog_list and sweep (in-process, bounded). The tool code is the stdio server's
+# (local_servers/bearingpro/main.py), loaded once per process: with gunicorn's
+# preload_app the catalog and its column arrays are built in the master and shared
+# by every forked worker. No per-client state is kept, so any replica can answer
+# any request; what-if sessions are stateful and stay on the stdio server.
+# lazy=True (BEARINGPRO_LAZY=1, startup-optimized mode): schemas are registered
+# without importing the engine; it loads on the first call or from warm().
+# Location: BEARINGPRO_DIR (bearingpro/, engine included in bearing_engine/).
+
+import hashlib, importlib.util, os, sys, threading, time
+from pathlib import Path
+from typing import Any, Dict
+
+BEARINGPRO_DIR = Path(os.getenv("BEARINGPRO_DIR")
+                      or Path(__file__).resolve().parents[1] / "local_servers" / "bearingpro")
+SWEEP_MAX_CASES = int(os.getenv("SWEEP_MAX_CASES", "2000000"))   # one request must not hog a worker
+
+LOAD_PROPS = {
+    "Fr_N": {"type": "number", "description": "Radial load [N]"},
+    "Fa_N": {"type": "number", "description": "Axial load [N]"},
+    "rpm": {"type": "number"},
+    "L10h_target": {"type": "number", "description": "Required life [h]"},
+    "reliability_percent": {"type": "integer"},
+    "temperature_C": {"type": "number"},
+    "lubrication": {"type": "string"},
+}
+SWEEP_AXIS = {"description": "scalar, list or {start, stop, num}"}
+SWEEP_AXES = ["rpm", "Fr_N", "Fa_N", "temperature_C", "reliability_percent"]   # sweep.AXES, without importing it
+
+_ENGINE = None
+_LOCK = threading.Lock()
+STATUS: Dict[str, Any] = {"loaded": False}
+
+def load():
+    """Import bearingpro/main.py (catalog + engine) under its own module name."""
+    if str(BEARINGPRO_DIR) not in sys.path:
+        sys.path.append(str(BEARINGPRO_DIR))
+    spec = importlib.util.spec_from_file_location("bearingpro_main", BEARINGPRO_DIR / "main.py")
+    if spec is None:
+        raise ImportError(f"BearingPro not found in {BEARINGPRO_DIR}")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def engine():
+    """The loaded bearingpro module (first caller loads it, the others wait)."""
+    global _ENGINE
+    if _ENGINE is None:
+        with _LOCK:
+            if _ENGINE is None:
+                t0 = time.perf_counter()
+                bp = load()
+                STATUS.update(loaded=True, models=len(bp.BEARINGS), engine=bp.ENGINE.name,
+                              catalog_sha=hashlib.sha256(bp.CATALOG_PATH.read_bytes()).hexdigest()[:12],
+                              load_s=round(time.perf_counter() - t0, 3))
+                _ENGINE = bp
+    return _ENGINE
+
+def warm():
+    """Load the engine in the background (lazy mode: after the worker starts serving)."""
+    threading.Thread(target=engine, name="bearingpro-warm", daemon=True).start()
+
+def tool_sweep(args):
+    bp = engine()
+    from sweep import grid_size, parse_grid   # same module the stdio server uses
+    try:
+        total = grid_size(args)   # axis lengths only: an oversized grid is never built
+        if total <= SWEEP_MAX_CASES:
+            parse_grid(args, SWEEP_MAX_CASES)
+    except (ValueError, KeyError, TypeError) as e:
+        return {"ok": False, "error": f"invalid sweep: {e}"}
+    if total > SWEEP_MAX_CASES:
+        return {"ok": False, "error": f"grid too large for HTTP: {total} cases (max {SWEEP_MAX_CASES})"}
+    # workers=1: throughput scales with gunicorn workers/replicas, not a pool per request
+    return bp.tool_sweep({**args, "workers": 1})
+
+def register(tool, lazy: bool = False) -> Dict[str, Any]:
+    """Add the stateless tools to the registry (loading the engine now unless lazy)."""
+    if not (BEARINGPRO_DIR / "main.py").exists():
+        raise ImportError(f"BearingPro not found in {BEARINGPRO_DIR}")
+    tool("select_bearing", "Select bearings from the catalog that meet L10h_target for the given loads",
+         LOAD_PROPS, cacheable=True)(lambda args: engine().tool_select_bearing(args))
+    tool("verify_point", "Verify one catalog model at an operating point",
+         {"model": {"type": "string"}, **LOAD_PROPS}, required=("model",),
+         cacheable=True)(lambda args: engine().tool_verify_point(args))
+    tool("catalog_list", "List the bearing catalog", cacheable=True)(lambda args: engine().tool_catalog_list(args))
+    tool("sweep", "Design-space sweep (rpm x Fr x Fa x T x reliability) over the catalog",
+         {**{ax: SWEEP_AXIS for ax in SWEEP_AXES}, "L10h_target": {"type": "number"},
+          "models": {"type": "array", "items": {"type": "string"}}, "top": {"type": "integer"}}
+         )(tool_sweep)   # not cacheable: a revalidation would rerun the whole sweep for a 304
+    if not lazy:
+        engine()
+    return STATUS
@@ -0,0 +1,57 @@
+# gunicorn.conf.py
+# Tuned for Cloud Run: the dispatch is tiny and mostly I/O-bound, so a few
+# processes with many threads each (gthread) beat one sync worker.
+# Override with env vars: WEB_CONCURRENCY (processes), GUNICORN_THREADS, PORT.
+# Default processes = the CPUs this container may use (cgroup quota / affinity), not the
+# host's cpu_count(), capped by GUNICORN_MAX_WORKERS (each worker holds the numpy engine).
+# STARTUP_MODE=fast: the port opens before the BearingPro engine is imported; each
+# worker loads it in the background right after it starts (post_worker_init).
+import math, os
+
+bind = f":{os.getenv('PORT', '8080')}"
+worker_class = "gthread"
+
+def cpu_limit() -> int:
+    """Usable CPUs: the cgroup CPU quota (Cloud Run's vCPU limit) and the affinity mask."""
+    n = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    quota = None
+    try:
+        q, period = open("/sys/fs/cgroup/cpu.max").read().split()[:2]          # cgroup v2
+        quota = None if q == "max" else int(q) / int(period)
+    except (OSError, ValueError):
+        try:
+            q = int(open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read())       # cgroup v1
+            quota = q / int(open("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read()) if q > 0 else None
+        except (OSError, ValueError):
+            pass
+    if quota:
+        n = min(n, math.ceil(quota))
+    return max(1, n)
+
+workers = int(os.getenv("WEB_CONCURRENCY") or min(cpu_limit(), int(os.getenv("GUNICORN_MAX_WORKERS", "4"))))
+threads = int(os.getenv("GUNICORN_THREADS", "16"))
+keepalive = 75               # longer than the front end's idle timeout: reuse client connections
+timeout = 0                  # Cloud Run enforces the request timeout itself
+graceful_timeout = 10
+preload_app = True           # import the app once, fork workers afterwards (faster start)
+backlog = 2048
+max_requests = 0
+accesslog = None             # access logs cost more than the requests themselves here
+
+def when_ready(server):
+    # gunicorn writes headers and body with separate send() calls; with Nagle on,
+    # the body waits for the client's delayed ACK (~40 ms) on kept-alive connections.
+    # Accepted sockets inherit TCP_NODELAY from the listener on Linux.
+    import socket
+    for lst in server.LISTENERS:
+        try:
+            lst.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except (OSError, AttributeError):
+            pass   # unix sockets
+
+def post_worker_init(worker):
+    if os.getenv("STARTUP_MODE", "").lower() == "fast":
+        import sys
+        tools = sys.modules.get("bearingpro_tools")
+        if tools is not None:
+            tools.warm()
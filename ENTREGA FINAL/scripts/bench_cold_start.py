@@ -0,0 +1,129 @@
+# scripts/bench_cold_start.py
+# Start-to-first-response time of the Cloud Run servers (what a cold start adds to
+# the first user's latency). Each run spawns the server, then polls the first MCP
+# request (initialize) every few ms until it answers; for remote_mcp_server it also
+# times the first BearingPro call and /readyz.
+# Variants (local processes):
+#   eager   as before: engine imported before the port opens
+#   fast    STARTUP_MODE=fast: port first, engine loaded right after in the background
+#   no-pyc  fast, but with an empty bytecode cache (PYTHONPYCACHEPREFIX=<new dir>):
+#           everything, stdlib included, is compiled at start; the upper bound of an
+#           image built without bytecode (e.g. `uv sync` without UV_COMPILE_BYTECODE)
+# --docker IMAGE times `docker run` of a built image instead (container start included).
+# Usage:
+#   py -m scripts.bench_cold_start --target remote --runs 5
+#   py -m scripts.bench_cold_start --target fastmcp --variants fast,no-pyc
+#   py -m scripts.bench_cold_start --target remote --docker remote-mcp-bearingpro --json
+
+import argparse, http.client, json, os, statistics, subprocess, sys, tempfile, time
+from pathlib import Path
+
+from scripts.loadgen import APP_DIR, FASTMCP_DIR, PROTOCOL_VERSION, _free_port
+
+INIT = {"jsonrpc": "2.0", "id": 1, "method": "initialize",
+        "params": {"protocolVersion": PROTOCOL_VERSION, "capabilities": {},
+                   "clientInfo": {"name": "bench_cold_start", "version": "0.1.0"}}}
+FIRST_TOOL = {"jsonrpc": "2.0", "id": 2, "method": "tools/call",
+              "params": {"name": "select_bearing", "arguments": {"Fr_N": 3000, "Fa_N": 500, "rpm": 1800}}}
+VARIANTS = {
+    "eager": {"STARTUP_MODE": "eager"},
+    "fast": {"STARTUP_MODE": "fast"},
+    "no-pyc": {"STARTUP_MODE": "fast", "PYTHONPYCACHEPREFIX": None},   # None: fresh temp dir per run
+}
+
+def _request(port: int, method: str, path: str, body=None, timeout: float = 5.0):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        headers = {"Content-Type": "application/json", "Accept": "application/json, text/event-stream"}
+        conn.request(method, path, json.dumps(body) if body is not None else None, headers)
+        r = conn.getresponse()
+        r.read()
+        return r.status
+    finally:
+        conn.close()
+
+def _until(port: int, method: str, path: str, body, deadline: float, ok=(200,)) -> bool:
+    while time.perf_counter() < deadline:
+        try:
+            if _request(port, method, path, body) in ok:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.002)
+    return False
+
+def _spawn(target: str, port: int, env_extra, docker: str):
+    if docker:
+        cmd = ["docker", "run", "--rm", "-p", f"127.0.0.1:{port}:8080", "-e", "PORT=8080"]
+        for k, v in env_extra.items():
+            cmd += ["-e", f"{k}={v}"]
+        return subprocess.Popen(cmd + [docker], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    env = {**os.environ, "PORT": str(port), **env_extra}
+    if target == "remote":
+        cmd, cwd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}",
+                    "app:app"], APP_DIR
+    else:
+        cmd, cwd = [sys.executable, "server.py"], FASTMCP_DIR
+    return subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def run_once(target: str, variant: str, docker: str = "", timeout: float = 60.0):
+    port = _free_port()
+    env_extra, tmp = {}, None
+    for k, v in VARIANTS[variant].items():
+        if v is None:
+            tmp = tempfile.TemporaryDirectory(prefix="pyc-")
+            v = tmp.name
+        env_extra[k] = v
+    t0 = time.perf_counter()
+    proc = _spawn(target, port, env_extra, docker)
+    out = {}
+    try:
+        if not _until(port, "POST", "/mcp", INIT, t0 + timeout):
+            raise RuntimeError(f"{target}/{variant}: no response within {timeout}s")
+        out["first_response_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        if target == "remote":
+            t1 = time.perf_counter()
+            _request(port, "POST", "/mcp", FIRST_TOOL, timeout=timeout)
+            out["first_tool_ms"] = round((time.perf_counter() - t1) * 1000, 1)
+            _until(port, "GET", "/readyz", None, t0 + timeout)
+            out["ready_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        if tmp is not None:
+            tmp.cleanup()
+    return out
+
+def summarize(runs):
+    keys = runs[0].keys()
+    return {k: {"median": round(statistics.median(r[k] for r in runs), 1),
+                "min": min(r[k] for r in runs), "max": max(r[k] for r in runs)} for k in keys}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--target", choices=["remote", "fastmcp"], default="remote")
+    ap.add_argument("--variants", default="eager,fast,no-pyc")
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--docker", default="", help="image to `docker run` instead of a local process")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    results = {}
+    for v in args.variants.split(","):
+        runs = [run_once(args.target, v, args.docker) for _ in range(args.runs)]
+        results[v] = summarize(runs)
+    if args.json:
+        print(json.dumps({"target": args.target, "docker": args.docker or None, "runs": args.runs,
+                          "results": results}, indent=2))
+        return
+    print(f"target: {args.target}{'  image: ' + args.docker if args.docker else ''}   runs: {args.runs}"
+          "   (median [min-max] ms)")
+    for v, r in results.items():
+        cells = "  ".join(f"{k}={x['median']} [{x['min']}-{x['max']}]" for k, x in r.items())
+        print(f"{v:<8}{cells}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# scripts/bench_compression.py
+# Bytes on the wire and end-to-end latency of tools/call with and without
+# response compression, for a small (add) and large (rows) result.
+#   identity: Accept-Encoding: identity (no compression)
+#   gzip / br: what client/remote_clients.py asks for (br needs `pip install brotli`)
+# Latency is measured on the given URL (loopback by default, so CPU cost dominates)
+# and also modeled for a slower link: latency + wire_bytes / (--mbps).
+# Usage:
+#   py -m scripts.bench_compression --calls 50 --mbps 20
+#   py -m scripts.bench_compression --url https://<service>.run.app/mcp --json
+
+import argparse, json, statistics, time
+
+import requests
+
+from scripts.bench_remote_transport import start_local_server
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+PAYLOADS = {
+    "small (add)": {"name": "add", "arguments": {"a": 1, "b": 2}},
+    "large (rows 2k)": {"name": "rows", "arguments": {"n": 2000}},
+    "xlarge (rows 20k)": {"name": "rows", "arguments": {"n": 20000}},
+}
+
+def measure(s: requests.Session, url: str, call, encoding: str, calls: int):
+    body = {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": call}
+    headers = {"Accept-Encoding": encoding}
+    s.post(url, json=body, headers=headers, timeout=30).raise_for_status()   # warm connection
+    lat, wire, size, enc = [], 0, 0, "identity"
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        r = s.post(url, json=body, headers=headers, timeout=30)
+        r.raise_for_status()
+        r.json()                                   # include decode + parse, as a real client would
+        lat.append(time.perf_counter() - t0)
+        wire = int(r.headers.get("Content-Length", len(r.content)))
+        size = len(r.content)
+        enc = r.headers.get("Content-Encoding", "identity")
+    ms = sorted(x * 1000 for x in lat)
+    return {"encoding": enc, "wire_bytes": wire, "json_bytes": size,
+            "ratio": round(size / max(wire, 1), 2),
+            "p50_ms": round(ms[len(ms) // 2], 3), "mean_ms": round(statistics.fmean(ms), 3)}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="")
+    ap.add_argument("--calls", type=int, default=50)
+    ap.add_argument("--mbps", type=float, default=20.0, help="link bandwidth for the modeled latency")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    proc, url = None, args.url
+    if not url:
+        url, proc = start_local_server()
+    encodings = ["identity", "gzip"] + (["br"] if brotli is not None else [])
+    rows = []
+    try:
+        with requests.Session() as s:
+            for label, call in PAYLOADS.items():
+                for enc in encodings:
+                    r = measure(s, url, call, enc, args.calls)
+                    r["payload"] = label
+                    r["asked"] = enc
+                    r["modeled_ms"] = round(r["p50_ms"] + r["wire_bytes"] * 8 / (args.mbps * 1e6) * 1000, 2)
+                    rows.append(r)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    if args.json:
+        print(json.dumps({"url": url, "mbps": args.mbps, "results": rows}, indent=2))
+        return
+    print(f"URL: {url}   calls/cell: {args.calls}   modeled link: {args.mbps} Mbit/s")
+    print(f"{'payload':<20}{'asked':<10}{'sent':<10}{'wire B':>10}{'json B':>10}{'ratio':>7}"
+          f"{'p50 ms':>9}{'modeled ms':>12}")
+    for r in rows:
+        print(f"{r['payload']:<20}{r['asked']:<10}{r['encoding']:<10}{r['wire_bytes']:>10}{r['json_bytes']:>10}"
+              f"{r['ratio']:>7}{r['p50_ms']:>9}{r['modeled_ms']:>12}")
+
+if __name__ == "__main__":
+    main()
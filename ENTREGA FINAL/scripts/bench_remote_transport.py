@@ -0,0 +1,105 @@
+# scripts/bench_remote_transport.py
+# Cold vs warm latency of remote tools/call.
+#   cold: new connection per call (plain requests.post, the old transport)
+#   warm: pooled keep-alive session from client.remote_clients
+# By default it starts remote_mcp_server/app.py under gunicorn (gthread workers, as in
+# the Dockerfile; the Werkzeug dev server always closes connections) on a local port.
+# Pass --url to measure a deployed server instead (TLS handshakes make the gap larger).
+# Usage:
+#   py -m scripts.bench_remote_transport --calls 200
+#   py -m scripts.bench_remote_transport --url https://<service>.run.app/mcp
+
+import argparse, json, os, socket, statistics, subprocess, sys, time
+from pathlib import Path
+
+import requests
+
+APP_DIR = Path(__file__).resolve().parents[1] / "remote_mcp_server"
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_local_server():
+    """gunicorn app:app on 127.0.0.1:<free port>; returns (url, process)."""
+    port = _free_port()
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}",
+                             "--workers", "1", "--threads", "8", "--keep-alive", "75", "app:app"],
+                            cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}/mcp"
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            requests.get(url.rsplit("/", 1)[0] + "/", timeout=1)
+            return url, proc
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("local server did not start (pip install flask gunicorn)")
+
+def summarize(samples):
+    ms = sorted(x * 1000 for x in samples)
+    q = lambda p: ms[min(len(ms) - 1, int(p * len(ms)))]
+    return {"n": len(ms), "mean_ms": round(statistics.fmean(ms), 3), "p50_ms": round(q(0.50), 3),
+            "p95_ms": round(q(0.95), 3), "max_ms": round(ms[-1], 3)}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="")
+    ap.add_argument("--calls", type=int, default=200)
+    ap.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = ap.parse_args()
+
+    proc = None
+    url = args.url
+    if not url:
+        url, proc = start_local_server()
+    os.environ["REMOTE_MCP_URL"] = url
+    from client import remote_clients as rc
+    try:
+        run(args, url, rc)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+def run(args, url, rc):
+    payload = {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": "add", "arguments": {"a": 1, "b": 2}}}
+    requests.post(url, json=payload, timeout=15).raise_for_status()   # wake the server up
+
+    cold = []
+    for _ in range(args.calls):
+        t0 = time.perf_counter()
+        requests.post(url, json=payload, timeout=15).raise_for_status()
+        cold.append(time.perf_counter() - t0)
+
+    rc.close()
+    t0 = time.perf_counter()
+    rc.remote_add(1, 2)                  # first pooled call opens the connection
+    first = time.perf_counter() - t0
+    warm = []
+    for _ in range(args.calls):
+        t0 = time.perf_counter()
+        rc.remote_add(1, 2)
+        warm.append(time.perf_counter() - t0)
+
+    out = {"url": url, "transport": rc.transport_info(), "cold": summarize(cold),
+           "warm_first_call_ms": round(first * 1000, 3), "warm": summarize(warm)}
+    out["cold"]["connections"] = args.calls
+    out["warm"]["connections"] = out["transport"].get("connections_opened", "-")
+    out["speedup_p50"] = round(out["cold"]["p50_ms"] / max(out["warm"]["p50_ms"], 1e-9), 2)
+    rc.close()
+    if args.json:
+        print(json.dumps(out, indent=2))
+        return
+    print(f"URL: {url}   transport: {out['transport']['transport']}")
+    print(f"{'mode':<8}{'n':>6}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'conns':>8}")
+    for mode in ("cold", "warm"):
+        r = out[mode]
+        print(f"{mode:<8}{r['n']:>6}{r['mean_ms']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['max_ms']:>10}"
+              f"{r.get('connections', '-'):>8}")
+    print(f"first pooled call: {out['warm_first_call_ms']} ms   p50 speedup: {out['speedup_p50']}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# scripts/bench_sweep.py
+# Sweep scaling with worker processes on this machine, through the stdio server.
+# Each worker count gets a warm-up run (pool start + catalog shipped to the workers),
+# then the best of --repeat runs of the same grid (server-side elapsed_s).
+# Speedup is relative to workers=1; it cannot exceed the number of CPUs (printed),
+# so run it on a multi-core machine to see the scaling.
+# Usage:
+#   py -m scripts.bench_sweep --workers 1,2,4 --rpm 40 --fr 30 --fa 20 --temp 4 --rel 3
+
+import argparse, json, os, sys
+
+from client.local_clients import _init, tools_call
+from client.stdio_client import StdioClient
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", default="1,2,4")
+    ap.add_argument("--rpm", type=int, default=40)
+    ap.add_argument("--fr", type=int, default=30)
+    ap.add_argument("--fa", type=int, default=20)
+    ap.add_argument("--temp", type=int, default=4)
+    ap.add_argument("--rel", type=int, default=3)
+    ap.add_argument("--chunk", type=int, default=20_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    grid = {"rpm": {"start": 300, "stop": 6000, "num": args.rpm},
+            "Fr_N": {"start": 500, "stop": 8000, "num": args.fr},
+            "Fa_N": {"start": 0, "stop": 3000, "num": args.fa},
+            "temperature_C": {"start": 20, "stop": 110, "num": args.temp},
+            "reliability_percent": [90, 95, 99][:max(args.rel, 1)],
+            "chunk_size": args.chunk, "top": 3}
+    cmd = os.getenv("BEARINGPRO_CMD") or f"{sys.executable} local_servers/bearingpro/main.py"
+    client = StdioClient(server_cmd=cmd, timeout_sec=600.0)
+    rows = []
+    try:
+        _init(client)
+        for w in [int(x) for x in args.workers.split(",")]:
+            best = None
+            for i in range(args.repeat + 1):        # run 0 = warm-up
+                res = tools_call(client, "sweep", {**grid, "workers": w}).get("result", {})
+                if not res.get("ok", True) or "elapsed_s" not in res:
+                    raise RuntimeError(f"sweep failed: {json.dumps(res)[:200]}")
+                if i:
+                    best = res["elapsed_s"] if best is None else min(best, res["elapsed_s"])
+            rows.append((w, res["total"], best))
+    finally:
+        client.close()
+
+    base = rows[0][2]
+    print(f"cpus: {os.cpu_count()}  cases: {rows[0][1]}  chunk: {args.chunk}")
+    print(f"{'workers':>7} {'best s':>8} {'cases/s':>12} {'speedup':>8}")
+    for w, total, s in rows:
+        print(f"{w:>7} {s:>8.3f} {total / s:>12.0f} {base / s:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# scripts/context_test.py
+# Checks the host's LLM context handling against the local messages stub:
+#   - the history sent stays within the token budget while the naive history grows;
+#     older turns end up in a summary that travels in the system prompt
+#   - the static system prefix carries cache_control and is read from the (stub) cache
+#     from the second turn on; the planner's tool definitions are cached with it
+#   - per-turn report: tokens sent, saved by the window, cache reads
+# Usage:
+#   py -m scripts.context_test [--turns 12 --budget 300]   (needs: pip install anthropic)
+
+import argparse, json, os, sys
+
+from scripts.llm_stub import MessagesStub, start
+
+def check(label: str, cond: bool, detail=""):
+    print(f"[{'OK' if cond else 'FAIL'}] {label} {detail}")
+    if not cond:
+        check.failed += 1
+check.failed = 0
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--turns", type=int, default=12)
+    ap.add_argument("--budget", type=int, default=300)
+    args = ap.parse_args()
+
+    MessagesStub.ttft, MessagesStub.tps = 0.0, 5000.0
+    srv, base = start()
+    os.environ.setdefault("ANTHROPIC_API_KEY", "stub")
+    from host.llm_anthropic import LLMAnthropic
+    from host.context import ContextWindow
+    from host.chat import CHAT_SYSTEM, PLANNER_SYSTEM, _llm_tool
+    llm = LLMAnthropic(model="stub", base_url=base)
+    ctx = ContextWindow(budget_tokens=args.budget, keep_turns=2, summarizer=llm.summarize)
+
+    rows = []
+    for i in range(args.turns):
+        user = f"Turno {i}: rodamiento para Fr={1000 + 100 * i} N, Fa={200 + 10 * i} N y rpm={1500 + 50 * i}, " \
+               "temperatura 60 C y L10h 20000 h; compáralo con la opción anterior."
+        sent = ctx.window_tokens()
+        answer = llm.chat(ctx.messages(), user, system=CHAT_SYSTEM, system_extra=ctx.system_summary())
+        rep = ctx.report(sent, llm.last_stats)
+        ctx.add(user, answer)
+        if ctx.over_budget():
+            ctx.compact()        # the host does this in the background
+        rows.append(rep)
+        print(f"turn {i:2d}: sent {rep['sent']:4d}  naive {rep['naive']:5d}  saved {rep['saved_window']:5d}  "
+              f"cache read {rep['cache_read']:4d} write {rep['cache_write']:4d}  kept {rep['turns_kept']}")
+
+    worst = max(r["sent"] for r in rows)
+    check("history sent stays near the budget", worst <= args.budget + 150 and rows[-1]["naive"] > 2 * args.budget,
+          f"max sent {worst}, naive at the end {rows[-1]['naive']}")
+    check("older turns folded into a summary", ctx.totals["compactions"] > 0 and ctx.summary.startswith("Resumen"),
+          repr(ctx.summary[:60]))
+    last = [r for r in MessagesStub.requests if r.get("stream")][-1]
+    check("summary sent in the system prompt", any("Resumen" in b.get("text", "") for b in last["system"][1:]))
+    check("static prefix marked for caching", last["system"][0].get("cache_control") == {"type": "ephemeral"}
+          and last["system"][0]["text"] == CHAT_SYSTEM)
+    check("cached prefix read on later turns", all(r["cache_read"] > 0 for r in rows[1:]),
+          f"reads {[r['cache_read'] for r in rows]}")
+    check("tokens saved reported", sum(r["saved_window"] for r in rows) == ctx.totals["saved"] > 0,
+          json.dumps(ctx.info()))
+
+    tools = [_llm_tool({"name": n, "inputSchema": {"type": "object", "properties": {"Fr_N": {"type": "number"}}}}, n)
+             for n in ("select_bearing", "verify_point")]
+    llm.respond(llm.build_messages([], "selecciona para Fr=3000 rpm=1800"), tools, system=PLANNER_SYSTEM)
+    req = MessagesStub.requests[-1]
+    check("planner: tool schemas in the cached prefix, not in the messages",
+          req["tools"][-1].get("cache_control") == {"type": "ephemeral"} and "input_schema" not in json.dumps(req["messages"]))
+    srv.shutdown()
+    sys.exit(1 if check.failed else 0)
+
+if __name__ == "__main__":
+    main()
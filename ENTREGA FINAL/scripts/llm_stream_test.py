@@ -0,0 +1,56 @@
+# scripts/llm_stream_test.py
+# Checks the streamed LLM path against the local messages stub (scripts/llm_stub.py):
+#   LLMAnthropic.stream yields deltas as they arrive (first one long before the end),
+#   last_stats has TTFT and tokens/s, chat() joins the deltas and passes them to
+#   on_delta, and the host's run_stream prints the answer incrementally.
+# Usage:
+#   py -m scripts.llm_stream_test          (needs: pip install anthropic)
+
+import asyncio, contextlib, io, os, sys, time
+
+from scripts.llm_stub import MessagesStub, start
+
+def check(label: str, cond: bool, detail=""):
+    print(f"[{'OK' if cond else 'FAIL'}] {label} {detail}")
+    if not cond:
+        check.failed += 1
+check.failed = 0
+
+def main():
+    MessagesStub.ttft, MessagesStub.tps = 0.3, 40.0
+    srv, base = start()
+    os.environ.setdefault("ANTHROPIC_API_KEY", "stub")
+    from host.llm_anthropic import LLMAnthropic
+    llm = LLMAnthropic(model="stub", base_url=base)
+
+    reply = "uno dos tres cuatro cinco seis siete ocho nueve diez once doce"
+    MessagesStub.replies = [reply]
+    t0 = time.perf_counter()
+    arrivals = [(time.perf_counter() - t0, d) for d in llm.stream([{"role": "user", "content": "hola"},
+                                                                   {"role": "assistant", "content": "¡hola!"}], "cuenta")]
+    total = time.perf_counter() - t0
+    st = llm.last_stats
+    check("deltas arrive incrementally", len(arrivals) == 12 and arrivals[0][0] < total - 0.2,
+          f"{len(arrivals)} deltas, first at {arrivals[0][0]:.2f}s, last at {arrivals[-1][0]:.2f}s")
+    check("request was streamed with history", MessagesStub.requests[-1].get("stream") is True
+          and len(MessagesStub.requests[-1]["messages"]) == 3)
+    check("TTFT recorded", st.get("ttft_ms") and 250 <= st["ttft_ms"] <= 1000, f"{st.get('ttft_ms')} ms")
+    check("tokens/s recorded", st.get("output_tokens") == 12 and 15 <= (st.get("tokens_per_s") or 0) <= 60,
+          f"{st.get('output_tokens')} tokens, {st.get('tokens_per_s')} tok/s")
+
+    seen = []
+    text = llm.chat([], "ping", on_delta=seen.append)
+    check("chat() joins deltas + on_delta", text == "Recibido: ping" and "".join(seen) == text, repr(text))
+
+    from host import chat as host
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        answer = asyncio.run(host.run_stream("Pensando", "Host (LLM):", llm, [], "qué tal"))
+    printed = out.getvalue()
+    check("host renders the stream", answer == "Recibido: qué tal" and "Host (LLM): Recibido: qué tal" in printed
+          and "TTFT" in printed, repr(printed[:120]))
+    srv.shutdown()
+    sys.exit(1 if check.failed else 0)
+
+if __name__ == "__main__":
+    main()
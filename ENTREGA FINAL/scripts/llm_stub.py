@@ -0,0 +1,158 @@
+# scripts/llm_stub.py
+# Local stand-in for the Anthropic Messages endpoint (POST /v1/messages), streamed
+# (SSE: message_start, content_block_*, message_delta, message_stop) or plain JSON.
+# The answer is "Recibido: <last user text>" unless a reply is queued with
+# MessagesStub.replies; tokens are words, sent after --ttft seconds at --tps tokens/s.
+# Every request body is kept in MessagesStub.requests for checks.
+# Prompt caching is imitated: prefixes ending at cache_control breakpoints are stored;
+# the longest stored prefix of a request counts as cache_read_input_tokens, the rest
+# up to each breakpoint as cache_creation (no minimum length, 4 chars/token). Summary requests (system "Resume ...") get a short,
+# fixed answer.
+# Tool use: a queued reply may be {"text": "...", "tool_use": [{"name": ..., "input": {...}}]};
+# it answers with those tool_use blocks (input_json_delta when streamed) and stop_reason
+# "tool_use". Tool definitions count as the start of the cached prefix, like in the API.
+# Usage:
+#   py -m scripts.llm_stub --port 8090 --ttft 0.4 --tps 30
+#   set ANTHROPIC_BASE_URL=http://127.0.0.1:8090  &  set ANTHROPIC_API_KEY=stub
+#   py -m host.chat
+
+import argparse, json, re, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+class MessagesStub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    ttft = 0.2                       # s before the first token
+    tps = 50.0                       # tokens/s after it
+    replies: List[Any] = []          # queued answers (FIFO): text or {"text", "tool_use"}; empty -> echo
+    requests: List[Dict[str, Any]] = []
+    cached: set = set()              # prefixes seen at a cache_control breakpoint
+
+    def log_message(self, *a):
+        pass
+
+    @classmethod
+    def cache_usage(cls, body: Dict[str, Any]) -> Dict[str, int]:
+        system = body.get("system") or []
+        blocks = list(body.get("tools") or [])
+        blocks += [{"type": "text", "text": system}] if isinstance(system, str) else list(system)
+        for m in body.get("messages", []):
+            content = m.get("content")
+            blocks += [{"type": "text", "text": content}] if isinstance(content, str) else content
+        plain = [{k: v for k, v in b.items() if k != "cache_control"} if isinstance(b, dict) else b for b in blocks]
+        keys = [json.dumps(plain[:i + 1], sort_keys=True) for i in range(len(plain))]
+        sizes = [sum(len(json.dumps(x)) for x in plain[:i + 1]) // 4 for i in range(len(plain))]
+        marks = [i for i, b in enumerate(blocks) if isinstance(b, dict) and b.get("cache_control")]
+        # like the API: the longest block boundary up to the last breakpoint cached by an earlier request
+        hit = max((j for j in range(marks[-1] + 1) if keys[j] in cls.cached), default=None) if marks else None
+        read = sizes[hit] if hit is not None else 0
+        new = [i for i in marks if keys[i] not in cls.cached and sizes[i] > read]
+        write = sizes[new[-1]] - read if new else 0
+        cls.cached.update(keys[i] for i in marks)
+        return {"cache_read_input_tokens": read, "cache_creation_input_tokens": write}
+
+    @classmethod
+    def answer_for(cls, body: Dict[str, Any]):
+        if "Resume" in str(body.get("system", ""))[:20]:
+            return f"Resumen: {len(body.get('messages', [{}])[-1].get('content', ''))} caracteres de conversación."
+        if cls.replies:
+            return cls.replies.pop(0)
+        last = body.get("messages", [{}])[-1].get("content", "")
+        if isinstance(last, list):
+            last = " ".join(b.get("text") or b.get("content", "") for b in last if isinstance(b, dict))
+        return f"Recibido: {last}"
+
+    @staticmethod
+    def content_for(reply) -> List[Dict[str, Any]]:
+        if isinstance(reply, str):
+            return [{"type": "text", "text": reply}]
+        blocks = [{"type": "text", "text": reply["text"]}] if reply.get("text") else []
+        for i, t in enumerate(reply.get("tool_use") or []):
+            blocks.append({"type": "tool_use", "id": f"toolu_stub_{len(MessagesStub.requests)}_{i}",
+                           "name": t["name"], "input": t.get("input") or {}})
+        return blocks
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        type(self).requests.append(body)
+        content = self.content_for(self.answer_for(body))
+        tokens = re.findall(r"\S+\s*", " ".join(b["text"] if b["type"] == "text" else json.dumps(b["input"])
+                                                  for b in content))
+        stop = "tool_use" if any(b["type"] == "tool_use" for b in content) else "end_turn"
+        usage_in = sum(len(json.dumps(m.get("content", ""))) for m in body.get("messages", [])) // 4
+        usage = {"input_tokens": usage_in, **self.cache_usage(body)}
+        if not body.get("stream"):
+            time.sleep(self.ttft + len(tokens) / self.tps)
+            self._json({"id": "msg_stub", "type": "message", "role": "assistant", "model": body.get("model"),
+                        "content": content, "stop_reason": stop,
+                        "stop_sequence": None, "usage": {**usage, "output_tokens": len(tokens)}})
+            return
+        try:
+            self._stream(body, content, stop, len(tokens), usage)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True         # client stopped reading (cancelled answer)
+
+    def _stream(self, body, content, stop, n_tokens, usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._event("message_start", {"type": "message_start", "message": {
+            "id": "msg_stub", "type": "message", "role": "assistant", "model": body.get("model"), "content": [],
+            "stop_reason": None, "stop_sequence": None, "usage": {**usage, "output_tokens": 1}}})
+        time.sleep(self.ttft)
+        for idx, block in enumerate(content):
+            if block["type"] == "text":
+                start, deltas = {"type": "text", "text": ""}, [
+                    {"type": "text_delta", "text": tok} for tok in re.findall(r"\S+\s*", block["text"])]
+            else:
+                start = {**block, "input": {}}
+                deltas = [{"type": "input_json_delta", "partial_json": json.dumps(block["input"])}]
+            self._event("content_block_start", {"type": "content_block_start", "index": idx, "content_block": start})
+            for i, delta in enumerate(deltas):
+                if i or idx:
+                    time.sleep(1.0 / self.tps)
+                self._event("content_block_delta", {"type": "content_block_delta", "index": idx, "delta": delta})
+            self._event("content_block_stop", {"type": "content_block_stop", "index": idx})
+        self._event("message_delta", {"type": "message_delta", "delta": {"stop_reason": stop,
+                                      "stop_sequence": None}, "usage": {"output_tokens": n_tokens}})
+        self._event("message_stop", {"type": "message_stop"})
+        self._chunk(b"")
+
+    def _json(self, obj):
+        data = json.dumps(obj).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _event(self, name: str, data: Dict[str, Any]):
+        self._chunk(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode())
+
+def start(port: int = 0):
+    """Serve the stub in a background thread; returns (server, base_url)."""
+    srv = ThreadingHTTPServer(("127.0.0.1", port), MessagesStub)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_port}"
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8090)
+    ap.add_argument("--ttft", type=float, default=MessagesStub.ttft)
+    ap.add_argument("--tps", type=float, default=MessagesStub.tps)
+    args = ap.parse_args()
+    MessagesStub.ttft, MessagesStub.tps = args.ttft, args.tps
+    srv = ThreadingHTTPServer(("127.0.0.1", args.port), MessagesStub)
+    print(f"messages stub on http://127.0.0.1:{args.port} (ttft {args.ttft}s, {args.tps} tok/s)")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,437 @@
+# scripts/loadgen.py
+# Closed-loop load generator for the MCP endpoints of this project.
+# N virtual clients each send tools/call back to back for a fixed time, picking
+# tools from a weighted mix; we report calls/s, p50/p95/p99 latency and the error
+# rate per concurrency level, as a table or as JSON (--out saves it, --baseline
+# compares against a saved run).
+# Targets:
+#   http     remote_mcp_server/app.py  (HTTP JSON-RPC /mcp; --local starts gunicorn)
+#   fastmcp  mcp-on-cloudrun/server.py (streamable HTTP: initialize -> Mcp-Session-Id, SSE replies)
+#   stdio    local_servers/bearingpro  (one server process per virtual client, Content-Length frames)
+# Usage:
+#   py -m scripts.loadgen --local tuned --clients 1,10,100 --duration 5
+#   py -m scripts.loadgen --local baseline            (old: 1 worker x 8 threads)
+#   py -m scripts.loadgen --url https://<service>.run.app/mcp --mix add=3,echo=1
+#   py -m scripts.loadgen --target fastmcp --clients 1,10 --out fastmcp.json
+#   py -m scripts.loadgen --target stdio --clients 1,4 --mix select_bearing=1,verify_point=3
+#   py -m scripts.loadgen --target http --mix mix.json --baseline last.json
+# A mix is "tool=weight,..." (arguments from PRESET_ARGS) or a JSON file with
+# [{"name": ..., "arguments": {...}, "weight": 1}, ...].
+# An error is a transport failure, a non-2xx status, a JSON-RPC error or a tool
+# result flagged as failed (isError / "ok": false).
+# Needs flask/gunicorn for --local, fastmcp for a local fastmcp target. The client
+# side is a minimal asyncio HTTP/1.1 keep-alive client (stdlib): on this 1-CPU box
+# httpx with 100 pooled connections stalled for seconds and became the bottleneck.
+
+import argparse, asyncio, json, os, random, shlex, socket, ssl, subprocess, sys, time, urllib.request
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parents[1]
+APP_DIR = ROOT / "remote_mcp_server"
+FASTMCP_DIR = ROOT / "mcp-on-cloudrun"
+BEARINGPRO_MAIN = ROOT / "local_servers" / "bearingpro" / "main.py"
+LOCAL_PROFILES = {
+    "tuned": ["-c", "gunicorn.conf.py"],
+    "baseline": ["--workers", "1", "--threads", "8", "--timeout", "0"],   # previous Dockerfile
+}
+PROTOCOL_VERSION = "2025-06-18"
+PRESET_ARGS = {
+    # remote_mcp_server/app.py
+    "add": {"a": 1, "b": 2}, "echo": {"text": "hello"}, "time_now": {}, "rows": {"n": 200},
+    # mcp-on-cloudrun/server.py
+    "subtract": {"a": 10, "b": 3},
+    # local_servers/bearingpro
+    "select_bearing": {"Fr_N": 3000, "Fa_N": 500, "rpm": 1800, "L10h_target": 12000},
+    "verify_point": {"model": "NTN_6204C3", "Fr_N": 2000, "Fa_N": 300, "rpm": 1800},
+    "catalog_list": {},
+}
+DEFAULT_MIX = {"http": "add=1", "fastmcp": "add=1,subtract=1", "stdio": "select_bearing=1,verify_point=1"}
+ERROR_MARKERS = (b'"error":', b'"isError":true', b'"ok":false', b'"ok": false')
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _wait_tcp(port: int, proc, what: str):
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            break
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"local {what} server did not start")
+
+def start_local(profile: str):
+    port = _free_port()
+    env = {**os.environ, "PORT": str(port)}
+    cmd = [sys.executable, "-m", "gunicorn", *LOCAL_PROFILES[profile], "--bind", f"127.0.0.1:{port}", "app:app"]
+    proc = subprocess.Popen(cmd, cwd=APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}/mcp"
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1).read()
+            return url, proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("local server did not start (pip install flask gunicorn)")
+
+def start_local_fastmcp():
+    port = _free_port()
+    proc = subprocess.Popen([sys.executable, "server.py"], cwd=FASTMCP_DIR, env={**os.environ, "PORT": str(port)},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _wait_tcp(port, proc, "fastmcp (pip install fastmcp)")
+    return f"http://127.0.0.1:{port}/mcp", proc
+
+def percentile(sorted_ms: List[float], p: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    return sorted_ms[min(len(sorted_ms) - 1, int(p * len(sorted_ms)))]
+
+def parse_mix(spec: str) -> List[Dict[str, Any]]:
+    """'add=3,echo=1' or a JSON file -> [{"name", "arguments", "weight"}]."""
+    if spec.endswith(".json") and Path(spec).exists():
+        entries = json.loads(Path(spec).read_text(encoding="utf-8"))
+        return [{"name": e["name"], "arguments": e.get("arguments", PRESET_ARGS.get(e["name"], {})),
+                 "weight": float(e.get("weight", 1))} for e in entries]
+    out = []
+    for part in spec.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name:
+            out.append({"name": name, "arguments": PRESET_ARGS.get(name, {}), "weight": float(weight or 1)})
+    if not out:
+        raise ValueError(f"empty mix: {spec!r}")
+    return out
+
+def _failed(data: bytes) -> bool:
+    return any(m in data for m in ERROR_MARKERS)
+
+# =========================
+# Transports
+# =========================
+class HttpConn:
+    """One keep-alive connection; reconnects when the server closes it."""
+
+    def __init__(self, url: str):
+        u = urlsplit(url)
+        self.host, self.tls = u.hostname, u.scheme == "https"
+        self.port = u.port or (443 if self.tls else 80)
+        self.path = u.path or "/"
+        self.reader = self.writer = None
+
+    async def _connect(self):
+        ctx = ssl.create_default_context() if self.tls else None
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=ctx)
+
+    async def request(self, method: str, body: bytes = b"",
+                      headers: Dict[str, str] | None = None) -> Tuple[int, Dict[str, str], bytes]:
+        if self.writer is None:
+            await self._connect()
+        extra = "".join(f"{k}: {v}\r\n" for k, v in (headers or {}).items()).encode()
+        self.writer.write(b"%s %s HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\n%s"
+                          b"Content-Length: %d\r\n\r\n%s" % (method.encode(), self.path.encode(), self.host.encode(),
+                                                            extra, len(body), body))
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split()[1])
+        hdrs = {k.strip().lower(): v.strip() for k, v in (l.split(":", 1) for l in lines[1:] if ":" in l)}
+        if hdrs.get("transfer-encoding", "").lower() == "chunked":
+            data = await self._read_chunked()
+        else:
+            data = await self.reader.readexactly(int(hdrs.get("content-length", 0)))
+        if hdrs.get("connection", "").lower() == "close":
+            await self.close()
+        return status, hdrs, data
+
+    async def _read_chunked(self) -> bytes:
+        parts = []
+        while True:
+            size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            if size == 0:
+                await self.reader.readuntil(b"\r\n")      # no trailers expected
+                return b"".join(parts)
+            parts.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+    async def post(self, body: bytes) -> Tuple[int, bytes]:
+        status, _, data = await self.request("POST", body)
+        return status, data
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = self.reader = None
+
+class HttpTarget:
+    """remote_mcp_server: stateless JSON-RPC over POST (optionally batched)."""
+
+    def __init__(self, url: str, mix: List[Dict[str, Any]], batch: int = 1):
+        self.conn = HttpConn(url)
+        self.bodies = []
+        for e in mix:
+            call = {"name": e["name"], "arguments": e["arguments"]}
+            if batch > 1:
+                body = [{"jsonrpc": "2.0", "id": i, "method": "tools/call", "params": call} for i in range(batch)]
+            else:
+                body = {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": call}
+            self.bodies.append(json.dumps(body).encode())   # encoded once: the generator stays cheap
+
+    async def open(self):
+        pass
+
+    async def call(self, i: int) -> bool:
+        status, data = await self.conn.post(self.bodies[i])
+        return status == 200 and not _failed(data)
+
+    async def close(self):
+        await self.conn.close()
+
+class FastMcpTarget:
+    """FastMCP streamable HTTP: one MCP session per virtual client, replies as JSON or SSE."""
+    ACCEPT = "application/json, text/event-stream"
+
+    def __init__(self, url: str, mix: List[Dict[str, Any]]):
+        self.conn = HttpConn(url)
+        self.calls = [{"name": e["name"], "arguments": e["arguments"]} for e in mix]
+        self.session = ""
+        self._ids = 0
+
+    def _headers(self) -> Dict[str, str]:
+        h = {"Accept": self.ACCEPT, "MCP-Protocol-Version": PROTOCOL_VERSION}
+        if self.session:
+            h["Mcp-Session-Id"] = self.session
+        return h
+
+    async def _rpc(self, method: str, params: Dict[str, Any], notify: bool = False):
+        msg: Dict[str, Any] = {"jsonrpc": "2.0", "method": method, "params": params}
+        if not notify:
+            self._ids += 1
+            msg["id"] = self._ids
+        status, hdrs, data = await self.conn.request("POST", json.dumps(msg).encode(), self._headers())
+        if "text/event-stream" in hdrs.get("content-type", ""):
+            # the reply is the data: line of the last SSE event (earlier ones may be notifications)
+            lines = [l[5:].strip() for l in data.decode("utf-8", "replace").splitlines() if l.startswith("data:")]
+            data = lines[-1].encode() if lines else b""
+        return status, hdrs, data
+
+    async def open(self):
+        status, hdrs, data = await self._rpc("initialize", {
+            "protocolVersion": PROTOCOL_VERSION, "capabilities": {},
+            "clientInfo": {"name": "loadgen", "version": "0.1.0"}})
+        if status != 200:
+            raise RuntimeError(f"initialize failed: HTTP {status} {data[:200]!r}")
+        self.session = hdrs.get("mcp-session-id", "")
+        await self._rpc("notifications/initialized", {}, notify=True)
+
+    async def call(self, i: int) -> bool:
+        status, _, data = await self._rpc("tools/call", self.calls[i])
+        return status == 200 and not _failed(data)
+
+    async def close(self):
+        if self.session and self.conn.writer is not None:
+            try:
+                await self.conn.request("DELETE", b"", self._headers())   # end the server-side session
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                pass
+        await self.conn.close()
+
+class StdioTarget:
+    """BearingPro over stdio: each virtual client owns one server process."""
+
+    def __init__(self, cmd: str, mix: List[Dict[str, Any]]):
+        self.cmd = cmd
+        self.frames = []
+        for e in mix:
+            body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                               "params": {"name": e["name"], "arguments": e["arguments"]}}).encode()
+            self.frames.append(b"Content-Length: %d\r\nContent-Type: application/json\r\n\r\n%s" % (len(body), body))
+        self.proc = None
+
+    async def _read_frame(self) -> bytes:
+        length = 0
+        while True:
+            line = await self.proc.stdout.readline()
+            if not line:
+                raise ConnectionError("server exited")
+            line = line.strip()
+            if not line:
+                break
+            k, _, v = line.partition(b":")
+            if k.strip().lower() == b"content-length":
+                length = int(v)
+        return await self.proc.stdout.readexactly(length)
+
+    async def _exchange(self, frame: bytes) -> bytes:
+        self.proc.stdin.write(frame)
+        await self.proc.stdin.drain()
+        while True:
+            data = await self._read_frame()
+            if b'"id"' in data:          # skip notifications (progress, logs)
+                return data
+
+    async def open(self):
+        self.proc = await asyncio.create_subprocess_exec(
+            *shlex.split(self.cmd), stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            cwd=str(BEARINGPRO_MAIN.parent))
+        body = json.dumps({"jsonrpc": "2.0", "id": 0, "method": "initialize",
+                           "params": {"protocolVersion": PROTOCOL_VERSION}}).encode()
+        await self._exchange(b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+
+    async def call(self, i: int) -> bool:
+        return not _failed(await self._exchange(self.frames[i]))
+
+    async def close(self):
+        if self.proc is not None and self.proc.returncode is None:
+            self.proc.stdin.close()
+            try:
+                await asyncio.wait_for(self.proc.wait(), 5)
+            except asyncio.TimeoutError:
+                self.proc.kill()
+                await self.proc.wait()
+        self.proc = None
+
+def make_target(kind: str, where: str, mix: List[Dict[str, Any]], batch: int = 1):
+    if kind == "http":
+        return HttpTarget(where, mix, batch)
+    if kind == "fastmcp":
+        return FastMcpTarget(where, mix)
+    return StdioTarget(where, mix)
+
+# =========================
+# Load loop + report
+# =========================
+async def run_level(kind: str, where: str, clients: int, duration: float,
+                    mix: List[Dict[str, Any]], batch: int = 1) -> Dict[str, Any]:
+    """`clients` concurrent loops for `duration` seconds (after a short warm-up)."""
+    names = [e["name"] for e in mix]
+    lat: Dict[str, List[float]] = {n: [] for n in names}
+    errs: Dict[str, int] = {n: 0 for n in names}
+    cum, total = [], 0.0
+    for e in mix:
+        total += e["weight"]
+        cum.append(total)
+    targets = [make_target(kind, where, mix, batch) for _ in range(clients)]
+    opened = await asyncio.gather(*[t.open() for t in targets], return_exceptions=True)
+    setup_errors = sum(isinstance(o, BaseException) for o in opened)
+    live = [t for t, o in zip(targets, opened) if not isinstance(o, BaseException)]
+    stop_at = 0.0
+
+    async def worker(t, seed: int, record: bool):
+        rng = random.Random(seed)
+        picks = range(len(mix))
+        while time.perf_counter() < stop_at:
+            i = rng.choices(picks, cum_weights=cum)[0]
+            t0 = time.perf_counter()
+            try:
+                ok = await t.call(i)
+            except (OSError, asyncio.IncompleteReadError, ValueError, ConnectionError):
+                if isinstance(t, StdioTarget):
+                    return           # the server process is gone
+                await t.conn.close()
+                ok = False
+            if record:
+                if ok:
+                    lat[names[i]].append((time.perf_counter() - t0) * 1000)
+                else:
+                    errs[names[i]] += 1
+
+    stop_at = time.perf_counter() + min(1.0, duration / 5)      # warm-up: open connections
+    await asyncio.gather(*[worker(t, k, False) for k, t in enumerate(live)])
+    t_start = time.perf_counter()
+    stop_at = t_start + duration
+    await asyncio.gather(*[worker(t, 1000 + k, True) for k, t in enumerate(live)])
+    elapsed = time.perf_counter() - t_start
+    await asyncio.gather(*[t.close() for t in live], return_exceptions=True)
+
+    all_lat = sorted(x for v in lat.values() for x in v)
+    errors = sum(errs.values()) + setup_errors
+
+    def summary(ms: List[float], n_err: int) -> Dict[str, Any]:
+        n = len(ms) + n_err
+        return {"requests": n, "errors": n_err, "error_rate": round(n_err / n, 4) if n else 0.0,
+                "p50_ms": round(percentile(ms, 0.50), 2), "p95_ms": round(percentile(ms, 0.95), 2),
+                "p99_ms": round(percentile(ms, 0.99), 2)}
+
+    row = {"clients": clients, **summary(all_lat, errors),
+           "rps": round(len(all_lat) * batch / elapsed, 1),
+           "by_tool": {n: summary(sorted(lat[n]), errs[n]) for n in names}}
+    return row
+
+def print_table(title: str, rows: List[Dict[str, Any]], baseline: Dict[int, Dict[str, Any]] | None = None):
+    print(title)
+    print(f"{'clients':>8}{'requests':>10}{'errors':>8}{'err %':>8}{'calls/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          + (f"{'d calls/s':>11}{'d p99':>9}" if baseline else ""))
+    for r in rows:
+        line = (f"{r['clients']:>8}{r['requests']:>10}{r['errors']:>8}{r['error_rate'] * 100:>8.2f}{r['rps']:>10}"
+                f"{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}")
+        b = (baseline or {}).get(r["clients"])
+        if b:
+            line += f"{_delta(r['rps'], b['rps']):>11}{_delta(r['p99_ms'], b['p99_ms']):>9}"
+        print(line)
+
+def _delta(new: float, old: float) -> str:
+    return f"{(new - old) / old * 100:+.1f}%" if old else "-"
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--target", choices=["http", "fastmcp", "stdio"], default="http")
+    ap.add_argument("--url", default="", help="http/fastmcp endpoint (default: start one locally)")
+    ap.add_argument("--cmd", default="", help="stdio server command (default: BEARINGPRO_CMD or bearingpro/main.py)")
+    ap.add_argument("--local", choices=sorted(LOCAL_PROFILES), default="tuned", help="gunicorn profile (http)")
+    ap.add_argument("--mix", default="", help="tool=weight,... or a JSON file")
+    ap.add_argument("--clients", default="")
+    ap.add_argument("--duration", type=float, default=5.0)
+    ap.add_argument("--batch", type=int, default=1, help="tools/call per POST (http only); calls/s counts calls")
+    ap.add_argument("--json", action="store_true")
+    ap.add_argument("--out", default="", help="also write the JSON report to this file")
+    ap.add_argument("--baseline", default="", help="JSON report of an earlier run to compare with")
+    args = ap.parse_args()
+    if args.batch > 1 and args.target != "http":
+        ap.error("--batch is only supported by the http target")
+    mix = parse_mix(args.mix or DEFAULT_MIX[args.target])
+    clients = args.clients or ("1,4" if args.target == "stdio" else "1,10,100")
+
+    proc, where = None, args.url
+    if args.target == "stdio":
+        where = args.cmd or os.getenv("BEARINGPRO_CMD") or f'"{sys.executable}" "{BEARINGPRO_MAIN}"'
+        label = f"stdio: {where}"
+    elif args.url:
+        label = args.url
+    elif args.target == "http":
+        where, proc = start_local(args.local)
+        label = f"local gunicorn ({args.local})"
+    else:
+        where, proc = start_local_fastmcp()
+        label = "local fastmcp (streamable-http)"
+    try:
+        rows = [asyncio.run(run_level(args.target, where, int(n), args.duration, mix, args.batch))
+                for n in clients.split(",")]
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    report = {"target": args.target, "endpoint": label, "mix": mix, "batch": args.batch,
+              "duration_s": args.duration, "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "levels": rows}
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    baseline = None
+    if args.baseline:
+        prev = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        baseline = {r["clients"]: r for r in prev.get("levels", [])}
+    mix_s = ",".join(f"{e['name']}={e['weight']:g}" for e in mix)
+    print_table(f"{label}  mix={mix_s}  batch={args.batch}  duration={args.duration}s", rows, baseline)
+
+if __name__ == "__main__":
+    main()
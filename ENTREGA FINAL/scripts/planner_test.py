@@ -0,0 +1,90 @@
+# scripts/planner_test.py
+# Checks the tool-use planner against the local messages stub and a real BearingPro process:
+#   - the LLM tool definitions come from the server's tools/list (JSON Schemas)
+#   - three tool_use blocks in one answer run concurrently on the one stdio pipe and
+#     their results go back together in a single message: 2 LLM round trips in total
+#   - a failing tool comes back as is_error, and the model still gets a text answer
+#   - with a remote server (local gunicorn), remoto_* skips sweep and the tools BearingPro has
+# Usage:
+#   py -m scripts.planner_test          (needs: pip install anthropic)
+
+import asyncio, contextlib, io, json, os, sys
+
+from scripts.llm_stub import MessagesStub, start
+
+def check(label: str, cond: bool, detail=""):
+    print(f"[{'OK' if cond else 'FAIL'}] {label} {detail}")
+    if not cond:
+        check.failed += 1
+check.failed = 0
+
+def main():
+    MessagesStub.ttft, MessagesStub.tps = 0.05, 2000.0
+    srv, base = start()
+    os.environ.setdefault("ANTHROPIC_API_KEY", "stub")
+    os.environ.setdefault("BEARINGPRO_CMD", f"{sys.executable} local_servers/bearingpro/main.py")
+    from host import chat as host
+    from host.context import ContextWindow
+    from host.llm_anthropic import LLMAnthropic
+    from client.local_clients import bearingpro_shared, bearingpro_shared_close
+    llm = LLMAnthropic(model="stub", base_url=base)
+    ctx = ContextWindow()
+
+    tools = host.planner_tools()
+    names = [t["name"] for t in tools]
+    check("tool definitions from tools/list", {"select_bearing", "verify_point", "catalog_list"} <= set(names)
+          and not any(n.startswith("whatif_") for n in names)
+          and "Fr_N" in next(t for t in tools if t["name"] == "select_bearing")["input_schema"]["properties"],
+          str(names))
+
+    op = {"Fr_N": 2500, "Fa_N": 400, "rpm": 1800, "L10h_target": 15000}
+    MessagesStub.replies = [
+        {"text": "Consulto candidatos y verifico dos modelos.", "tool_use": [
+            {"name": "select_bearing", "input": op},
+            {"name": "verify_point", "input": {"model": "SKF_6205", **op}},
+            {"name": "verify_point", "input": {"model": "SKF_6206", **op}}]},
+        "El 6206 cumple con margen; el 6205 se queda corto.",
+    ]
+    n0 = len(MessagesStub.requests)
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        answer, dbg = asyncio.run(host.run_planner_turn(llm, ctx, "¿6205 o 6206 para Fr=2500 Fa=400 rpm=1800?"))
+    reqs = MessagesStub.requests[n0:]
+    check("tools sent with the request", [t["name"] for t in reqs[0].get("tools", [])] == names)
+    check("3 tool calls, 2 LLM round trips", len(dbg["tool_calls"]) == 3 and len(reqs) == 2 and dbg["rounds"] == 2,
+          f"{len(reqs)} requests, {[t['ms'] for t in dbg['tool_calls']]} ms")
+    results = reqs[1]["messages"][-1]["content"]
+    uses = [b for b in reqs[1]["messages"][-2]["content"] if b.get("type") == "tool_use"]
+    check("all results returned together", [b["type"] for b in results] == ["tool_result"] * 3
+          and [b["tool_use_id"] for b in results] == [b["id"] for b in uses]
+          and all(json.loads(b["content"]).get("ok") for b in results))
+    check("tool calls ran concurrently", bearingpro_shared().stats["max_in_flight"] >= 2,
+          json.dumps(bearingpro_shared().stats))
+    check("final answer streamed", answer.startswith("El 6206") and f"{host.planner_prefix()} El 6206" in out.getvalue()
+          and "en paralelo" in out.getvalue(), repr(answer))
+
+    MessagesStub.replies = [{"tool_use": [{"name": "verify_point", "input": {"model": "NO_EXISTE"}}]}, "No existe."]
+    with contextlib.redirect_stdout(io.StringIO()):
+        answer, dbg = asyncio.run(host.run_planner_turn(llm, ctx, "verifica NO_EXISTE"))
+    err = MessagesStub.requests[-1]["messages"][-1]["content"][0]
+    check("tool error sent as is_error", err.get("is_error") is True and answer == "No existe.", err["content"][:60])
+
+    from scripts.bench_remote_transport import start_local_server
+    url, proc = start_local_server()
+    try:
+        os.environ["REMOTE_MCP_URL"] = url
+        host._PLANNER_TOOLS = None
+        names = [t["name"] for t in host.planner_tools()]
+        remote = [n for n in names if n.startswith(host.REMOTE_PREFIX)]
+        check("remote tools filtered", remote and len(names) == len(set(names))
+              and not any(n[len(host.REMOTE_PREFIX):].startswith(host.PLANNER_SKIP) for n in remote)
+              and not {"remoto_select_bearing", "remoto_verify_point"} & set(remote), str(remote))
+    finally:
+        proc.kill(); proc.wait()
+
+    bearingpro_shared_close()
+    srv.shutdown()
+    sys.exit(1 if check.failed else 0)
+
+if __name__ == "__main__":
+    main()
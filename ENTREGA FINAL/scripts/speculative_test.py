@@ -0,0 +1,73 @@
+# scripts/speculative_test.py
+# Checks speculative tool execution in planner mode (messages stub + a real BearingPro process):
+#   - detect_intent parses the request and select_bearing starts while the LLM plans
+#   - the LLM asks for the same call (defaults written out): the result is reused, the
+#     server runs it once, and the time saved is reported
+#   - the LLM asks for something else: the speculated result is discarded, not sent
+#   - small talk starts nothing; hit rate is tracked across turns
+# Usage:
+#   py -m scripts.speculative_test          (needs: pip install anthropic)
+
+import asyncio, contextlib, io, json, os, sys
+
+from scripts.llm_stub import MessagesStub, start
+
+def check(label: str, cond: bool, detail=""):
+    print(f"[{'OK' if cond else 'FAIL'}] {label} {detail}")
+    if not cond:
+        check.failed += 1
+check.failed = 0
+
+def main():
+    MessagesStub.ttft, MessagesStub.tps = 0.3, 2000.0      # LLM "thinking" time the call can hide in
+    srv, base = start()
+    os.environ.setdefault("ANTHROPIC_API_KEY", "stub")
+    os.environ.setdefault("BEARINGPRO_CMD", f"{sys.executable} local_servers/bearingpro/main.py")
+    from host import chat as host
+    from host.context import ContextWindow
+    from host.llm_anthropic import LLMAnthropic
+    from client.local_clients import bearingpro_shared, bearingpro_shared_close
+    llm = LLMAnthropic(model="stub", base_url=base)
+    ctx = ContextWindow()
+    host.planner_tools()                   # warm process + tools/list: count only tool calls below
+
+    def turn(text, replies):
+        MessagesStub.replies = list(replies)
+        n0, calls0 = len(MessagesStub.requests), bearingpro_shared().stats["calls"]
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            answer, dbg = asyncio.run(host.run_planner_turn(llm, ctx, text))
+        return dbg, MessagesStub.requests[n0:], bearingpro_shared().stats["calls"] - calls0, out.getvalue()
+
+    text = "necesito seleccionar un rodamiento para Fr=2500 N, Fa=400 N a 1800 rpm"
+    planned = {"Fr_N": 2500, "Fa_N": 400, "rpm": 1800, "L10h_target": 12000}
+    dbg, reqs, server_calls, out = turn(text, [{"tool_use": [{"name": "select_bearing", "input": planned}]},
+                                               "Estos son los candidatos."])
+    spec = dbg["speculation"] or {}
+    sent = json.loads(reqs[-1]["messages"][-1]["content"][0]["content"])
+    check("select_bearing speculated from the text", spec.get("tool") == "select_bearing"
+          and spec.get("args") == {"Fr_N": 2500.0, "Fa_N": 400.0, "rpm": 1800.0}, json.dumps(spec.get("args")))
+    check("hit: result reused, server called once", spec.get("hit") is True and server_calls == 1
+          and sent.get("ok") and sent.get("candidates"), f"{server_calls} server call(s)")
+    check("latency saved reported", spec.get("saved_ms", 0) > 0 and "reutilizado" in out,
+          f"{spec.get('saved_ms')} ms saved (call {spec.get('call_ms')} ms)")
+
+    dbg, reqs, server_calls, out = turn(text, [{"tool_use": [{"name": "verify_point",
+                                                              "input": {"model": "SKF_6206", **planned}}]}, "Cumple."])
+    spec = dbg["speculation"] or {}
+    sent = [json.loads(b["content"]) for b in reqs[-1]["messages"][-1]["content"]]
+    check("miss: speculated result discarded", spec.get("hit") is False and "descartado" in out
+          and len(sent) == 1 and sent[0].get("model") == "SKF_6206" and "candidates" not in sent[0])
+
+    dbg, reqs, server_calls, out = turn("hola, ¿qué tal?", ["¡Hola!"])
+    check("small talk: nothing speculated", dbg["speculation"] is None and server_calls == 0)
+
+    info = host.SPEC.info()
+    check("hit rate tracked", info["started"] == 2 and info["hits"] == 1 and info["hit_rate"] == 0.5,
+          json.dumps(info))
+
+    bearingpro_shared_close()
+    srv.shutdown()
+    sys.exit(1 if check.failed else 0)
+
+if __name__ == "__main__":
+    main()
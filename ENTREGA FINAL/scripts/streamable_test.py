@@ -0,0 +1,119 @@
+# scripts/streamable_test.py
+# Checks the streamable-HTTP client (client/streamable_http.py + RemoteSession)
+# against a locally launched FastMCP server (mcp-on-cloudrun/server.py):
+#   initialize -> Mcp-Session-Id, tools/list (cached), add, count (progress events
+#   must arrive while the call runs), expired session -> transparent re-initialize.
+# Then resumption against a small local SSE stub that drops the stream after the
+# first event and replays the rest on GET + Last-Event-ID.
+# Usage:
+#   py -m scripts.streamable_test                  (needs: pip install fastmcp)
+#   py -m scripts.streamable_test --url http://localhost:8080/mcp
+
+import argparse, json, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from client.remote_clients import RemoteSession
+from client import streamable_http
+from scripts.loadgen import start_local_fastmcp
+
+def check(label: str, cond: bool, detail=""):
+    print(f"[{'OK' if cond else 'FAIL'}] {label} {detail}")
+    if not cond:
+        check.failed += 1
+check.failed = 0
+
+def test_fastmcp(url: str):
+    s = RemoteSession(url)
+    init = s.initialize()
+    check("initialize over SSE", s.streamable and bool(s.session_id),
+          f"session={s.session_id} version={s.protocol_version} server={init.get('serverInfo', {}).get('name')}")
+    names = [t["name"] for t in s.tools_list()]
+    s.tools_list()
+    check("tools/list cached", {"add", "subtract", "count"} <= set(names) and s.stats["tools_list_hits"] == 1, names)
+
+    out = s.tools_call("add", {"a": 1, "b": 2})
+    check("tools/call add", "3" in json.dumps(out), json.dumps(out)[:120])
+
+    t0 = time.perf_counter()
+    seen = []
+    out = s.tools_call("count", {"n": 4, "delay": 0.25},
+                       on_progress=lambda p: seen.append((round(time.perf_counter() - t0, 2), p.get("progress"))))
+    total = time.perf_counter() - t0
+    check("progress streamed before the result", len(seen) == 4 and seen[0][0] < total - 0.5,
+          f"events at {seen}, result after {total:.2f}s")
+
+    s.session_id = "expired-session-id"        # as if the server restarted
+    out = s.tools_call("subtract", {"a": 10, "b": 3})
+    check("expired session re-initialized", "7" in json.dumps(out) and s.stats["reinitializations"] == 1,
+          s.info()["session_id"])
+    s.close()
+
+class _ResumeStub(BaseHTTPRequestHandler):
+    """POST -> SSE with event 1 then a dropped connection; GET + Last-Event-ID: 1 -> events 2, 3."""
+    protocol_version = "HTTP/1.1"
+    events = [(str(i), {"jsonrpc": "2.0", "method": "notifications/progress",
+                        "params": {"progressToken": "p1", "progress": i}}) for i in (1, 2)]
+    events.append(("3", {"jsonrpc": "2.0", "id": 1, "result": {"ok": True}}))
+    seen_last_id = []
+
+    def log_message(self, *a):
+        pass
+
+    def _sse_head(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _event(self, id_, msg):
+        self._chunk(f"id: {id_}\nretry: 50\ndata: {json.dumps(msg)}\n\n".encode())
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._sse_head()
+        self._event(*self.events[0])
+        self._chunk(b"data: {\"partial")          # half an event, then the connection dies
+        self.close_connection = True
+
+    def do_GET(self):
+        last = self.headers.get("Last-Event-ID")
+        self.seen_last_id.append(last)
+        self._sse_head()
+        for id_, msg in self.events:
+            if int(id_) > int(last or 0):
+                self._event(id_, msg)
+        self._chunk(b"")
+
+def test_resume():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _ResumeStub)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{srv.server_port}/mcp"
+    reply = streamable_http.post(url, {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {}})
+    msgs = list(reply)
+    srv.shutdown()
+    check("stream resumed after drop", [m.get("params", {}).get("progress") for m in msgs[:2]] == [1, 2]
+          and msgs[-1].get("result") == {"ok": True} and reply.resumes == 1,
+          f"Last-Event-ID sent: {_ResumeStub.seen_last_id}, messages: {len(msgs)}")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="", help="FastMCP endpoint (default: start server.py locally)")
+    args = ap.parse_args()
+    proc, url = None, args.url
+    if not url:
+        url, proc = start_local_fastmcp()
+    try:
+        test_fastmcp(url)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+    test_resume()
+    sys.exit(1 if check.failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# external/croesus_async.py
+# Async Croesus client for bulk cross references (e.g. a plant's spare-parts list).
+# - Bounded concurrency (semaphore, capped at MAX_CONCURRENCY) over one pooled httpx.AsyncClient
+# - Retries with exponential backoff + jitter on 429 / 5xx / network errors
+#   (Retry-After is honored when the API sends it)
+# - search_many() dedups inputs and yields results as each one completes
+# - Concurrent identical searches share one in-flight request (single flight)
+# - Shares the sync client's guard (rate limit, adaptive concurrency, breaker)
+import asyncio, os, random
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from external.croesus_client import BASE_URL, CroesusError, default_guard
+from external.resilience import BackpressureError, Guard
+from external.singleflight import AsyncSingleFlight
+from external.xref_cache import XrefCache, normalize_key
+
+try:
+    import httpx
+except ImportError:  # optional dependency: pip install httpx
+    httpx = None
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_CONCURRENCY = 32   # callers pass tool arguments through: keep the pool and API load bounded
+
+class AsyncCroesusClient:
+    def __init__(self, api_key: str | None = None, base_url: str | None = None, timeout: float = 10.0,
+                 max_concurrency: int = 8, max_retries: int = 4, backoff_base: float = 0.5,
+                 backoff_max: float = 8.0, cache: Optional[XrefCache] = None, guard: Optional[Guard] = None):
+        if httpx is None:
+            raise RuntimeError("httpx not installed (pip install httpx).")
+        self.api_key = api_key or os.getenv("CROESUS_API_KEY")
+        if not self.api_key:
+            raise RuntimeError("Missing CROESUS_API_KEY environment variable.")
+        self.base_url = base_url or os.getenv("CROESUS_BASE_URL") or BASE_URL
+        self.timeout = timeout
+        self.max_concurrency = min(MAX_CONCURRENCY, max(1, int(max_concurrency)))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.cache = cache
+        self.guard = guard or default_guard()
+        self.stats = {"requests": 0, "retries": 0, "errors": 0, "cache_hits": 0, "deduplicated": 0}
+        self.flight = AsyncSingleFlight()
+        self._http = None
+        self._sem = None
+
+    async def __aenter__(self):
+        limits = httpx.Limits(max_connections=self.max_concurrency,
+                              max_keepalive_connections=self.max_concurrency)
+        self._http = httpx.AsyncClient(headers={"apikey": self.api_key}, timeout=self.timeout, limits=limits)
+        self._sem = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._http.aclose()
+        self._http = None
+
+    def _backoff(self, attempt: int, retry_after: str | None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * (0.5 + random.random() / 2)  # jitter avoids synchronized retries
+
+    async def search(self, brand_code: str, non_skf_designation: str) -> List[Dict[str, Any]]:
+        """GET /main with retries; raises CroesusError on final failure."""
+        return await self.flight.do(normalize_key(brand_code, non_skf_designation),
+                                    lambda: self._search(brand_code, non_skf_designation))
+
+    async def _search(self, brand_code: str, non_skf_designation: str) -> List[Dict[str, Any]]:
+        params = {"brand_code": brand_code.strip(), "non_skf_designation": non_skf_designation.strip()}
+        attempt = 0
+        while True:
+            retry_after = None
+            async with self._sem:
+                try:
+                    async with self.guard.attempt_async() as att:
+                        self.stats["requests"] += 1
+                        r = await self._http.get(self.base_url, params=params,
+                                                 timeout=self.guard.timeout(self.timeout))
+                        if r.status_code in RETRY_STATUS:
+                            att.failed()
+                except BackpressureError as e:
+                    raise CroesusError(str(e), None)   # fail fast: no retry while open/limited
+                except httpx.TransportError as e:
+                    status, error = None, f"network error: {e}"
+                else:
+                    if r.status_code == 401:
+                        raise CroesusError("Unauthorized (401): Invalid API key.", 401)
+                    if r.status_code == 400:
+                        raise CroesusError(f"Bad Request (400): {r.text}", 400)
+                    if r.status_code < 400:
+                        try:
+                            data = r.json()
+                        except ValueError:
+                            raise CroesusError(f"invalid JSON response (HTTP {r.status_code})", r.status_code)
+                        return data if isinstance(data, list) else []
+                    status, error = r.status_code, f"HTTP {r.status_code}"
+                    retry_after = r.headers.get("Retry-After")
+            if (status is not None and status not in RETRY_STATUS) or attempt >= self.max_retries:
+                raise CroesusError(error, status)
+            self.stats["retries"] += 1
+            await asyncio.sleep(self._backoff(attempt, retry_after))  # sleep outside the semaphore
+            attempt += 1
+
+    async def _one(self, key: str, brand: str, desig: str) -> Tuple[str, Dict[str, Any]]:
+        try:
+            hits = await self.search(brand, desig)
+        except CroesusError as e:
+            self.stats["errors"] += 1
+            return key, {"ok": False, "error": str(e), "status": e.status}
+        except httpx.HTTPError as e:   # anything else from httpx fails this item, not the batch
+            self.stats["errors"] += 1
+            return key, {"ok": False, "error": f"{type(e).__name__}: {e}", "status": None}
+        if self.cache is not None:
+            self.cache.put(brand, desig, hits)
+        return key, {"ok": True, "hits": hits, "source": "api"}
+
+    async def search_many(self, items: Iterable[Tuple[str, str]]) -> AsyncIterator[Tuple[Tuple[str, str], Dict[str, Any]]]:
+        """
+        Yield ((brand_code, designation), result) as each lookup completes.
+        Duplicates (after normalization) are fetched once and yielded once.
+        """
+        unique: Dict[str, Tuple[str, str]] = {}
+        for brand, desig in items:
+            key = normalize_key(brand, desig)
+            if key in unique:
+                self.stats["deduplicated"] += 1
+            else:
+                unique[key] = (brand, desig)
+
+        pending = []
+        for key, (brand, desig) in unique.items():
+            cached = self.cache.get(brand, desig) if self.cache is not None else None
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                yield (brand, desig), {"ok": True, "hits": cached, "source": "cache"}
+            else:
+                pending.append(asyncio.ensure_future(self._one(key, brand, desig)))
+        try:
+            for fut in asyncio.as_completed(pending):
+                key, res = await fut
+                yield unique[key], res
+        finally:
+            for fut in pending:
+                fut.cancel()
@@ -1,31 +1,75 @@
 # external/croesus_client.py
 # Simple Croesus (SKF) API client. Comments in simple English.
 import os, requests
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+from external.resilience import Guard
+from external.singleflight import SingleFlight
+from external.xref_cache import XrefCache, normalize_key
 
 BASE_URL = "https://skf-api-external-eu20-tyvvw4iy.prod.apimanagement.eu20.hana.ondemand.com/v1/croesusSearch/main"
 
+_GUARD = None
+
+class CroesusError(RuntimeError):
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+def default_guard() -> Guard:
+    """One rate limiter / breaker per process: every client shares the API quota."""
+    global _GUARD
+    if _GUARD is None:
+        _GUARD = Guard.from_env("CROESUS")
+    return _GUARD
+
 class CroesusClient:
-    def __init__(self, api_key: str | None = None, timeout: float = 10.0):
+    def __init__(self, api_key: str | None = None, timeout: float = 10.0,
+                 cache: Optional[XrefCache] = None, base_url: str | None = None,
+                 guard: Optional[Guard] = None):
         self.api_key = api_key or os.getenv("CROESUS_API_KEY")
         if not self.api_key:
             raise RuntimeError("Missing CROESUS_API_KEY environment variable.")
-        self.timeout = timeout
+        self.base_url = base_url or os.getenv("CROESUS_BASE_URL") or BASE_URL
+        self.timeout = timeout  # upper bound; the guard adapts it to observed latency
+        self.guard = guard or default_guard()
+        self.cache = cache  # optional persistent cache (see XrefCache.from_env)
         self.session = requests.Session()
         self.session.headers.update({"apikey": self.api_key})
+        self.flight = SingleFlight()  # identical concurrent lookups share one request
+
+    def lookup(self, brand_code: str, non_skf_designation: str) -> Dict[str, Any]:
+        """Like search(), but also says where the hits came from: {"hits", "source"}."""
+        if self.cache is not None:
+            hits = self.cache.get(brand_code, non_skf_designation)
+            if hits is not None:
+                return {"hits": hits, "source": "cache"}
+        hits = self.flight.do(normalize_key(brand_code, non_skf_designation),
+                              lambda: self._fetch_and_store(brand_code, non_skf_designation))
+        return {"hits": hits, "source": "api"}
+
+    def _fetch_and_store(self, brand_code: str, non_skf_designation: str) -> List[Dict[str, Any]]:
+        hits = self._fetch(brand_code, non_skf_designation)
+        if self.cache is not None:
+            self.cache.put(brand_code, non_skf_designation, hits)  # misses too (negative cache)
+        return hits
 
     def search(self, brand_code: str, non_skf_designation: str) -> List[Dict[str, Any]]:
+        """Return list of hits (cache first when configured, then GET /main)."""
+        return self.lookup(brand_code, non_skf_designation)["hits"]
+
+    def _fetch(self, brand_code: str, non_skf_designation: str) -> List[Dict[str, Any]]:
         """Call Croesus GET /main and return list of hits."""
         params = {
             "brand_code": brand_code.strip(),
             "non_skf_designation": non_skf_designation.strip(),
         }
-        r = self.session.get(BASE_URL, params=params, timeout=self.timeout)
-        if r.status_code == 401:
-            raise RuntimeError("Unauthorized (401): Invalid API key.")
-        if r.status_code == 400:
-            raise RuntimeError(f"Bad Request (400): {r.text}")
-        r.raise_for_status()
+        with self.guard.attempt():
+            r = self.session.get(self.base_url, params=params, timeout=self.guard.timeout(self.timeout))
+            if r.status_code == 401:
+                raise CroesusError("Unauthorized (401): Invalid API key.", 401)
+            if r.status_code == 400:
+                raise CroesusError(f"Bad Request (400): {r.text}", 400)
+            r.raise_for_status()
         data = r.json()
         # Expect an array of hits per Swagger
         return data if isinstance(data, list) else []
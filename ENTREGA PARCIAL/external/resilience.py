@@ -0,0 +1,356 @@
+# external/resilience.py
+# Back-pressure for calls to external APIs (stdlib only, sync + asyncio).
+# - TokenBucket: request rate matched to the API quota (rate/s, burst)
+# - AdaptiveLimiter: concurrency limit tuned by observed latency (AIMD) and an
+#   adaptive timeout (EWMA + 4 * deviation, like TCP's RTO) instead of a fixed one;
+#   a failed or timed-out call doubles it (RTO backoff) until a reply comes back.
+#   Only for short idempotent calls: long or non-idempotent ones use the configured timeout.
+# - CircuitBreaker: fails fast while open, lets a few probes through half-open
+# - Guard: the three together; `with guard.attempt() as att:` around each request
+# Used by external/croesus_*.py; ENTREGA FINAL ships a byte-identical copy as
+# client/resilience.py for client/remote_clients.py (tests/test_vendored.py).
+# A cancelled call is neutral: its slots are freed, the breaker and limit don't move.
+import asyncio, os, threading, time
+from typing import Any, Dict, Optional
+
+class BackpressureError(RuntimeError):
+    """Call rejected locally, before reaching the network."""
+
+class CircuitOpenError(BackpressureError):
+    pass
+
+class RateLimitedError(BackpressureError):
+    pass
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = float(rate)                      # tokens per second (<=0: unlimited)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self.stats = {"granted": 0, "waited_s": 0.0, "rejected": 0}
+
+    def _reserve(self) -> float:
+        """Take a token; return how long to wait for it (0 if available now)."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1.0
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def _unreserve(self):
+        with self._lock:
+            self._tokens += 1.0
+
+    def refund(self):
+        """Give back a granted token (the call was rejected further on, nothing was sent)."""
+        if self.rate > 0:
+            self._unreserve()
+
+    def _admit(self, max_wait: float) -> float:
+        if self.rate <= 0:
+            return 0.0
+        wait = self._reserve()
+        if wait > max_wait:
+            self._unreserve()
+            self.stats["rejected"] += 1
+            raise RateLimitedError(f"rate limit: next slot in {wait:.2f}s (max wait {max_wait}s)")
+        self.stats["granted"] += 1
+        self.stats["waited_s"] = round(self.stats["waited_s"] + wait, 3)
+        return wait
+
+    def acquire(self, max_wait: float = float("inf")):
+        wait = self._admit(max_wait)
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self, max_wait: float = float("inf")):
+        wait = self._admit(max_wait)
+        if wait:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.refund()
+                raise
+
+MAX_RTO_BACKOFF = 64
+
+class AdaptiveLimiter:
+    def __init__(self, initial: int = 4, min_limit: int = 1, max_limit: int = 32,
+                 target_latency: float = 1.0, backoff: float = 0.7):
+        self.min_limit, self.max_limit = int(min_limit), int(max_limit)
+        self.limit = float(max(self.min_limit, min(initial, self.max_limit)))
+        self.target = float(target_latency)
+        self.backoff = float(backoff)
+        self.in_flight = 0
+        self.ewma: Optional[float] = None
+        self.dev = 0.0
+        self.rto_backoff = 1          # x2 per failed call, back to 1 on a good reply
+        self._hold = 0                # calls in flight at the last decrease: they can't decrease again
+        self._cond = threading.Condition()
+        self._waiters: list = []      # async waiters (loop, future), woken when a slot frees up
+        self.stats = {"acquired": 0, "rejected": 0, "decreases": 0, "increases": 0}
+
+    def _try(self) -> bool:
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
+            self.stats["acquired"] += 1
+            return True
+        return False
+
+    def acquire(self, max_wait: float = float("inf")):
+        deadline = time.monotonic() + max_wait
+        with self._cond:
+            while not self._try():
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    self.stats["rejected"] += 1
+                    raise RateLimitedError(f"concurrency limit {int(self.limit)} reached")
+                self._cond.wait(min(left, 1.0))
+
+    async def acquire_async(self, max_wait: float = float("inf")):
+        deadline = time.monotonic() + max_wait
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self._try():
+                    return
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    self.stats["rejected"] += 1
+                    raise RateLimitedError(f"concurrency limit {int(self.limit)} reached")
+                waiter = (loop, loop.create_future())
+                self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter[1], min(left, 1.0))
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._cond:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+    def _wake(self):
+        # caller holds self._cond; waiters may sit on other threads' loops
+        self._cond.notify_all()
+        for loop, fut in self._waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, fut)
+            except RuntimeError:      # that loop is closed
+                pass
+        self._waiters.clear()
+
+    def release(self, latency: float, ok: bool):
+        with self._cond:
+            self.in_flight -= 1
+            # a failed (or timed-out) call took at least `latency`: it may only raise the estimate
+            if ok or self.ewma is None or latency > self.ewma:
+                self._sample(latency)
+            self.rto_backoff = 1 if ok else min(self.rto_backoff * 2, MAX_RTO_BACKOFF)
+            held, self._hold = self._hold > 0, max(0, self._hold - 1)
+            if not ok or latency > self.target:
+                # multiplicative decrease on errors/slow responses, once per window: the calls
+                # already in flight when it happened saw the same congestion
+                if not held:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._hold = self.in_flight
+                    self.stats["decreases"] += 1
+            elif self.limit < self.max_limit:
+                # additive increase: about +1 per window of `limit` fast calls
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+                self.stats["increases"] += 1
+            self._wake()
+
+    def _sample(self, latency: float):
+        if self.ewma is None:
+            self.ewma = latency
+        else:
+            err = latency - self.ewma
+            self.ewma += 0.125 * err
+            self.dev += 0.25 * (abs(err) - self.dev)
+
+    def cancel(self):
+        """Free a slot without a sample (the call was cancelled, not measured)."""
+        with self._cond:
+            self.in_flight -= 1
+            self._hold = max(0, self._hold - 1)
+            self._wake()
+
+    def timeout(self, ceiling: float, floor: float = 1.0) -> float:
+        """Adaptive request timeout, never above the configured one."""
+        if self.ewma is None:
+            return ceiling
+        return max(floor, min(ceiling, (self.ewma + 4 * self.dev) * self.rto_backoff))
+
+def _resolve(fut: asyncio.Future):
+    if not fut.done():
+        fut.set_result(None)
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_max: int = 1):
+        self.failure_threshold = int(failure_threshold)
+        self.reset_timeout = float(reset_timeout)
+        self.half_open_max = int(half_open_max)
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.stats = {"opened": 0, "rejected": 0, "probes": 0}
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.stats["rejected"] += 1
+                    left = self.reset_timeout - (time.monotonic() - self.opened_at)
+                    raise CircuitOpenError(f"circuit open: upstream failing, retry in {left:.1f}s")
+                self.state, self._probes = self.HALF_OPEN, 0
+            if self.state == self.HALF_OPEN:
+                if self._probes >= self.half_open_max:
+                    self.stats["rejected"] += 1
+                    raise CircuitOpenError("circuit half-open: probe in progress")
+                self._probes += 1
+                self.stats["probes"] += 1
+
+    def cancel(self):
+        """A probe admitted by allow() never reached upstream: free its slot."""
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def record(self, ok: bool):
+        with self._lock:
+            if ok:
+                self.state, self.failures = self.CLOSED, 0
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.stats["opened"] += 1
+                self.state, self.opened_at = self.OPEN, time.monotonic()
+
+class _Attempt:
+    __slots__ = ("ok", "t0")
+
+    def __init__(self):
+        self.ok = True
+        self.t0 = time.monotonic()
+
+    def failed(self):
+        """Count this call as an upstream failure (e.g. HTTP 5xx/429) without raising."""
+        self.ok = False
+
+class Guard:
+    def __init__(self, name: str = "api", bucket: Optional[TokenBucket] = None,
+                 limiter: Optional[AdaptiveLimiter] = None, breaker: Optional[CircuitBreaker] = None,
+                 max_wait: float = 5.0):
+        self.name = name
+        self.bucket = bucket or TokenBucket(0)
+        self.limiter = limiter or AdaptiveLimiter()
+        self.breaker = breaker or CircuitBreaker()
+        self.max_wait = float(max_wait)   # longest a caller queues for a token/slot
+
+    @classmethod
+    def from_env(cls, prefix: str, **defaults) -> "Guard":
+        """
+        {PREFIX}_RATE, _BURST, _CONCURRENCY, _MAX_CONCURRENCY, _TARGET_LATENCY,
+        _BREAKER_FAILURES, _BREAKER_RESET, _MAX_WAIT (seconds / req per second).
+        """
+        def env(key, default):
+            return float(os.getenv(f"{prefix}_{key}", defaults.get(key.lower(), default)))
+        return cls(
+            name=prefix.lower(),
+            bucket=TokenBucket(env("RATE", 10), env("BURST", 20)),
+            limiter=AdaptiveLimiter(int(env("CONCURRENCY", 4)), 1, int(env("MAX_CONCURRENCY", 16)),
+                                    env("TARGET_LATENCY", 2.0)),
+            breaker=CircuitBreaker(int(env("BREAKER_FAILURES", 5)), env("BREAKER_RESET", 30)),
+            max_wait=env("MAX_WAIT", 5))
+
+    def timeout(self, ceiling: float, adaptive: bool = True) -> float:
+        """Request timeout: adaptive for short idempotent calls, else the configured ceiling."""
+        return self.limiter.timeout(ceiling) if adaptive else ceiling
+
+    def _finish(self, att: _Attempt, exc: BaseException | None):
+        if isinstance(exc, asyncio.CancelledError):
+            self.limiter.cancel()
+            self.breaker.cancel()     # a cancelled half-open probe must not close the breaker
+            return
+        ok = att.ok and (exc is None or not _is_upstream_failure(exc))
+        self.limiter.release(time.monotonic() - att.t0, ok)
+        self.breaker.record(ok)
+
+    def attempt(self):
+        return _SyncAttempt(self)
+
+    def attempt_async(self):
+        return _AsyncAttempt(self)
+
+    def info(self) -> Dict[str, Any]:
+        lim = self.limiter
+        return {
+            "name": self.name,
+            "breaker": {"state": self.breaker.state, "failures": self.breaker.failures, **self.breaker.stats},
+            "limiter": {"limit": round(lim.limit, 2), "in_flight": lim.in_flight,
+                        "latency_ewma_s": round(lim.ewma, 4) if lim.ewma is not None else None,
+                        "timeout_s": round(lim.timeout(float("inf"), 0.0), 3) if lim.ewma is not None else None,
+                        "rto_backoff": lim.rto_backoff,
+                        **lim.stats},
+            "bucket": {"rate": self.bucket.rate, "burst": self.bucket.burst, **self.bucket.stats},
+        }
+
+def _is_upstream_failure(exc: BaseException) -> bool:
+    # Client-side mistakes (bad input, bad key) say nothing about upstream health
+    status = getattr(exc, "status", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    return not (isinstance(status, int) and 400 <= status < 500 and status != 429)
+
+class _SyncAttempt:
+    def __init__(self, guard: Guard):
+        self.guard = guard
+
+    def __enter__(self) -> _Attempt:
+        g = self.guard
+        g.breaker.allow()
+        try:
+            g.bucket.acquire(g.max_wait)
+        except BaseException:
+            g.breaker.cancel()
+            raise
+        try:
+            g.limiter.acquire(g.max_wait)
+        except BaseException:
+            g.bucket.refund()         # the token was granted but nothing goes out
+            g.breaker.cancel()
+            raise
+        self.att = _Attempt()
+        return self.att
+
+    def __exit__(self, exc_type, exc, tb):
+        self.guard._finish(self.att, exc)
+        return False
+
+class _AsyncAttempt(_SyncAttempt):
+    async def __aenter__(self) -> _Attempt:
+        g = self.guard
+        g.breaker.allow()
+        try:
+            await g.bucket.acquire_async(g.max_wait)
+        except BaseException:
+            g.breaker.cancel()
+            raise
+        try:
+            await g.limiter.acquire_async(g.max_wait)
+        except BaseException:
+            g.bucket.refund()
+            g.breaker.cancel()
+            raise
+        self.att = _Attempt()
+        return self.att
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.guard._finish(self.att, exc)
+        return False
@@ -0,0 +1,77 @@
+# external/singleflight.py
+# Request coalescing ("single flight"): concurrent calls with the same key share
+# one execution and its result (or exception). Nothing is cached afterwards:
+# once the call finishes, the next caller with that key starts a new one.
+import asyncio, threading
+from typing import Any, Awaitable, Callable, Dict
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Thread-safe single flight for blocking calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.stats = {"calls": 0, "executions": 0, "coalesced": 0, "in_flight": 0}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats["executions"] += 1
+                self.stats["in_flight"] += 1
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                self.stats["in_flight"] -= 1
+            call.done.set()
+
+class AsyncSingleFlight:
+    """Single flight for coroutines (one event loop)."""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.stats = {"calls": 0, "executions": 0, "coalesced": 0, "in_flight": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.stats["calls"] += 1
+        fut = self._calls.get(key)
+        if fut is None:
+            fut = self._calls[key] = asyncio.ensure_future(fn())
+            fut.add_done_callback(lambda f: self._finish(key, f))
+            self.stats["executions"] += 1
+            self.stats["in_flight"] += 1
+        else:
+            self.stats["coalesced"] += 1
+        # shield: one cancelled caller must not cancel the call the others share
+        return await asyncio.shield(fut)
+
+    def _finish(self, key: str, fut: asyncio.Future):
+        if self._calls.get(key) is fut:
+            del self._calls[key]
+        self.stats["in_flight"] -= 1
+        if not fut.cancelled():
+            fut.exception()  # mark retrieved even if every caller went away
@@ -0,0 +1,146 @@
+# external/xref_cache.py
+# Persistent cache for Croesus cross references (SQLite, stdlib only).
+# - Key: normalized (brand_code, designation)
+# - TTL per entry; misses (empty hit lists) are cached with a shorter TTL
+# - Size cap with LRU eviction (by last access time)
+# - Small in-memory front so repeat lookups skip SQLite entirely
+import json, os, re, sqlite3, threading, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+DEFAULT_PATH = Path(__file__).resolve().parents[1] / "cache" / "croesus_xref.sqlite"
+DEFAULT_TTL_SEC = 30 * 24 * 3600      # cross references practically never change
+DEFAULT_NEG_TTL_SEC = 24 * 3600       # retry misses once a day
+DEFAULT_MAX_ENTRIES = 10_000
+MEMORY_ENTRIES = 512
+
+def normalize_key(brand_code: str, designation: str) -> str:
+    """'fag', ' 6205-2rs ' -> 'FAG|62052RS' (case, spaces and dashes ignored)."""
+    brand = str(brand_code or "").strip().upper()
+    desig = re.sub(r"[\s\-]+", "", str(designation or "").upper())
+    return f"{brand}|{desig}"
+
+class XrefCache:
+    def __init__(self, path: str | Path = DEFAULT_PATH, ttl_sec: float = DEFAULT_TTL_SEC,
+                 negative_ttl_sec: float = DEFAULT_NEG_TTL_SEC, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = str(path)
+        self.ttl = float(ttl_sec)
+        self.neg_ttl = float(negative_ttl_sec)
+        self.max_entries = int(max_entries)
+        self._lock = threading.Lock()
+        self._mem: Dict[str, tuple] = {}        # key -> (expires_at, hits)
+        self._touched: Dict[str, float] = {}    # key -> last access (flushed on write)
+        self.stats = {"hits": 0, "negative_hits": 0, "misses": 0, "expired": 0, "writes": 0, "evictions": 0}
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS xref ("
+            " key TEXT PRIMARY KEY, payload TEXT NOT NULL, negative INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS xref_accessed ON xref(accessed_at)")
+
+    @classmethod
+    def from_env(cls) -> Optional["XrefCache"]:
+        """Cache configured by CROESUS_CACHE_* env vars; None if CROESUS_CACHE=off."""
+        if os.getenv("CROESUS_CACHE", "on").lower() in {"off", "0", "false", "no"}:
+            return None
+        return cls(path=os.getenv("CROESUS_CACHE_PATH") or DEFAULT_PATH,
+                   ttl_sec=float(os.getenv("CROESUS_CACHE_TTL", DEFAULT_TTL_SEC)),
+                   negative_ttl_sec=float(os.getenv("CROESUS_CACHE_NEG_TTL", DEFAULT_NEG_TTL_SEC)),
+                   max_entries=int(os.getenv("CROESUS_CACHE_MAX", DEFAULT_MAX_ENTRIES)))
+
+    def get(self, brand_code: str, designation: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached hit list ([] for a cached miss) or None if absent/expired."""
+        key = normalize_key(brand_code, designation)
+        now = time.time()
+        with self._lock:
+            item = self._mem.get(key)
+            if item is None:
+                row = self._db.execute("SELECT payload, expires_at FROM xref WHERE key=?", (key,)).fetchone()
+                if row is not None:
+                    item = (row[1], json.loads(row[0]))
+                    self._remember(key, item)
+            if item is None:
+                self.stats["misses"] += 1
+                return None
+            if item[0] <= now:
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                self._mem.pop(key, None)
+                return None
+            self._touched[key] = now
+            self.stats["negative_hits" if not item[1] else "hits"] += 1
+            return item[1]
+
+    def put(self, brand_code: str, designation: str, hits: List[Dict[str, Any]]):
+        key = normalize_key(brand_code, designation)
+        now = time.time()
+        expires = now + (self.ttl if hits else self.neg_ttl)
+        with self._lock:
+            self._flush_touched()
+            self._db.execute(
+                "INSERT OR REPLACE INTO xref(key, payload, negative, expires_at, accessed_at) VALUES(?,?,?,?,?)",
+                (key, json.dumps(hits, ensure_ascii=False), 0 if hits else 1, expires, now))
+            self._remember(key, (expires, hits))
+            self.stats["writes"] += 1
+            self._evict()
+
+    def _remember(self, key: str, item: tuple):
+        if len(self._mem) >= MEMORY_ENTRIES:
+            self._mem.pop(next(iter(self._mem)))
+        self._mem[key] = item
+
+    def _flush_touched(self):
+        if self._touched:
+            self._db.executemany("UPDATE xref SET accessed_at=? WHERE key=?",
+                                 [(t, k) for k, t in self._touched.items()])
+            self._touched.clear()
+
+    def _evict(self):
+        # Drop expired rows first, then least recently used beyond the cap
+        now = time.time()
+        cur = self._db.execute("DELETE FROM xref WHERE expires_at<=?", (now,))
+        n = cur.rowcount or 0
+        over = self._size() - self.max_entries
+        if over > 0:
+            victims = [r[0] for r in self._db.execute(
+                "SELECT key FROM xref ORDER BY accessed_at ASC LIMIT ?", (over,))]
+            self._db.executemany("DELETE FROM xref WHERE key=?", [(k,) for k in victims])
+            for k in victims:
+                self._mem.pop(k, None)
+            n += len(victims)
+        self.stats["evictions"] += n
+
+    def _size(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM xref").fetchone()[0]
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock:
+            looked = self.stats["hits"] + self.stats["negative_hits"] + self.stats["misses"]
+            served = self.stats["hits"] + self.stats["negative_hits"]
+            return {**self.stats, "entries": self._size(), "max_entries": self.max_entries,
+                    "hit_ratio": round(served / looked, 4) if looked else 0.0, "path": self.path}
+
+    def dump(self, include_expired: bool = True) -> List[tuple]:
+        """All positive entries as (key, hits); expired rows are still useful offline."""
+        with self._lock:
+            sql = "SELECT key, payload FROM xref WHERE negative=0"
+            args: tuple = ()
+            if not include_expired:
+                sql += " AND expires_at>?"
+                args = (time.time(),)
+            return [(k, json.loads(p)) for k, p in self._db.execute(sql, args)]
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM xref")
+            self._mem.clear()
+            self._touched.clear()
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._db.close()
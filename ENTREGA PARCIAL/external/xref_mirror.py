@@ -0,0 +1,169 @@
+# external/xref_mirror.py
+# Offline mirror of Croesus cross references, fully in memory.
+# - Built from the SQLite xref cache and/or exported Croesus responses (JSON / JSONL)
+# - Index: normalized "BRAND|DESIG" -> hits, plus a sorted designation list per brand
+#   (prefix search = bisect, fuzzy search = difflib over the brand's designations)
+# - A background thread rebuilds the index periodically and swaps it atomically
+import bisect, difflib, json, os, threading, time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from external.xref_cache import XrefCache, normalize_key
+
+DEFAULT_REFRESH_SEC = 300
+FUZZY_CUTOFF = 0.75
+
+class _Index:
+    def __init__(self):
+        self.exact: Dict[str, List[Dict[str, Any]]] = {}
+        self.by_brand: Dict[str, List[str]] = {}   # brand -> sorted normalized designations
+
+    def add(self, key: str, hits: List[Dict[str, Any]]):
+        if not hits:
+            return
+        brand, desig = key.split("|", 1)
+        known = self.exact.setdefault(key, [])
+        seen = {(h.get("skf_designation"), h.get("non_skf_designation")) for h in known}
+        for h in hits:
+            ident = (h.get("skf_designation"), h.get("non_skf_designation"))
+            if ident not in seen:
+                seen.add(ident)
+                known.append(h)
+        names = self.by_brand.setdefault(brand, [])
+        i = bisect.bisect_left(names, desig)
+        if i == len(names) or names[i] != desig:
+            names.insert(i, desig)
+
+    def add_hits(self, hits: Iterable[Dict[str, Any]], key: str | None = None):
+        """Index hits under the query key (if known) and under each hit's own brand/designation."""
+        hits = [h for h in hits if isinstance(h, dict)]
+        if key:
+            self.add(key, hits)
+        for h in hits:
+            if h.get("brand_code") and h.get("non_skf_designation"):
+                self.add(normalize_key(h["brand_code"], h["non_skf_designation"]), [h])
+
+def _export_hits(data: Any) -> Iterable[Dict[str, Any]]:
+    # Accepts a hit list, {"hits": [...]}, or croesus_xref_batch output {"results": [{"hits": [...]}]}
+    if isinstance(data, list):
+        for item in data:
+            yield from _export_hits(item)
+    elif isinstance(data, dict):
+        if "skf_designation" in data:
+            yield data
+        for k in ("hits", "results"):
+            if isinstance(data.get(k), list):
+                yield from _export_hits(data[k])
+
+def _export_files(paths: Iterable[str | Path]) -> List[Path]:
+    files = []
+    for p in paths:
+        p = Path(p)
+        if p.is_dir():
+            files += sorted(f for f in p.iterdir() if f.suffix in {".json", ".jsonl"})
+        elif p.is_file():
+            files.append(p)
+    return files
+
+class XrefMirror:
+    def __init__(self, cache: Optional[XrefCache] = None, export_paths: Iterable[str | Path] = (),
+                 refresh_sec: float = DEFAULT_REFRESH_SEC):
+        self.cache = cache
+        self.export_paths = list(export_paths)
+        self.refresh_sec = float(refresh_sec)
+        self._index = _Index()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"hits": 0, "misses": 0, "refreshes": 0, "last_refresh": None,
+                      "last_build_ms": 0.0, "last_error": None}
+
+    @classmethod
+    def from_env(cls, cache: Optional[XrefCache] = None) -> Optional["XrefMirror"]:
+        """Mirror configured by CROESUS_MIRROR_* env vars; None if CROESUS_MIRROR=off."""
+        if os.getenv("CROESUS_MIRROR", "on").lower() in {"off", "0", "false", "no"}:
+            return None
+        paths = [p for p in os.getenv("CROESUS_MIRROR_PATHS", "").split(os.pathsep) if p]
+        return cls(cache=cache, export_paths=paths,
+                   refresh_sec=float(os.getenv("CROESUS_MIRROR_REFRESH", DEFAULT_REFRESH_SEC)))
+
+    # ---------- build ----------
+    def rebuild(self):
+        """Build a fresh index from all sources, then swap it in."""
+        t0 = time.perf_counter()
+        idx = _Index()
+        if self.cache is not None:
+            for key, hits in self.cache.dump():
+                idx.add_hits(hits, key)
+        for f in _export_files(self.export_paths):
+            with open(f, encoding="utf-8") as fh:
+                if f.suffix == ".jsonl":
+                    for line in fh:
+                        if line.strip():
+                            idx.add_hits(_export_hits(json.loads(line)))
+                else:
+                    idx.add_hits(_export_hits(json.load(fh)))
+        with self._lock:
+            self._index = idx
+            self.stats["refreshes"] += 1
+            self.stats["last_refresh"] = time.time()
+            self.stats["last_build_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+
+    def start(self):
+        """Initial build + background refresher (daemon thread; refresh_sec<=0 disables it)."""
+        self.rebuild()
+        if self.refresh_sec > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="xref-mirror", daemon=True)
+            self._thread.start()
+        return self
+
+    def _loop(self):
+        while not self._stop.wait(self.refresh_sec):
+            try:
+                self.rebuild()
+            except Exception as e:  # keep serving the previous index
+                self.stats["last_error"] = str(e)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def add(self, brand_code: str, designation: str, hits: List[Dict[str, Any]]):
+        """Fold a fresh API answer into the live index (until the next rebuild picks it up)."""
+        with self._lock:
+            self._index.add_hits(hits, normalize_key(brand_code, designation))
+
+    # ---------- queries ----------
+    def lookup(self, brand_code: str, designation: str) -> Optional[List[Dict[str, Any]]]:
+        """Exact (normalized) match or None."""
+        hits = self._index.exact.get(normalize_key(brand_code, designation))
+        self.stats["hits" if hits else "misses"] += 1
+        return list(hits) if hits else None
+
+    def search(self, brand_code: str, designation: str, match: str = "prefix", limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Designations of the brand matching by prefix or fuzzily.
+        Returns [{"designation", "score", "hits"}] (prefix: in order; fuzzy: best first).
+        """
+        brand, desig = normalize_key(brand_code, designation).split("|", 1)
+        idx = self._index
+        names = idx.by_brand.get(brand, [])
+        if match == "prefix":
+            i = bisect.bisect_left(names, desig)
+            found = []
+            while i < len(names) and names[i].startswith(desig) and len(found) < limit:
+                found.append((names[i], round(len(desig) / len(names[i]), 3)))
+                i += 1
+        elif match == "fuzzy":
+            close = difflib.get_close_matches(desig, names, n=limit, cutoff=FUZZY_CUTOFF)
+            found = [(n, round(difflib.SequenceMatcher(None, desig, n).ratio(), 3)) for n in close]
+        else:
+            raise ValueError("match must be 'prefix' or 'fuzzy'")
+        return [{"designation": n, "score": s, "hits": list(idx.exact[f"{brand}|{n}"])} for n, s in found]
+
+    def info(self) -> Dict[str, Any]:
+        idx = self._index
+        return {**self.stats, "keys": len(idx.exact), "brands": len(idx.by_brand),
+                "refresh_sec": self.refresh_sec, "sources": [str(p) for p in self.export_paths]}
@@ -193,6 +193,11 @@ def main():
                     print("Host: referencias (top 5):")
                     for h in hits[:5]:
                         print(f"  - {h.get('brand_code')} {h.get('non_skf_designation')} ⇒ SKF {h.get('skf_designation')} ({h.get('category')})")
+            elif intent == "croesus_xref" and payload.get("suggestions"):
+                print(f"Host: Croesus no responde ({payload.get('error')}). Parecidos en el espejo local:")
+                for sug in payload["suggestions"][:5]:
+                    skf = ", ".join(h.get("skf_designation") or "?" for h in sug["hits"][:3])
+                    print(f"  - {sug['designation']} ⇒ SKF {skf} (similitud {sug['score']})")
             else:
                 # Generic payload (errors, etc.)
                 print("Host:", pretty(payload))
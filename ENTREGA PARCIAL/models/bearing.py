@@ -5,6 +5,7 @@ class Bearing:
     model: str
     type: str      # e.g., "deep_groove_ball"
     C_N: float     # Dynamic load rating [N]
+    C0_N: float | None = None  # Static load rating [N] (needed for X/Y factors)
     d_mm: float | None = None
     D_mm: float | None = None
     B_mm: float | None = None
@@ -11,14 +11,49 @@ RELIABILITY_A1 = {
     99: 0.21,
 }
 
+# (upper bound in C, a3); first row whose bound is >= T applies
+TEMPERATURE_STEPS = [
+    (70.0, 1.0),
+    (90.0, 0.9),
+    (float("inf"), 0.8),
+]
+
 def temperature_factor(temperature_C: float, lubrication: str) -> float:
     """Simple heuristic: <=70C:1.0, 70..90C:0.9, >90C:0.8"""
-    if temperature_C <= 70:
-        return 1.0
-    if temperature_C <= 90:
-        return 0.9
-    return 0.8
+    for upper, a3 in TEMPERATURE_STEPS:
+        if temperature_C <= upper:
+            return a3
+    return TEMPERATURE_STEPS[-1][1]
 
 def lubrication_factor(lubrication: str) -> float:
     """Demo: grease/oil -> 1.0"""
     return 1.0
+
+# ISO 281 / catalog X-Y factors for radial bearings.
+# Rows: (f0*Fa/C0, e, Y); X applies when Fa/Fr > e (otherwise X=1, Y=0).
+# Values for single-row deep groove ball bearings, normal clearance.
+XY_TABLES = {
+    "deep_groove_ball": {
+        "X": 0.56,
+        "rows": [
+            (0.172, 0.19, 2.30),
+            (0.345, 0.22, 1.99),
+            (0.689, 0.26, 1.71),
+            (1.03,  0.28, 1.55),
+            (1.38,  0.30, 1.45),
+            (2.07,  0.34, 1.31),
+            (3.45,  0.38, 1.15),
+            (5.17,  0.42, 1.04),
+            (6.89,  0.44, 1.00),
+        ],
+    },
+}
+
+# Calculation factor f0 (depends on geometry; typical value when catalog omits it)
+F0_BY_TYPE = {
+    "deep_groove_ball": 14.0,
+}
+
+# Used when a type has no table or the model has no C0: P = Fr + Fa (conservative)
+FALLBACK_X = 1.0
+FALLBACK_Y = 1.0
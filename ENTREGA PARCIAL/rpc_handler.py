@@ -2,7 +2,7 @@
 # Robust JSON-RPC 2.0 over STDIO with Content-Length framing (binary I/O).
 # Works reliably on Windows (no newline translation issues).
 
-import sys, json
+import sys, json, inspect
 from typing import Dict, Any, Callable, Optional
 
 JSONRPC_VERSION = "2.0"
@@ -89,6 +89,29 @@ class StdioJsonRpcServer:
     def _ok(self, _id, result: dict):
         return {"jsonrpc": JSONRPC_VERSION, "id": _id, "result": result}
 
+    def _notify(self, method: str, params: dict):
+        self._write_message({"jsonrpc": JSONRPC_VERSION, "method": method, "params": params})
+
+    def _drain(self, gen, params: dict):
+        """
+        Streaming methods are generators: each yielded dict is a partial result,
+        sent as notifications/progress when the caller passed _meta.progressToken;
+        the generator's return value is the final result.
+        """
+        token = (params.get("_meta") or {}).get("progressToken")
+        n = 0
+        while True:
+            try:
+                partial = next(gen)
+            except StopIteration as stop:
+                return stop.value
+            n += 1
+            if token is not None:
+                note = {"progressToken": token, "progress": n, "partial": partial}
+                if isinstance(partial, dict) and "total" in partial:
+                    note["total"] = partial["total"]
+                self._notify("notifications/progress", note)
+
     def serve_forever(self):
         while True:
             raw = self._read_message()
@@ -120,6 +143,8 @@ class StdioJsonRpcServer:
 
             try:
                 result = self.methods[method](params)
+                if inspect.isgenerator(result):
+                    result = self._drain(result, params)
                 if self.log:
                     self.log.info(f"<<< {method} OK")
                 self._write_message(self._ok(_id, result))
@@ -0,0 +1,84 @@
+# The ENTREGA FINAL BearingPro stdio server must answer a bad tool call with an
+# error and keep serving the calls queued behind it on the same process.
+import json, subprocess, sys
+from pathlib import Path
+import pytest
+
+SERVER = Path(__file__).resolve().parents[2] / "ENTREGA FINAL" / "local_servers" / "bearingpro" / "main.py"
+
+def _send(proc, obj):
+    data = json.dumps(obj).encode("utf-8")
+    proc.stdin.write(f"Content-Length: {len(data)}\r\n\r\n".encode("utf-8") + data)
+    proc.stdin.flush()
+
+def _recv(proc):
+    length = 0
+    while True:
+        line = proc.stdout.readline()
+        assert line, "server closed stdout"
+        if not line.strip():
+            break
+        k, v = line.decode("utf-8").split(":", 1)
+        if k.strip().lower() == "content-length":
+            length = int(v)
+    return json.loads(proc.stdout.read(length), parse_constant=_no_nan)
+
+def _no_nan(name):
+    raise ValueError(f"not valid JSON: {name}")
+
+def _call(mid, name, args):
+    return {"jsonrpc": "2.0", "id": mid, "method": "tools/call", "params": {"name": name, "arguments": args}}
+
+@pytest.fixture
+def server():
+    if not SERVER.exists():
+        pytest.skip("ENTREGA FINAL not in this checkout")
+    proc = subprocess.Popen([sys.executable, str(SERVER)], cwd=SERVER.parent,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    yield proc
+    proc.stdin.close()
+    proc.wait(timeout=10)
+
+def test_malformed_whatif_does_not_kill_the_server(server):
+    _send(server, _call(1, "whatif_open", {"model": "SKF_6205", "rpm": "abc"}))
+    _send(server, _call(2, "catalog_list", {}))
+    got = {m["id"]: m for m in (_recv(server), _recv(server))}
+    assert got[1]["result"]["ok"] is False and "session_id" not in got[1]["result"]
+    assert got[2]["result"]["ok"] is True and got[2]["result"]["models"]
+    assert server.poll() is None
+
+def test_bad_whatif_update_keeps_the_session(server):
+    _send(server, _call(1, "whatif_open", {"model": "SKF_6205", "Fr_N": 2000, "rpm": 1800}))
+    opened = _recv(server)["result"]
+    sid = opened["session_id"]
+    _send(server, _call(2, "whatif_update", {"session_id": sid, "Fr_N": 2500, "L10h_target": "x"}))
+    assert _recv(server)["result"]["ok"] is False
+    _send(server, _call(3, "whatif_update", {"session_id": sid, "rpm": 1800}))
+    same = _recv(server)["result"]
+    assert same["ok"] is True and same["operating_point"]["Fr_N"] == 2000.0
+    assert same["L10h_pred"] == opened["L10h_pred"]
+
+def test_whatif_exception_is_answered_as_internal_error(server):
+    _send(server, _call(1, "whatif_update", ["not", "an", "object"]))
+    _send(server, _call(2, "verify_point", {"model": "SKF_6205", "Fr_N": 2000, "rpm": 1800}))
+    got = {m["id"]: m for m in (_recv(server), _recv(server))}
+    assert got[1]["error"]["code"] == -32603
+    assert got[2]["result"]["ok"] is True
+
+def test_zero_load_answers_valid_json(server):
+    _send(server, _call(1, "select_bearing", {"Fr_N": 0, "Fa_N": 0, "rpm": 1800}))
+    _send(server, _call(2, "verify_point", {"model": "SKF_6205", "Fr_N": 0, "Fa_N": 0}))
+    got = {m["id"]: m for m in (_recv(server), _recv(server))}
+    assert got[1]["result"]["candidates"] and got[1]["result"]["P_equiv_N"] == 0.0
+    assert got[2]["result"]["meets_target"] is True
+
+def test_rpm_zero_is_rejected_not_defaulted(server):
+    _send(server, _call(1, "whatif_open", {"model": "SKF_6205", "Fr_N": 2000, "rpm": 900}))
+    opened = _recv(server)["result"]
+    _send(server, _call(2, "whatif_update", {"session_id": opened["session_id"], "rpm": 0}))
+    _send(server, _call(3, "verify_point", {"model": "SKF_6205", "Fr_N": 2000, "rpm": 0}))
+    _send(server, _call(4, "whatif_update", {"session_id": opened["session_id"], "Fa_N": 0}))
+    got = {m["id"]: m["result"] for m in (_recv(server), _recv(server), _recv(server))}
+    assert got[2]["ok"] is False and "rpm" in got[2]["error"]
+    assert got[3]["ok"] is False
+    assert got[4]["ok"] is True and got[4]["operating_point"]["rpm"] == 900.0
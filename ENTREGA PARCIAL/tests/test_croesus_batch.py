@@ -0,0 +1,113 @@
+import json, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from external.croesus_async import MAX_CONCURRENCY, AsyncCroesusClient
+import tools.croesus_xref as xref
+
+class _Stub(BaseHTTPRequestHandler):
+    # First request per designation gets 503/429, later ones succeed
+    seen = {}
+    lock = threading.Lock()
+
+    def do_GET(self):
+        q = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        desig = q.get("non_skf_designation", "")
+        with self.lock:
+            n = self.seen[desig] = self.seen.get(desig, 0) + 1
+        if desig.startswith("FLAKY") and n == 1:
+            self.send_response(503 if desig.endswith("1") else 429)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            return
+        if desig == "BADJSON":
+            self.send_response(200)
+            self.send_header("Content-Length", "9")
+            self.end_headers()
+            self.wfile.write(b"<html/>\r\n")
+            return
+        body = json.dumps([{"brand_code": q.get("brand_code"), "non_skf_designation": desig,
+                            "skf_designation": desig, "category": "bearing"}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def stub(monkeypatch):
+    _Stub.seen = {}
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    monkeypatch.setenv("CROESUS_API_KEY", "test")
+    monkeypatch.setenv("CROESUS_BASE_URL", f"http://127.0.0.1:{srv.server_address[1]}/main")
+    monkeypatch.setattr(xref, "_CACHE", False)  # no persistent cache in tests
+    yield _Stub
+    srv.shutdown()
+
+def test_retries_on_429_and_503(stub):
+    import asyncio
+
+    async def run():
+        async with AsyncCroesusClient(backoff_base=0.01) as client:
+            out = [r async for r in client.search_many([("FAG", "FLAKY1"), ("FAG", "FLAKY2")])]
+            return out, client.stats
+
+    out, stats = asyncio.run(run())
+    assert all(res["ok"] for _, res in out)
+    assert stats["retries"] == 2 and stats["requests"] == 4 and stats["errors"] == 0
+
+def test_batch_tool_dedups_and_streams(stub):
+    items = [{"brand_code": "FAG", "non_skf_designation": d} for d in ["6205", "6205", "6206-2RS", "6206 2rs", "6207"]]
+    gen = xref.tool_croesus_xref_batch({"items": items, "concurrency": 4})
+    partials = []
+    while True:
+        try:
+            partials.append(next(gen))
+        except StopIteration as stop:
+            final = stop.value
+            break
+    assert final["ok"] and final["count"] == 5 and final["unique"] == 3
+    assert final["stats"]["deduplicated"] == 2
+    assert len(partials) == 3 and partials[-1]["done"] == 3 and partials[-1]["total"] == 3
+    assert sum(stub.seen.values()) == 3
+    assert {r["non_skf_designation"] for r in final["results"]} == {"6205", "6206-2RS", "6207"}
+
+def test_batch_tool_validates_items(stub):
+    gen = xref.tool_croesus_xref_batch({"items": [{"brand_code": "FAG"}]})
+    with pytest.raises(StopIteration) as stop:
+        next(gen)
+    assert stop.value.value["ok"] is False
+
+def test_concurrent_identical_searches_share_one_request(stub):
+    import asyncio
+
+    async def run():
+        async with AsyncCroesusClient() as client:
+            res = await asyncio.gather(*[client.search("FAG", "6305") for _ in range(5)])
+            return res, client.flight.stats
+
+    res, stats = asyncio.run(run())
+    assert all(r == res[0] for r in res) and stats["coalesced"] == 4
+    assert stub.seen == {"6305": 1}
+
+def test_bad_item_fails_alone_and_concurrency_is_capped(stub):
+    items = [{"brand_code": "FAG", "non_skf_designation": d} for d in ["BADJSON", "6208"]]
+    gen = xref.tool_croesus_xref_batch({"items": items, "concurrency": 10_000})
+    while True:
+        try:
+            next(gen)
+        except StopIteration as stop:
+            final = stop.value
+            break
+    rows = {r["non_skf_designation"]: r for r in final["results"]}
+    assert final["ok"] and rows["6208"]["ok"] and rows["BADJSON"]["ok"] is False
+    assert "invalid JSON" in rows["BADJSON"]["error"] and final["stats"]["errors"] == 1
+    assert AsyncCroesusClient(max_concurrency=10_000).max_concurrency == MAX_CONCURRENCY
@@ -0,0 +1,89 @@
+import math
+import pytest
+from models import factors, life_engine
+from models.factors import CatalogArrays, equivalent_load, equivalent_load_matrix, xy_factors
+
+BEARINGS = [
+    {"model": "A", "type": "deep_groove_ball", "C_N": 23200, "C0_N": 7850},
+    {"model": "B", "type": "deep_groove_ball", "C_N": 19500},               # no C0 -> fallback
+    {"model": "C", "type": "roller", "C_N": 40000, "C0_N": 30000},          # no table -> fallback
+]
+
+# ISO 281 deep groove ball, Fa/Fr > e: X = 0.56; (f0*Fa/C0, e, Y), written out here on purpose
+ISO_DGB = [(0.172, 0.19, 2.30), (0.345, 0.22, 1.99), (0.689, 0.26, 1.71), (1.03, 0.28, 1.55),
+           (1.38, 0.30, 1.45), (2.07, 0.34, 1.31), (3.45, 0.38, 1.15), (5.17, 0.42, 1.04),
+           (6.89, 0.44, 1.00)]
+C0, F0 = 7850.0, 14.0
+
+def test_pure_radial_and_light_axial():
+    assert xy_factors(3000, 0, "deep_groove_ball", 7850) == (1.0, 0.0)
+    # Fa/Fr below e -> P = Fr
+    assert equivalent_load(3000, 200, "deep_groove_ball", 7850) == 3000
+
+def test_heavy_axial_interpolates_table():
+    # f0*Fa/C0 = 14*1200/7850 = 2.14 -> between rows 2.07 and 3.45
+    X, Y = xy_factors(3500, 1200, "deep_groove_ball", 7850)
+    assert X == 0.56 and 1.15 < Y < 1.31
+    assert math.isclose(equivalent_load(3500, 1200, "deep_groove_ball", 7850), 0.56 * 3500 + Y * 1200)
+
+def test_fallback_without_c0_or_table():
+    assert equivalent_load(1000, 500, "deep_groove_ball") == 1500
+    assert equivalent_load(1000, 500, "roller", 30000) == 1500
+
+def test_matrix_matches_scalar():
+    cat = CatalogArrays.from_bearings(BEARINGS)
+    Frs, Fas = [3500, 1000, 0], [1200, 0, 800]
+    P = equivalent_load_matrix(Frs, Fas, cat)
+    for i, (fr, fa) in enumerate(zip(Frs, Fas)):
+        for j, b in enumerate(BEARINGS):
+            expected = equivalent_load(fr, fa, b["type"], b.get("C0_N"))
+            assert math.isclose(float(P[i][j]), expected, rel_tol=1e-12)
+
+def test_tables_compiled_once():
+    tab = factors.TABLES["deep_groove_ball"]
+    assert list(tab.ratio) == sorted(tab.ratio)
+
+def test_take_matches_subset_catalog():
+    cat = CatalogArrays.from_bearings(BEARINGS)
+    sub = cat.take([2, 0])
+    P = equivalent_load_matrix([3500, 1000], [1200, 500], sub)
+    ref = equivalent_load_matrix([3500, 1000], [1200, 500], CatalogArrays.from_bearings([BEARINGS[2], BEARINGS[0]]))
+    assert [m["model"] for m in sub.models] == ["C", "A"]
+    assert [[float(v) for v in row] for row in P] == [[float(v) for v in row] for row in ref]
+
+def _y_points():
+    # every breakpoint, every midpoint, and both ends past the table (clamped)
+    pts = [(r, e, y) for r, e, y in ISO_DGB]
+    pts += [((a[0] + b[0]) / 2, (a[1] + b[1]) / 2, (a[2] + b[2]) / 2) for a, b in zip(ISO_DGB, ISO_DGB[1:])]
+    return pts + [(0.05, 0.19, 2.30), (9.0, 0.44, 1.00)]
+
+@pytest.mark.parametrize("r,e,Y", _y_points())
+def test_xy_matches_iso_table(r, e, Y):
+    got_e, got_Y = factors.TABLES["deep_groove_ball"].interp(r)
+    assert math.isclose(got_e, e, abs_tol=1e-12) and math.isclose(got_Y, Y, abs_tol=1e-12)
+    Fa = r * C0 / F0                                     # pure axial: always Fa > e*Fr
+    assert xy_factors(0, Fa, "deep_groove_ball", C0) == pytest.approx((0.56, Y), abs=1e-12)
+    # numpy path (np.interp) gives the same Y: P = Y*Fa with Fr = 0
+    cat = CatalogArrays.from_bearings([BEARINGS[0]])
+    assert math.isclose(float(equivalent_load_matrix(0, Fa, cat)[0][0]), Y * Fa, rel_tol=1e-12)
+
+def _flat(m):
+    return [float(v) for row in m for v in row]
+
+def test_fallback_without_numpy_matches_numpy(monkeypatch):
+    Frs, Fas = [3500, 1000, 0, 3000], [1200, 0, 800, 9000]
+    cases = [life_engine.LoadCase(fr, fa, 1800, 95, 80) for fr, fa in zip(Frs, Fas)]
+    cat = CatalogArrays.from_bearings(BEARINGS)
+    P_np = _flat(equivalent_load_matrix(Frs, Fas, cat))
+    L_np = _flat(life_engine.DEFAULT_ENGINE.evaluate_catalog(cat, cases).L10h_adj)
+
+    monkeypatch.setattr(factors, "np", None)          # as if numpy were not installed
+    monkeypatch.setattr(life_engine, "np", None)
+    cat = CatalogArrays.from_bearings(BEARINGS)
+    assert isinstance(cat.C, list) and isinstance(cat.groups[factors.FALLBACK_GROUP], list)
+    P = equivalent_load_matrix(Frs, Fas, cat)
+    L = life_engine.DEFAULT_ENGINE.evaluate_catalog(cat, cases).L10h_adj
+    assert isinstance(P, list) and isinstance(L, list)
+    assert _flat(P) == pytest.approx(P_np, rel=1e-12)
+    assert _flat(L) == pytest.approx(L_np, rel=1e-12)
+    assert cat.take([2, 0]).C == [40000.0, 23200.0]
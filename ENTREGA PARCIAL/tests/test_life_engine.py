@@ -0,0 +1,72 @@
+# Golden values for the shared life engine. If a formula changes on purpose,
+# update these numbers in the same commit (and say why).
+import json, math
+import pytest
+from models.factors import CatalogArrays
+from models.life_engine import DEFAULT_ENGINE, LoadCase, CaseArrays, build_engine, margin_percent
+
+NTN_6205 = {"model": "NTN_6205C3", "type": "deep_groove_ball", "C_N": 23200, "C0_N": 7850}
+ROLLER = {"model": "R", "type": "roller", "C_N": 40000}
+
+GOLDEN = [
+    # (case, P_N, L10h, L10h_adj)
+    (LoadCase(3500, 1200, 1800), 3522.2431, 2645.9535, 2645.9535),
+    (LoadCase(3000, 0, 1800), 3000.0, 4282.2936, 4282.2936),
+    (LoadCase(3000, 200, 1500, 95, 80), 3000.0, 5138.7523, 2867.4238),
+    (LoadCase(0, 1500, 3000, 99, 100), 1859.7549, 10785.1032, 1811.8973),
+]
+
+@pytest.mark.parametrize("case,P,L10h,L10h_adj", GOLDEN)
+def test_golden_scalar(case, P, L10h, L10h_adj):
+    r = DEFAULT_ENGINE.evaluate(NTN_6205, case)
+    assert round(r.P_N, 4) == P
+    assert round(r.L10h, 4) == L10h
+    assert round(r.L10h_adj, 4) == L10h_adj
+
+def test_golden_batch_matches_scalar():
+    cat = CatalogArrays.from_bearings([NTN_6205, ROLLER])
+    cases = [g[0] for g in GOLDEN]
+    res = DEFAULT_ENGINE.evaluate_catalog(cat, CaseArrays.from_cases(cases))
+    for i, case in enumerate(cases):
+        for j, b in enumerate(cat.models):
+            r = DEFAULT_ENGINE.evaluate(b, case)
+            assert math.isclose(float(res.L10h_adj[i][j]), r.L10h_adj, rel_tol=1e-12)
+
+def test_roller_exponent_and_fallback_load():
+    r = DEFAULT_ENGINE.evaluate(ROLLER, LoadCase(3500, 1200, 1800))
+    assert r.P_N == 4700.0
+    assert round(r.L10h, 4) == 11653.3294
+
+def test_legacy_strategy_reproduces_old_server():
+    # Old FINAL server: P = Fr + 1.5*Fa, p = 3, no adjustments
+    eng = build_engine("conservative", adjustments="none", Y=1.5)
+    r = eng.evaluate(NTN_6205, LoadCase(3500, 1200, 1800))
+    assert r.P_N == 5300.0
+    assert round(r.L10h, 4) == 776.6272
+
+def test_zero_load_gives_finite_life():
+    # P is clamped to P_MIN_N: results must stay valid JSON (no Infinity)
+    r = DEFAULT_ENGINE.evaluate(NTN_6205, LoadCase(0, 0, 1800))
+    assert r.P_N == 0.0 and math.isfinite(r.L10h) and r.L10h > 1e20
+    cat = CatalogArrays.from_bearings([NTN_6205, ROLLER])
+    res = DEFAULT_ENGINE.evaluate_catalog(cat, LoadCase(0, 0, 1800))
+    row = [float(x) for x in res.L10h_adj[0]]
+    assert all(math.isfinite(x) for x in row) and math.isclose(row[0], r.L10h_adj, rel_tol=1e-12)
+    json.dumps(row, allow_nan=False)
+
+def test_margin_percent():
+    assert margin_percent(15000, 12000) == 25.0
+
+def test_from_params_defaults_and_zero_temperature():
+    assert LoadCase.from_params({"Fr_N": 1000}).temperature_C == 25.0
+    assert LoadCase.from_params({"Fr_N": 1000, "temperature_C": None}).temperature_C == 25.0
+    assert LoadCase.from_params({"Fr_N": 1000, "temperature_C": 0}).temperature_C == 0.0
+    assert LoadCase.from_params({"Fr_N": 1000, "temperature_C": "-20"}).temperature_C == -20.0
+
+def test_from_params_zero_is_a_value_and_range_is_checked():
+    case = LoadCase.from_params({"Fr_N": 1000, "rpm": None, "reliability_percent": ""})
+    assert case.rpm == 1800.0 and case.reliability_percent == 90
+    for bad in ({"rpm": 0}, {"rpm": -5}, {"reliability_percent": 0}, {"reliability_percent": 100},
+                {"Fr_N": -1}, {"Fa_N": "nan"}, {"temperature_C": -300}, {"rpm": "abc"}):
+        with pytest.raises(ValueError):
+            LoadCase.from_params({"Fr_N": 1000, **bad})
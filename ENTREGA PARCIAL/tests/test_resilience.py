@@ -0,0 +1,142 @@
+import asyncio, time
+import pytest
+from external.croesus_client import CroesusClient, CroesusError
+from external.resilience import (AdaptiveLimiter, CircuitBreaker, CircuitOpenError, Guard,
+                                 RateLimitedError, TokenBucket)
+
+def test_token_bucket_paces_after_burst():
+    b = TokenBucket(rate=50, burst=2)
+    t0 = time.monotonic()
+    for _ in range(5):
+        b.acquire()
+    assert time.monotonic() - t0 >= 0.05           # 3 tokens beyond the burst at 50/s
+    slow = TokenBucket(rate=1, burst=1)
+    slow.acquire()
+    with pytest.raises(RateLimitedError):
+        slow.acquire(max_wait=0.1)                  # next token is ~1 s away
+
+def test_adaptive_limit_shrinks_on_slow_and_grows_on_fast():
+    lim = AdaptiveLimiter(initial=8, max_limit=16, target_latency=0.5)
+    lim.acquire()
+    lim.release(2.0, ok=True)                       # slow -> multiplicative decrease
+    assert lim.limit == pytest.approx(5.6)
+    for _ in range(20):
+        lim.acquire()
+        lim.release(0.1, ok=True)
+    assert lim.limit > 5.6 and lim.in_flight == 0
+    assert 1.0 <= lim.timeout(10.0) < 10.0         # adaptive timeout below the configured one
+
+def test_breaker_opens_fails_fast_and_probes_half_open():
+    br = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    for _ in range(2):
+        br.allow()
+        br.record(False)
+    with pytest.raises(CircuitOpenError):
+        br.allow()
+    time.sleep(0.06)
+    br.allow()                                      # single probe allowed
+    with pytest.raises(CircuitOpenError):
+        br.allow()
+    br.record(True)
+    assert br.state == "closed"
+
+def test_guard_ignores_client_errors_and_counts_5xx():
+    g = Guard(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    with pytest.raises(CroesusError):
+        with g.attempt():
+            raise CroesusError("Bad Request (400)", 400)
+    assert g.breaker.state == "closed"
+    with g.attempt() as att:
+        att.failed()                                # e.g. HTTP 503 without raising
+    assert g.breaker.state == "open"
+
+def test_croesus_client_fails_fast_when_open(monkeypatch):
+    g = Guard(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60))
+    client = CroesusClient(api_key="test", base_url="http://127.0.0.1:9/main", guard=g, timeout=1)
+    with pytest.raises(Exception):
+        client.search("FAG", "6205")                # connection refused -> breaker opens
+    t0 = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        client.search("FAG", "6206")
+    assert time.monotonic() - t0 < 0.05
+
+def test_async_attempt_releases_slot():
+    async def run():
+        g = Guard(limiter=AdaptiveLimiter(initial=1))
+        async with g.attempt_async():
+            assert g.limiter.in_flight == 1
+        return g.limiter.in_flight
+    assert asyncio.run(run()) == 0
+
+def test_cancelled_probe_is_neutral():
+    g = Guard(limiter=AdaptiveLimiter(initial=2), breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.01))
+    g.breaker.allow()
+    g.breaker.record(False)
+    time.sleep(0.02)
+
+    async def probe():
+        async with g.attempt_async():
+            await asyncio.sleep(10)
+
+    async def run():
+        task = asyncio.create_task(probe())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    asyncio.run(run())
+    assert g.breaker.state == "half_open" and g.limiter.in_flight == 0 and g.limiter.limit == 2
+    g.breaker.allow()                               # the slot is free for the next probe
+
+def test_timeout_backs_off_when_upstream_slows_down():
+    lim = AdaptiveLimiter(initial=4, target_latency=5.0)
+    for _ in range(20):                             # warm up on 20 ms replies
+        lim.acquire()
+        lim.release(0.02, ok=True)
+    failures = 0
+    for _ in range(5):                              # upstream now answers in 2 s (ceiling 10 s)
+        t = lim.timeout(10.0)
+        lim.acquire()
+        if 2.0 > t:
+            failures += 1
+            lim.release(t, ok=False)                # timed out after t
+        else:
+            lim.release(2.0, ok=True)
+    assert failures == 1 and lim.rto_backoff == 1 and lim.ewma > 0.2
+    assert Guard(limiter=lim).timeout(10.0, adaptive=False) == 10.0
+
+def test_burst_of_slow_replies_decreases_once():
+    lim = AdaptiveLimiter(initial=8, max_limit=16, target_latency=0.5)
+    for _ in range(8):
+        lim.acquire()
+    for _ in range(8):
+        lim.release(2.0, ok=True)                   # one congested window
+    assert lim.limit == pytest.approx(5.6) and lim.stats["decreases"] == 1
+    lim.acquire()
+    lim.release(2.0, ok=True)                       # next window: decreases again
+    assert lim.limit == pytest.approx(5.6 * 0.7)
+
+def test_token_refunded_when_limiter_rejects():
+    g = Guard(bucket=TokenBucket(rate=1, burst=1), limiter=AdaptiveLimiter(initial=1), max_wait=0.05)
+    g.limiter.acquire()                             # the only slot is taken
+    with pytest.raises(RateLimitedError):
+        with g.attempt():
+            pass
+    g.limiter.release(0.01, ok=True)
+    with g.attempt():                               # the token is still there: no 1 s wait
+        pass
+    assert g.bucket.stats["rejected"] == 0
+
+def test_async_waiter_woken_on_release():
+    lim = AdaptiveLimiter(initial=1)
+
+    async def run():
+        lim.acquire()
+        waiter = asyncio.create_task(lim.acquire_async(max_wait=5))
+        await asyncio.sleep(0.05)
+        assert not waiter.done() and len(lim._waiters) == 1
+        t0 = time.monotonic()
+        lim.release(0.01, ok=True)
+        await waiter
+        return time.monotonic() - t0
+    assert asyncio.run(run()) < 0.05 and lim.in_flight == 1 and not lim._waiters
@@ -0,0 +1,72 @@
+import asyncio, threading, time
+import pytest
+from external.singleflight import AsyncSingleFlight, SingleFlight
+from external.croesus_client import CroesusClient
+
+def test_sync_concurrent_calls_share_one_execution():
+    sf, runs = SingleFlight(), []
+    def slow():
+        runs.append(1)
+        time.sleep(0.1)
+        return ["hit"]
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(sf.do("FAG|6205", slow))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert out == [["hit"]] * 8 and len(runs) == 1
+    assert sf.stats == {"calls": 8, "executions": 1, "coalesced": 7, "in_flight": 0}
+    sf.do("FAG|6205", slow)                 # finished calls are not cached
+    assert len(runs) == 2
+
+def test_sync_error_reaches_every_waiter():
+    sf = SingleFlight()
+    def boom():
+        time.sleep(0.05)
+        raise RuntimeError("HTTP 503")
+    errors = []
+    def call():
+        try:
+            sf.do("k", boom)
+        except RuntimeError as e:
+            errors.append(str(e))
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == ["HTTP 503"] * 4 and sf.stats["executions"] == 1
+
+def test_async_coalescing_and_cancelled_follower():
+    async def run():
+        sf, runs = AsyncSingleFlight(), []
+        async def slow():
+            runs.append(1)
+            await asyncio.sleep(0.05)
+            return 42
+        follower = asyncio.ensure_future(sf.do("k", slow))
+        await asyncio.sleep(0)
+        others = [asyncio.ensure_future(sf.do("k", slow)) for _ in range(3)]
+        await asyncio.sleep(0)
+        follower.cancel()                   # must not cancel the shared call
+        res = await asyncio.gather(*others)
+        return res, runs, sf.stats
+    res, runs, stats = asyncio.run(run())
+    assert res == [42] * 3 and len(runs) == 1
+    assert stats["coalesced"] == 3 and stats["in_flight"] == 0
+
+def test_croesus_client_coalesces_identical_lookups(monkeypatch):
+    client = CroesusClient(api_key="test")
+    calls = []
+    def fake_fetch(brand, desig):
+        calls.append((brand, desig))
+        time.sleep(0.1)
+        return [{"skf_designation": "6205"}]
+    monkeypatch.setattr(client, "_fetch", fake_fetch)
+    threads = [threading.Thread(target=client.search, args=("fag", d)) for d in ["6205", "6205", "62-05", "6206"]]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 2 and client.flight.stats["coalesced"] == 2
@@ -0,0 +1,20 @@
+# ENTREGA FINAL ships copies of shared modules (no sys.path coupling between the
+# deliverables). They must stay byte-identical to the originals here.
+from pathlib import Path
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+PARCIAL, FINAL = ROOT / "ENTREGA PARCIAL", ROOT / "ENTREGA FINAL"
+
+VENDORED = [
+    ("models/constants.py", "local_servers/bearingpro/bearing_engine/constants.py"),
+    ("models/factors.py", "local_servers/bearingpro/bearing_engine/factors.py"),
+    ("models/life_engine.py", "local_servers/bearingpro/bearing_engine/life_engine.py"),
+    ("external/resilience.py", "client/resilience.py"),
+]
+
+@pytest.mark.parametrize("src,copy", VENDORED)
+def test_vendored_copy_is_identical(src, copy):
+    if not (FINAL / copy).exists():
+        pytest.skip("ENTREGA FINAL not in this checkout")
+    assert (FINAL / copy).read_bytes() == (PARCIAL / src).read_bytes(), f"re-copy {src} to ENTREGA FINAL/{copy}"
@@ -0,0 +1,44 @@
+import time
+from external.xref_cache import XrefCache, normalize_key
+
+HIT = [{"brand_code": "FAG", "non_skf_designation": "6205", "skf_designation": "6205"}]
+
+def test_normalize_key():
+    assert normalize_key(" fag ", "6205-2rs") == normalize_key("FAG", "6205 2RS") == "FAG|62052RS"
+
+def test_hit_and_negative_hit(tmp_path):
+    cache = XrefCache(tmp_path / "x.sqlite")
+    assert cache.get("FAG", "6205") is None
+    cache.put("FAG", "6205", HIT)
+    cache.put("NTN", "9999", [])
+    assert cache.get("fag", "6205") == HIT
+    assert cache.get("NTN", "9999") == []
+    info = cache.info()
+    assert info["hits"] == 1 and info["negative_hits"] == 1 and info["misses"] == 1
+
+def test_persists_across_instances(tmp_path):
+    path = tmp_path / "x.sqlite"
+    a = XrefCache(path)
+    a.put("FAG", "6205", HIT)
+    a.close()
+    assert XrefCache(path).get("FAG", "6205") == HIT
+
+def test_ttl_expiry(tmp_path):
+    cache = XrefCache(tmp_path / "x.sqlite", ttl_sec=0.05, negative_ttl_sec=0.05)
+    cache.put("FAG", "6205", HIT)
+    time.sleep(0.1)
+    assert cache.get("FAG", "6205") is None
+    assert cache.info()["expired"] == 1
+
+def test_lru_eviction(tmp_path):
+    cache = XrefCache(tmp_path / "x.sqlite", max_entries=2)
+    cache.put("FAG", "1", HIT)
+    time.sleep(0.01)
+    cache.put("FAG", "2", HIT)
+    time.sleep(0.01)
+    cache.get("FAG", "1")           # 1 is now more recent than 2
+    time.sleep(0.01)
+    cache.put("FAG", "3", HIT)
+    assert cache.info()["entries"] == 2
+    assert cache.get("FAG", "2") is None
+    assert cache.get("FAG", "1") == HIT
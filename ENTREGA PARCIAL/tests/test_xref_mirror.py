@@ -0,0 +1,53 @@
+import json, time
+from external.xref_cache import XrefCache
+from external.xref_mirror import XrefMirror
+import tools.croesus_xref as xref
+
+def hit(brand, desig, skf=None):
+    return {"brand_code": brand, "non_skf_designation": desig, "skf_designation": skf or desig}
+
+def test_builds_from_cache_and_exports(tmp_path):
+    cache = XrefCache(tmp_path / "x.sqlite")
+    cache.put("FAG", "6205-2RS", [hit("FAG", "6205-2RS", "6205-2RSH")])
+    cache.put("FAG", "0000", [])                       # misses are not mirrored
+    (tmp_path / "exp.json").write_text(json.dumps({"results": [{"hits": [hit("NTN", "6206LLU")]}]}))
+    (tmp_path / "exp.jsonl").write_text(json.dumps([hit("NTN", "6207LLU")]) + "\n")
+    m = XrefMirror(cache=cache, export_paths=[tmp_path], refresh_sec=0).start()
+    assert m.lookup("fag", "6205 2rs")[0]["skf_designation"] == "6205-2RSH"
+    assert m.lookup("NTN", "6206-LLU") and m.lookup("NTN", "6207LLU")
+    assert m.lookup("FAG", "0000") is None
+    assert m.info()["keys"] == 3
+
+def test_prefix_and_fuzzy(tmp_path):
+    m = XrefMirror(refresh_sec=0)
+    for d in ["6205", "6205-2RS", "6206", "22310E"]:
+        m.add("SKF", d, [hit("SKF", d)])
+    assert [r["designation"] for r in m.search("SKF", "6205", "prefix")] == ["6205", "62052RS"]
+    assert m.search("SKF", "2231OE", "fuzzy")[0]["designation"] == "22310E"
+    assert m.search("FAG", "6205", "prefix") == []
+
+def test_refresher_picks_up_new_exports(tmp_path):
+    m = XrefMirror(export_paths=[tmp_path], refresh_sec=0.05).start()
+    assert m.lookup("FAG", "6308") is None
+    (tmp_path / "late.json").write_text(json.dumps([hit("FAG", "6308")]))
+    deadline = time.time() + 2
+    while m.lookup("FAG", "6308") is None and time.time() < deadline:
+        time.sleep(0.02)
+    m.stop()
+    assert m.lookup("FAG", "6308")
+
+class _DownClient:
+    def lookup(self, brand, desig):
+        raise RuntimeError("Croesus unreachable")
+
+def test_tool_uses_mirror_first_and_suggests_when_api_down(monkeypatch):
+    m = XrefMirror(refresh_sec=0)
+    m.add("FAG", "6205", [hit("FAG", "6205")])
+    monkeypatch.setattr(xref, "_MIRROR", m)
+    monkeypatch.setattr(xref, "_CLIENT", _DownClient())
+    res = xref.tool_croesus_xref({"brand_code": "FAG", "non_skf_designation": "6205"})
+    assert res["ok"] and res["source"] == "mirror" and res["count"] == 1
+    res = xref.tool_croesus_xref({"brand_code": "FAG", "non_skf_designation": "62O5"})
+    assert not res["ok"] and res["suggestions"][0]["designation"] == "6205"
+    res = xref.tool_croesus_xref({"brand_code": "FAG", "non_skf_designation": "62", "match": "prefix"})
+    assert res["ok"] and res["matches"][0]["designation"] == "6205"
@@ -1,26 +1,151 @@
 # tools/croesus_xref.py
 # MCP tool to call Croesus and return cross references.
-from external.croesus_client import CroesusClient
+from external.croesus_client import CroesusClient, default_guard
+from external.xref_cache import XrefCache
+from external.xref_mirror import XrefMirror
+
+_CACHE = None
+_CLIENT = None
+_MIRROR = None
+MATCH_MODES = {"exact", "prefix", "fuzzy"}
+
+def get_cache():
+    """Process-wide xref cache (None when disabled with CROESUS_CACHE=off)."""
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = XrefCache.from_env() or False
+    return _CACHE or None
+
+def get_client() -> CroesusClient:
+    """One client (and one HTTP session) per server process."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = CroesusClient(cache=get_cache())
+    return _CLIENT
+
+def get_mirror():
+    """Offline mirror (index built from the cache + exports, refreshed in background)."""
+    global _MIRROR
+    if _MIRROR is None:
+        mirror = XrefMirror.from_env(cache=get_cache())
+        _MIRROR = mirror.start() if mirror is not None else False
+    return _MIRROR or None
+
+def prune_hit(h: dict) -> dict:
+    # Keep essential fields only (to keep output concise)
+    return {
+        "category": h.get("category"),
+        "brand_code": h.get("brand_code"),
+        "brand_name": h.get("brand_name"),
+        "non_skf_designation": h.get("non_skf_designation"),
+        "skf_designation": h.get("skf_designation"),
+        "short_description": h.get("short_description"),
+        "attributes": h.get("attributes", []),
+    }
+
+def _mirror_matches(mirror, brand: str, desig: str, match: str) -> list:
+    return [{"designation": m["designation"], "score": m["score"], "hits": [prune_hit(h) for h in m["hits"]]}
+            for m in mirror.search(brand, desig, match)]
 
 def tool_croesus_xref(params: dict) -> dict:
-    """Input: brand_code, non_skf_designation. Output: hits[]"""
+    """
+    Input: brand_code, non_skf_designation, optional match (exact|prefix|fuzzy).
+    Output: hits[]. Exact lookups try the offline mirror first, then cache/API;
+    prefix/fuzzy only search the mirror.
+    """
     brand = str(params.get("brand_code", "")).strip()
     desig = str(params.get("non_skf_designation", "")).strip()
+    match = str(params.get("match", "exact") or "exact").lower()
     if not brand or not desig:
         return {"ok": False, "error": "brand_code and non_skf_designation are required."}
+    if match not in MATCH_MODES:
+        return {"ok": False, "error": f"match must be one of {sorted(MATCH_MODES)}."}
 
-    client = CroesusClient()
-    hits = client.search(brand, desig)
-    # Keep essential fields only (to keep output concise)
-    pruned = []
-    for h in hits:
-        pruned.append({
-            "category": h.get("category"),
-            "brand_code": h.get("brand_code"),
-            "brand_name": h.get("brand_name"),
-            "non_skf_designation": h.get("non_skf_designation"),
-            "skf_designation": h.get("skf_designation"),
-            "short_description": h.get("short_description"),
-            "attributes": h.get("attributes", []),
-        })
-    return {"ok": True, "count": len(pruned), "hits": pruned}
+    mirror = get_mirror()
+    if match != "exact":
+        if mirror is None:
+            return {"ok": False, "error": "offline mirror disabled (CROESUS_MIRROR=off)."}
+        matches = _mirror_matches(mirror, brand, desig, match)
+        return {"ok": True, "count": len(matches), "matches": matches, "source": "mirror"}
+
+    if mirror is not None:
+        hits = mirror.lookup(brand, desig)
+        if hits is not None:
+            pruned = [prune_hit(h) for h in hits]
+            return {"ok": True, "count": len(pruned), "hits": pruned, "source": "mirror"}
+
+    try:
+        res = get_client().lookup(brand, desig)
+    except Exception as e:
+        if mirror is None:
+            raise
+        # API slow/down: fail with the closest offline candidates instead of nothing
+        return {"ok": False, "error": str(e), "suggestions": _mirror_matches(mirror, brand, desig, "fuzzy")}
+    if mirror is not None:
+        mirror.add(brand, desig, res["hits"])
+    pruned = [prune_hit(h) for h in res["hits"]]
+    return {"ok": True, "count": len(pruned), "hits": pruned, "source": res["source"]}
+
+def tool_croesus_cache_stats(params: dict) -> dict:
+    """Hit/miss/eviction counters and size of the xref cache."""
+    cache, mirror = get_cache(), get_mirror()
+    out = {"ok": True, "enabled": cache is not None}
+    if cache is not None:
+        out.update(cache.info())
+    out["mirror"] = mirror.info() if mirror is not None else {"enabled": False}
+    if _CLIENT is not None:
+        out["coalescing"] = dict(_CLIENT.flight.stats)
+    out["guard"] = default_guard().info()
+    return out
+
+BATCH_MAX_ITEMS = 5000
+
+def tool_croesus_xref_batch(params: dict):
+    """
+    Input: items[] of {brand_code, non_skf_designation}, optional concurrency.
+    Streaming tool (generator): yields one partial per completed lookup and
+    returns {"ok", "count", "unique", "results", "stats"} at the end.
+    """
+    import asyncio
+    from external.croesus_async import AsyncCroesusClient
+
+    raw = params.get("items") or []
+    if not isinstance(raw, list) or not raw:
+        return {"ok": False, "error": "items must be a non-empty list."}
+    if len(raw) > BATCH_MAX_ITEMS:
+        return {"ok": False, "error": f"too many items ({len(raw)} > {BATCH_MAX_ITEMS})."}
+    items = []
+    for it in raw:
+        brand = str((it or {}).get("brand_code", "")).strip()
+        desig = str((it or {}).get("non_skf_designation", "")).strip()
+        if not brand or not desig:
+            return {"ok": False, "error": "every item needs brand_code and non_skf_designation."}
+        items.append((brand, desig))
+
+    try:
+        concurrency = int(params.get("concurrency") or 8)   # the client caps it (MAX_CONCURRENCY)
+    except (TypeError, ValueError):
+        return {"ok": False, "error": "concurrency must be an integer."}
+    client = AsyncCroesusClient(max_concurrency=concurrency, cache=get_cache())
+    loop = asyncio.new_event_loop()
+    results = []
+    try:
+        loop.run_until_complete(client.__aenter__())
+        agen = client.search_many(items)
+        while True:
+            try:
+                (brand, desig), res = loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+            row = {"brand_code": brand, "non_skf_designation": desig, **res}
+            if res.get("ok"):
+                row["hits"] = [prune_hit(h) for h in res["hits"]]
+                row["count"] = len(row["hits"])
+            results.append(row)
+            yield {"done": len(results), "total": len(items) - client.stats["deduplicated"], "result": row}
+        loop.run_until_complete(agen.aclose())
+    finally:
+        loop.run_until_complete(client.__aexit__(None, None, None))
+        loop.close()
+    stats = {**client.stats, "coalesced": client.flight.stats["coalesced"]}
+    return {"ok": True, "count": len(items), "unique": len(results), "results": results, "stats": stats}
@@ -1,7 +1,9 @@
 import json
+from functools import lru_cache
 from pathlib import Path
 from models.bearing import Bearing
-from models.calculator import equivalent_dynamic_load, life_L10, life_hours, apply_adjustments
+from models.factors import CatalogArrays
+from models.life_engine import DEFAULT_ENGINE, LoadCase, margin_percent
 
 CATALOG_PATH = Path(__file__).resolve().parents[1] / "catalog" / "catalog.json"
 
@@ -9,6 +11,14 @@ def load_catalog():
     with open(CATALOG_PATH, "r", encoding="utf-8") as f:
         return json.load(f)
 
+@lru_cache(maxsize=1)
+def _catalog_arrays(_mtime: float) -> CatalogArrays:
+    # Rebuilt only when catalog.json changes on disk
+    return CatalogArrays.from_bearings(load_catalog().get("bearings", []))
+
+def catalog_arrays() -> CatalogArrays:
+    return _catalog_arrays(CATALOG_PATH.stat().st_mtime)
+
 def tool_select_bearing(params: dict) -> dict:
     """
     Input:
@@ -27,26 +37,22 @@ def tool_select_bearing(params: dict) -> dict:
     if rpm <= 0 or (Fr <= 0 and Fa <= 0) or L10h_target <= 0:
         return {"ok": False, "error": "Invalid parameters. Ensure rpm>0, (Fr or Fa)>0, L10h_target>0."}
 
-    cat = load_catalog()
+    cat = catalog_arrays()
+    case = LoadCase(Fr, Fa, rpm, reliability, tempC, lubrication)
+    results = DEFAULT_ENGINE.evaluate_row(cat, case)  # one vectorized pass over the catalog
     candidates = []
 
-    for b in cat.get("bearings", []):
-        bearing = Bearing(model=b["model"], type=b["type"], C_N=float(b["C_N"]),
-                          d_mm=b.get("d_mm"), D_mm=b.get("D_mm"), B_mm=b.get("B_mm"))
-
-        P = equivalent_dynamic_load(Fr, Fa, bearing.type)
-        L10 = life_L10(bearing.C_N, P, bearing.type)
-        L10h = life_hours(L10, rpm)
-        L10h_adj = apply_adjustments(L10h, reliability, tempC, lubrication)
-
-        margin = (L10h_adj / L10h_target - 1.0) * 100.0
-        if L10h_adj >= L10h_target:
+    for b, r in zip(cat.models, results):
+        if r.L10h_adj >= L10h_target:
+            bearing = Bearing(model=b["model"], type=b["type"], C_N=float(b["C_N"]), C0_N=b.get("C0_N"),
+                              d_mm=b.get("d_mm"), D_mm=b.get("D_mm"), B_mm=b.get("B_mm"))
             candidates.append({
                 "model": bearing.model,
                 "type": bearing.type,
                 "C_N": bearing.C_N,
-                "L10h_pred": round(L10h_adj, 2),
-                "margin_percent": round(margin, 2)
+                "P_equiv_N": round(r.P_N, 2),
+                "L10h_pred": round(r.L10h_adj, 2),
+                "margin_percent": round(margin_percent(r.L10h_adj, L10h_target), 2)
             })
 
     candidates.sort(key=lambda c: c["margin_percent"], reverse=True)
@@ -54,7 +60,7 @@ def tool_select_bearing(params: dict) -> dict:
         "ok": True,
         "candidates": candidates,
         "notes": [
-            "Simplified P = Fr + Fa (conservative).",
+            "P = X*Fr + Y*Fa (X/Y interpolated on f0*Fa/C0); models without C0 use P = Fr + Fa.",
             "Reliability/temperature factors are placeholders; replace with catalog standards."
         ]
     }
\ No newline at end of file
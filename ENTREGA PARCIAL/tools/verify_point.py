@@ -1,6 +1,6 @@
 import json
 from pathlib import Path
-from models.calculator import equivalent_dynamic_load, life_L10, life_hours, apply_adjustments
+from models.life_engine import DEFAULT_ENGINE, LoadCase, margin_percent
 
 CATALOG_PATH = Path(__file__).resolve().parents[1] / "catalog" / "catalog.json"
 
@@ -36,19 +36,17 @@ def tool_verify_point(params: dict) -> dict:
     if rpm <= 0 or (Fr <= 0 and Fa <= 0):
         return {"ok": False, "error": "Invalid parameters. Ensure rpm>0 and (Fr or Fa)>0."}
 
-    P = equivalent_dynamic_load(Fr, Fa, b["type"])
-    L10 = life_L10(float(b["C_N"]), P, b["type"])
-    L10h = life_hours(L10, rpm)
-    L10h_adj = apply_adjustments(L10h, reliability, tempC, lubrication)
+    r = DEFAULT_ENGINE.evaluate(b, LoadCase(Fr, Fa, rpm, reliability, tempC, lubrication))
+    P, L10h_adj = r.P_N, r.L10h_adj
 
     out = {
         "ok": True, "model": model, "type": b["type"],
-        "C_N": b["C_N"], "L10h_pred": round(L10h_adj, 2)
+        "C_N": b["C_N"], "P_equiv_N": round(P, 2), "L10h_pred": round(L10h_adj, 2)
     }
     if target is not None:
         target = float(target)
         meets = L10h_adj >= target
-        margin = (L10h_adj / target - 1.0) * 100.0
+        margin = margin_percent(L10h_adj, target)
         out["meets_target"] = bool(meets)
         out["margin_percent"] = round(margin, 2)
     return out
\ No newline at end of file